@@ -0,0 +1,207 @@
+# alt_routing.py
+
+import heapq
+import random
+import time
+from array import array
+
+from network import Network
+from routing import INF, _dijkstra_buffered, _dijkstra_ids, bidirectional_dijkstra, search_buffers
+
+# A* con cotas por landmarks y desigualdad triangular (ALT). Para cada landmark L se guardan
+# las distancias d(L, ·) sobre la topología completa; |d(L, t) - d(L, v)| es una cota inferior
+# de d(v, t). Las fallas solo alargan distancias, así que las cotas siguen siendo válidas con
+# nodos o enlaces caídos y no hace falta reprocesar; solo los cambios de topología lo requieren.
+class ALTEngine:
+    def __init__(self, network, num_landmarks=8, seed=None):
+        self.network = network
+        self.num_landmarks = num_landmarks
+        self.seed = seed
+        self.landmarks = []
+        self.settled = 0
+        self._landmark_dist = []
+        self._stale = True
+        network.subscribe(self._on_network_event)
+        self.preprocess()
+
+    def close(self):
+
+        self.network.unsubscribe(self._on_network_event)
+
+    def _on_network_event(self, event, *args):
+        if event in ("edge_added", "edge_removed", "weight_changed", "topology_replaced"):
+            self._stale = True
+
+    def preprocess(self):
+        # Selección de landmarks por el más lejano: cada nuevo landmark maximiza la distancia
+        # mínima a los ya elegidos (los nodos de otra componente cuentan como infinitamente lejos)
+        network = self.network
+        n = network.node_count
+        self.landmarks = []
+        self._landmark_dist = []
+        self._stale = False
+        if n == 0:
+            return
+        rng = random.Random(self.seed)
+        start_dist, _ = _dijkstra_ids(network, rng.randrange(n), ignore_failures=True)
+        candidate = max(range(n), key=lambda v: start_dist[v] if start_dist[v] != INF else -1)
+        nearest = [INF] * n
+        for _ in range(min(self.num_landmarks, n)):
+            dist, _ = _dijkstra_ids(network, candidate, ignore_failures=True)
+            self.landmarks.append(candidate)
+            self._landmark_dist.append(array("d", dist))
+            for v in range(n):
+                if dist[v] < nearest[v]:
+                    nearest[v] = dist[v]
+            candidate = max(range(n), key=nearest.__getitem__)
+            if nearest[candidate] == 0:
+                break
+
+    def _bounds_for(self, target):
+        # Landmarks útiles para el destino: los que lo alcanzan en la topología completa
+        return [(dl, dl[target]) for dl in self._landmark_dist if dl[target] != INF]
+
+    def _astar(self, source, target):
+        network = self.network
+        offsets, targets, weights = network.csr()
+        failed, failed_links = network.failure_mask()
+        link_key = network.link_key
+        buffers = search_buffers(network)
+        version = buffers.next_version()
+        # Lado 0: distancias reales; lado 1: caché de la heurística por nodo
+        dist, parent, seen, done = buffers.dist[0], buffers.parent[0], buffers.seen[0], buffers.done[0]
+        h_cache, h_seen = buffers.dist[1], buffers.seen[1]
+        bounds = self._bounds_for(target)
+
+        def heuristic(v):
+            if h_seen[v] == version:
+                return h_cache[v]
+            h = 0
+            for dl, dl_target in bounds:
+                bound = abs(dl_target - dl[v])
+                if bound > h:
+                    h = bound
+            h_seen[v] = version
+            h_cache[v] = h
+            return h
+
+        dist[source] = 0
+        parent[source] = -1
+        seen[source] = version
+        pq = [(heuristic(source), 0, source)]
+        while pq:
+            _, current_dist, u = heapq.heappop(pq)
+            if done[u] == version:
+                continue
+            done[u] = version
+            buffers.settled += 1
+            if u == target:
+                break
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                if done[v] == version or failed[v]:
+                    continue
+                if failed_links and link_key(u, v) in failed_links:
+                    continue
+                distance = current_dist + weights[i]
+                if seen[v] == version and distance >= dist[v]:
+                    continue
+                h = heuristic(v)
+                if h == INF:
+                    continue  # v está en otra componente que el destino
+                seen[v] = version
+                dist[v] = distance
+                parent[v] = u
+                heapq.heappush(pq, (distance + h, distance, v))
+        self.settled = buffers.settled
+        if done[target] != version:
+            return INF, None
+        return dist[target], buffers
+
+    def shortest_path(self, start, end):
+
+        # Ruta punto a punto: (distancia, ruta), igual que routing.shortest_path
+        if self._stale:
+            self.preprocess()
+        network = self.network
+        source, target = network.node_id(start), network.node_id(end)
+        if source is None or target is None or network.is_failed(start) or network.is_failed(end):
+            return INF, []
+        distance, buffers = self._astar(source, target)
+        if buffers is None:
+            return INF, []
+        names, parent = network.node_names, buffers.parent[0]
+        path = []
+        node = target
+        while node >= 0:
+            path.append(names[node])
+            node = parent[node]
+        return distance, path[::-1]
+
+    def dijkstra(self, start, end):
+
+        # Alternativa a routing.dijkstra(network, start, end): (dist, prev) de los nodos fijados
+        network = self.network
+        distance, path = self.shortest_path(start, end)
+        if not path:
+            if start in network.nodes and not network.is_failed(start):
+                return {start: 0}, {start: None}
+            return {}, {}
+        dist, prev = {path[0]: 0}, {path[0]: None}
+        for a, b in zip(path, path[1:]):
+            dist[b] = dist[a] + network.link_weight(network.node_id(a), network.node_id(b))
+            prev[b] = a
+        return dist, prev
+
+
+def benchmark(network, queries=200, num_landmarks=8, seed=0):
+    # Compara nodos fijados por consulta entre Dijkstra, Dijkstra bidireccional y ALT
+    rng = random.Random(seed)
+    names = network.node_names
+    started = time.perf_counter()
+    engine = ALTEngine(network, num_landmarks=num_landmarks, seed=seed)
+    preprocess_time = time.perf_counter() - started
+    buffers = search_buffers(network)
+    totals = {"dijkstra": 0, "bidireccional": 0, "alt": 0}
+    times = {"dijkstra": 0.0, "bidireccional": 0.0, "alt": 0.0}
+    for _ in range(queries):
+        s, t = rng.randrange(len(names)), rng.randrange(len(names))
+
+        started = time.perf_counter()
+        _dijkstra_buffered(network, s, t, buffers)
+        times["dijkstra"] += time.perf_counter() - started
+        totals["dijkstra"] += buffers.settled
+        expected = buffers.dist[0][t] if buffers.done[0][t] == buffers.version else INF
+
+        started = time.perf_counter()
+        bidi_dist, _ = bidirectional_dijkstra(network, names[s], names[t])
+        times["bidireccional"] += time.perf_counter() - started
+        totals["bidireccional"] += buffers.settled
+
+        started = time.perf_counter()
+        alt_dist, _ = engine.shortest_path(names[s], names[t])
+        times["alt"] += time.perf_counter() - started
+        totals["alt"] += engine.settled
+
+        if not (expected == bidi_dist == alt_dist):
+            raise AssertionError(f"Distancias distintas para {names[s]} -> {names[t]}")
+    engine.close()
+    report = {
+        "queries": queries,
+        "landmarks": len(engine.landmarks),
+        "preprocess_seconds": preprocess_time,
+        "avg_settled": {k: v / queries for k, v in totals.items()},
+        "avg_query_ms": {k: 1000 * v / queries for k, v in times.items()},
+    }
+    print(f"Nodos: {network.node_count}, consultas: {queries}, landmarks: {report['landmarks']} "
+          f"(preproceso {preprocess_time:.2f} s)")
+    for method in totals:
+        print(f"  {method:<14} nodos fijados/consulta: {report['avg_settled'][method]:>9.1f}"
+              f"   tiempo/consulta: {report['avg_query_ms'][method]:.2f} ms")
+    return report
+
+
+if __name__ == "__main__":
+    grid = Network()
+    grid.create_grid_topology(150, 150, seed=1)
+    benchmark(grid)
@@ -0,0 +1,245 @@
+# archive.py
+
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:  # El archivo columnar requiere NumPy
+    np = None
+
+# Archivo columnar de emergencias cerradas. Cada emergencia ocupa una fila de un arreglo
+# estructurado de NumPy de tamaño fijo. Los textos repetidos (tipo, ubicación, estado y
+# estación) se guardan como códigos enteros de un diccionario de categorías, y la fecha como
+# datetime64 en segundos. Los textos libres (descripción y recursos) casi nunca se repiten, así
+# que van aparte en un búfer UTF-8 contiguo con un arreglo de desplazamientos. Una fila ocupa
+# 31 bytes más el largo de sus textos, frente a los cientos de bytes de un objeto con su
+# datetime y sus cadenas propias.
+
+# Gravedad guardada para las emergencias sin gravedad numérica
+NO_SEVERITY = -1
+
+_DTYPE = None if np is None else np.dtype([
+    ("id", "S8"),
+    ("timestamp", "M8[s]"),
+    ("severity", "i2"),
+    ("emergency_type", "u2"),
+    ("status", "u1"),
+    ("attended", "?"),
+    ("simulated", "?"),
+    ("location", "u4"),
+    ("station", "u4"),
+])
+
+# Columnas que se guardan como códigos de categoría (pocos valores distintos)
+_CATEGORICAL = ("emergency_type", "status", "location", "station")
+
+# Columnas de texto libre, guardadas fuera del arreglo de filas
+_TEXT = ("description", "resources")
+
+
+# Diccionario de categorías: valor <-> código entero
+class _Categories:
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value):
+        # Código de un valor ya visto, o None si nunca se archivó
+        return self.codes.get(value)
+
+
+# Columna de texto libre: los valores codificados en UTF-8 uno tras otro en un bytearray; el
+# valor de la fila i ocupa data[offsets[i]:offsets[i + 1]]
+class _TextColumn:
+    def __init__(self, capacity):
+        self.data = bytearray()
+        self.offsets = np.zeros(capacity + 1, dtype=np.uint64)
+
+    @property
+    def nbytes(self):
+        return len(self.data) + self.offsets.nbytes
+
+    def grow(self, capacity):
+
+        offsets = np.zeros(capacity + 1, dtype=np.uint64)
+        offsets[:len(self.offsets)] = self.offsets
+        self.offsets = offsets
+
+    def set(self, index, value):
+        # Las filas se agregan en orden, así que el valor siempre va al final del búfer
+        self.data += value.encode("utf-8")
+        self.offsets[index + 1] = len(self.data)
+
+    def get(self, index):
+
+        return self.data[int(self.offsets[index]):int(self.offsets[index + 1])].decode("utf-8")
+
+
+class EmergencyArchive:
+    def __init__(self, capacity=1024):
+        if np is None:
+            raise RuntimeError("El archivo columnar de emergencias requiere NumPy")
+        self._data = np.zeros(max(1, capacity), dtype=_DTYPE)
+        self._size = 0
+        self._categories = {column: _Categories() for column in _CATEGORICAL}
+        self._text = {column: _TextColumn(len(self._data)) for column in _TEXT}
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def nbytes(self):
+        # Memoria de las filas ocupadas y de los textos libres (sin contar los diccionarios de
+        # categorías, que solo crecen con los valores distintos)
+        return self._size * _DTYPE.itemsize + sum(text.nbytes for text in self._text.values())
+
+    @property
+    def columns(self):
+        # Vista estructurada de las filas ocupadas, para consultas vectorizadas
+        return self._data[:self._size]
+
+    def _grow(self, needed):
+        capacity = len(self._data)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        data = np.zeros(capacity, dtype=_DTYPE)
+        data[:self._size] = self._data[:self._size]
+        self._data = data
+        for text in self._text.values():
+            text.grow(capacity)
+
+    def _row(self, emergency):
+        # Fila de tamaño fijo y textos libres. Acepta tanto emergency.Emergency como el
+        # Emergency del simulador (tipos Enum, prioridad en lugar de gravedad y resources_assigned)
+        categories = self._categories
+        emergency_type = getattr(emergency.emergency_type, "value", emergency.emergency_type)
+        severity = getattr(emergency, "severity", None)
+        if severity is None and hasattr(emergency, "priority"):
+            severity = emergency.priority.value
+        if not isinstance(severity, int):
+            severity = NO_SEVERITY
+        resources = getattr(emergency, "assigned_resources", None) or getattr(emergency, "resources_assigned", None)
+        row = (
+            str(emergency.id).encode()[:8],
+            np.datetime64(emergency.timestamp, "s"),
+            severity,
+            categories["emergency_type"].code(str(emergency_type)),
+            categories["status"].code(emergency.status),
+            bool(getattr(emergency, "attended", emergency.status == "resolved")),
+            bool(getattr(emergency, "simulada", False)),
+            categories["location"].code(emergency.location),
+            categories["station"].code(getattr(emergency, "assigned_station", None)),
+        )
+        return row, (emergency.description or "", ",".join(resources) if resources else "")
+
+    def _set_text(self, index, texts):
+        for column, value in zip(_TEXT, texts):
+            self._text[column].set(index, value)
+
+    def append(self, emergency):
+
+        row, texts = self._row(emergency)
+        self._grow(self._size + 1)
+        self._data[self._size] = row
+        self._set_text(self._size, texts)
+        self._size += 1
+
+    def extend(self, emergencies):
+        # Inserción por lotes: una sola asignación al arreglo
+        rows = [self._row(e) for e in emergencies]
+        if not rows:
+            return
+        self._grow(self._size + len(rows))
+        self._data[self._size:self._size + len(rows)] = np.array([row for row, _ in rows], dtype=_DTYPE)
+        for i, (_, texts) in enumerate(rows, self._size):
+            self._set_text(i, texts)
+        self._size += len(rows)
+
+    def __getitem__(self, index):
+        # Fila decodificada como diccionario
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        row = self._data[index]
+        record = {
+            "id": row["id"].decode(),
+            "timestamp": row["timestamp"].astype(datetime),
+            "severity": None if row["severity"] == NO_SEVERITY else int(row["severity"]),
+            "attended": bool(row["attended"]),
+            "simulated": bool(row["simulated"]),
+        }
+        for column in _CATEGORICAL:
+            record[column] = self._categories[column].values[row[column]]
+        record["description"] = self._text["description"].get(index)
+        resources = self._text["resources"].get(index)
+        record["resources"] = resources.split(",") if resources else []
+        return record
+
+    def find(self, emergency_id):
+        # Posición de una emergencia por id (búsqueda vectorizada), o None
+        matches = np.flatnonzero(self.columns["id"] == str(emergency_id).encode())
+        return int(matches[0]) if len(matches) else None
+
+    def select(self, emergency_type=None, location=None, status=None, station=None,
+               since=None, until=None, min_severity=None):
+        # Posiciones de las filas que cumplen todos los filtros indicados
+        data = self.columns
+        mask = np.ones(self._size, dtype=bool)
+        for column, value in (("emergency_type", emergency_type), ("location", location),
+                              ("status", status), ("station", station)):
+            if value is None:
+                continue
+            code = self._categories[column].lookup(value)
+            if code is None:
+                return np.empty(0, dtype=np.intp)
+            mask &= data[column] == code
+        if since is not None:
+            mask &= data["timestamp"] >= np.datetime64(since, "s")
+        if until is not None:
+            mask &= data["timestamp"] < np.datetime64(until, "s")
+        if min_severity is not None:
+            mask &= data["severity"] >= min_severity
+        return np.flatnonzero(mask)
+
+    def count_by(self, column, rows=None):
+        # {valor: cantidad} de una columna categórica, opcionalmente sobre un subconjunto de filas
+        codes = self.columns[column] if rows is None else self.columns[column][rows]
+        values = self._categories[column].values
+        counts = np.bincount(codes, minlength=len(values))
+        return {values[code]: int(count) for code, count in enumerate(counts) if count}
+
+
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+
+    from emergency import Emergency
+
+    rng = random.Random(1)
+    tipos = ["incendio", "accidente", "robo", "inundacion", "explosion"]
+    lugares = [f"N{r}_{c}" for r in range(30) for c in range(30)]
+    emergencias = []
+    for i in range(100_000):
+        e = Emergency(rng.choice(lugares), rng.randint(1, 10), rng.choice(tipos), "Reporte ciudadano")
+        e.assigned_station = f"Estacion{rng.randint(1, 6)}"
+        e.attended = True
+        e.status = "ATENDIDA"
+        emergencias.append(e)
+    objetos = sum(sys.getsizeof(e) + sys.getsizeof(e.id) + sys.getsizeof(e.timestamp) for e in emergencias)
+    archivo = EmergencyArchive()
+    started = time.perf_counter()
+    archivo.extend(emergencias)
+    print(f"{len(archivo)} emergencias archivadas en {time.perf_counter() - started:.2f} s")
+    print(f"Objetos: {objetos / 1e6:.1f} MB, archivo columnar: {archivo.nbytes / 1e6:.1f} MB")
+    print(archivo.count_by("emergency_type", archivo.select(min_severity=8)))
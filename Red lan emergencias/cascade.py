@@ -0,0 +1,138 @@
+# cascade.py
+
+import random
+
+from network import Network
+from parallel import ParallelExecutor
+
+# Simulación Monte Carlo de fallas múltiples. Cada ensayo quita nodos en un orden aleatorio;
+# en lugar de repetir búsquedas tras cada falla, se recorre el orden al revés: se parte de la
+# red sin los nodos caídos y se vuelven a agregar uno a uno con union-find, actualizando en
+# cada paso el número de componentes, la componente mayor y los nodos que siguen conectados
+# a alguna estación. Un ensayo cuesta O(E α(n)) en total.
+
+
+def _trial_rng(seed, trial):
+    # Generador propio de cada ensayo: el resultado no depende de cómo se repartan los ensayos
+    return random.Random(seed * 1_000_003 + trial)
+
+
+def _run_trial(graph, task):
+    trial, seed, candidates, stations, max_failures = task
+    order = _trial_rng(seed, trial).sample(candidates, max_failures)
+    offsets, targets, _ = graph.csr()
+    failed, failed_links = graph.failure_mask()
+    link_key = graph.link_key
+    n = graph.node_count
+    parent = list(range(n))
+    size = [1] * n
+    has_station = bytearray(n)
+    for s in stations:
+        has_station[s] = 1
+    present = bytearray(n)
+    components = largest = covered = 0
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def add(v):
+        nonlocal components, largest, covered
+        present[v] = 1
+        components += 1
+        if largest < 1:
+            largest = 1
+        if has_station[v]:
+            covered += 1
+        for i in range(offsets[v], offsets[v + 1]):
+            u = targets[i]
+            if not present[u] or (failed_links and link_key(u, v) in failed_links):
+                continue
+            ru, rv = find(u), find(v)
+            if ru == rv:
+                continue
+            before = (size[ru] if has_station[ru] else 0) + (size[rv] if has_station[rv] else 0)
+            if size[ru] < size[rv]:
+                ru, rv = rv, ru
+            parent[rv] = ru
+            size[ru] += size[rv]
+            has_station[ru] = has_station[ru] or has_station[rv]
+            covered += (size[ru] if has_station[ru] else 0) - before
+            components -= 1
+            if size[ru] > largest:
+                largest = size[ru]
+
+    removed = set(order)
+    for v in range(n):
+        if not failed[v] and v not in removed:
+            add(v)
+    # Métricas indexadas por cantidad de nodos caídos (0..max_failures)
+    metrics = [None] * (max_failures + 1)
+    metrics[max_failures] = (components, largest, covered)
+    for k in range(max_failures - 1, -1, -1):
+        add(order[k])
+        metrics[k] = (components, largest, covered)
+    return metrics
+
+
+def simulate_cascades(network, stations, trials=1000, max_failures=None, candidates=None, seed=0, workers=None):
+    # Degradación de la red ante max_failures nodos caídos al azar (entre candidates, por
+    # defecto todos los nodos operativos), promediada sobre trials ensayos reproducibles.
+    # Devuelve listas indexadas por cantidad de nodos caídos
+    failed, _ = network.failure_mask()
+    alive = [v for v in range(network.node_count) if not failed[v]]
+    pool = alive if candidates is None else [
+        network.node_id(c) for c in candidates if network.node_id(c) is not None and not network.is_failed(c)
+    ]
+    station_ids = [network.node_id(s) for s in stations if network.node_id(s) is not None]
+    max_failures = len(pool) if max_failures is None else min(max_failures, len(pool))
+    total = len(alive)
+    tasks = [(t, seed, pool, station_ids, max_failures) for t in range(trials)]
+    steps = max_failures + 1
+    sum_components = [0] * steps
+    sum_largest = [0] * steps
+    sum_covered = [0] * steps
+    min_covered = [total] * steps
+    max_covered = [0] * steps
+    with ParallelExecutor(network, workers) as executor:
+        for metrics in executor.map(_run_trial, tasks):
+            for k, (components, largest, covered) in enumerate(metrics):
+                sum_components[k] += components
+                sum_largest[k] += largest
+                sum_covered[k] += covered
+                if covered < min_covered[k]:
+                    min_covered[k] = covered
+                if covered > max_covered[k]:
+                    max_covered[k] = covered
+    scale = trials * total if trials and total else 1
+    return {
+        "trials": trials,
+        "nodes": total,
+        "failures": list(range(steps)),
+        "components": [c / (trials or 1) for c in sum_components],
+        "largest_component": [c / scale for c in sum_largest],
+        "station_coverage": [c / scale for c in sum_covered],
+        "worst_coverage": [c / (total or 1) for c in min_covered],
+        "best_coverage": [c / (total or 1) for c in max_covered],
+    }
+
+
+def format_summary(result, every=1):
+
+    lines = [f"{result['trials']} ensayos sobre {result['nodes']} nodos",
+             "caídos  componentes  comp. mayor  cobertura (peor - mejor)"]
+    for k in result["failures"][::every]:
+        lines.append(
+            f"{k:>6}  {result['components'][k]:>11.2f}  {result['largest_component'][k]:>10.1%}  "
+            f"{result['station_coverage'][k]:>8.1%} ({result['worst_coverage'][k]:.1%} - {result['best_coverage'][k]:.1%})"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    grid = Network()
+    grid.create_grid_topology(30, 30, seed=1)
+    estaciones = [f"N{r}_{c}" for r in (5, 15, 25) for c in (5, 15, 25)]
+    print(format_summary(simulate_cascades(grid, estaciones, trials=1000, max_failures=60), every=10))
@@ -0,0 +1,47 @@
+# conftest.py
+
+import pytest
+
+from network import Network
+from routing import INF, dijkstra
+
+
+def grid_network(rows=6, cols=6, seed=1):
+    # Cuadrícula pequeña con pesos aleatorios reproducibles
+    network = Network()
+    network.create_grid_topology(rows, cols, seed=seed)
+    return network
+
+
+def damage(network):
+    # Fallas de nodos y de enlaces fijas, para comparar con la red operativa
+    network.fail_node("N2_2")
+    network.fail_node("N3_4")
+    network.fail_link("N0_0", "N0_1")
+    network.fail_link("N4_1", "N5_1")
+    return network
+
+
+def reference_distances(network, start):
+    # Distancias de referencia: dijkstra sobre la copia en diccionario de la red operativa (los
+    # nodos caídos quedan a distancia infinita)
+    if network.is_failed(start):
+        return {}
+    dist = dict.fromkeys(network.node_names, INF)
+    dist.update(dijkstra(network.operational_graph(), start)[0])
+    return dist
+
+
+def path_cost(network, path):
+    # Suma de los pesos estáticos de una ruta dada como lista de nombres
+    return sum(network.link_weight(network.node_id(a), network.node_id(b)) for a, b in zip(path, path[1:]))
+
+
+@pytest.fixture
+def grid():
+    return grid_network()
+
+
+@pytest.fixture
+def damaged_grid():
+    return damage(grid_network())
@@ -0,0 +1,196 @@
+# connectivity.py
+
+# Etiquetas de componentes conexas de la red operativa, para descartar al instante consultas
+# sin ruta. Cada nodo apunta a un id de componente y los ids se agrupan con union-find, así
+# que una restauración o un enlace nuevo solo une dos ids en O(α). Una falla puede partir una
+# componente: se lanzan BFS intercalados desde los extremos afectados; los trozos que se agotan
+# reciben ids nuevos y el último trozo activo conserva el id anterior sin recorrerse, de modo
+# que el costo es proporcional a los trozos pequeños que se separan.
+class ComponentIndex:
+    def __init__(self, network):
+        self.network = network
+        self.nodes_relabeled = 0
+        self.compactions = 0
+        network.subscribe(self._on_network_event)
+        self.rebuild()
+
+    def close(self):
+
+        self.network.unsubscribe(self._on_network_event)
+
+    def rebuild(self):
+        # Etiquetado completo con union-find sobre las aristas operativas
+        network = self.network
+        n = network.node_count
+        self._parent = list(range(n))
+        self._label = list(range(n))
+        offsets, targets, _ = network.csr()
+        failed, failed_links = network.failure_mask()
+        link_key = network.link_key
+        for u in range(n):
+            if failed[u]:
+                continue
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                if v > u and not failed[v] and not (failed_links and link_key(u, v) in failed_links):
+                    self._union(self._label[u], self._label[v])
+
+    def _find(self, x):
+        parent = self._parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def _union(self, a, b):
+        ra, rb = self._find(a), self._find(b)
+        if ra != rb:
+            self._parent[rb] = ra
+
+    def _new_label(self):
+        self._parent.append(len(self._parent))
+        return len(self._parent) - 1
+
+    def _resize(self):
+        while len(self._label) < self.network.node_count:
+            self._label.append(self._new_label())
+
+    def _compact(self):
+        # Cada división o restauración agrega ids nuevos y los viejos quedan sin uso; cuando los
+        # ids superan el doble de los nodos se renumeran las raíces vigentes de 0 en adelante,
+        # O(n α) amortizado sobre al menos n eventos
+        if len(self._parent) <= 2 * max(len(self._label), 32):
+            return
+        compact = {}
+        label = self._label
+        for x in range(len(label)):
+            label[x] = compact.setdefault(self._find(label[x]), len(compact))
+        self._parent = list(range(len(compact)))
+        self.compactions += 1
+
+    # --- Eventos de la red ---
+
+    def _operational_link(self, a, b):
+        network = self.network
+        failed, failed_links = network.failure_mask()
+        return not (failed[a] or failed[b] or (failed_links and network.link_key(a, b) in failed_links))
+
+    def _on_network_event(self, event, *args):
+        if event == "topology_replaced":
+            self.rebuild()
+            return
+        self._resize()
+        if event == "node_failed":
+            self._split(self._operational_neighbors(args[0]))
+        elif event == "node_restored":
+            x = args[0]
+            self._label[x] = self._new_label()
+            for v in self._operational_neighbors(x):
+                self._union(self._label[x], self._label[v])
+        elif event in ("link_restored", "edge_added"):
+            a, b = args[0], args[1]
+            if self._operational_link(a, b):
+                self._union(self._label[a], self._label[b])
+        elif event == "link_failed":
+            a, b = args
+            failed, _ = self.network.failure_mask()
+            if not (failed[a] or failed[b]):
+                self._split([a, b])
+        elif event == "edge_removed":
+            a, b = args[0], args[1]
+            # Si el enlace ya estaba caído la red operativa no cambia
+            if self._operational_link(a, b):
+                self._split([a, b])
+        self._compact()
+
+    def _operational_neighbors(self, x):
+        # Vecinos operativos de x por enlaces activos, sin mirar el estado del propio x
+        network = self.network
+        offsets, targets, _ = network.csr()
+        failed, failed_links = network.failure_mask()
+        found = []
+        for i in range(offsets[x], offsets[x + 1]):
+            v = targets[i]
+            if v == x or failed[v] or v in found:
+                continue
+            if not (failed_links and network.link_key(x, v) in failed_links):
+                found.append(v)
+        return found
+
+    def _split(self, starts):
+        # BFS intercalados (un nodo por búsqueda y por ronda). Dos búsquedas que se encuentran
+        # pertenecen al mismo trozo y se agrupan; un grupo cuyas colas se vacían es un trozo
+        # completo y separado. Se termina cuando queda un solo grupo activo
+        if len(starts) < 2:
+            return
+        network = self.network
+        offsets, targets, _ = network.csr()
+        failed, failed_links = network.failure_mask()
+        link_key = network.link_key
+        k = len(starts)
+        group = list(range(k))
+
+        def group_of(i):
+            while group[i] != i:
+                group[i] = group[group[i]]
+                i = group[i]
+            return i
+
+        owner = {s: i for i, s in enumerate(starts)}
+        visited = [[s] for s in starts]
+        queues = [[s] for s in starts]
+        heads = [0] * k
+        active = set(range(k))
+        while len(active) > 1:
+            for i in range(k):
+                g = group_of(i)
+                if g not in active or heads[i] >= len(queues[i]):
+                    continue
+                u = queues[i][heads[i]]
+                heads[i] += 1
+                for j in range(offsets[u], offsets[u + 1]):
+                    v = targets[j]
+                    if failed[v] or (failed_links and link_key(u, v) in failed_links):
+                        continue
+                    other = owner.get(v)
+                    if other is None:
+                        owner[v] = i
+                        visited[i].append(v)
+                        queues[i].append(v)
+                    else:
+                        h = group_of(other)
+                        if h != g:
+                            group[h] = g
+                            active.discard(h)
+                if len(active) <= 1:
+                    break
+            # Grupos sin frontera: trozos completos que quedaron separados
+            for g in list(active):
+                members = [i for i in range(k) if group_of(i) == g]
+                if all(heads[i] >= len(queues[i]) for i in members) and len(active) > 1:
+                    label = self._new_label()
+                    for i in members:
+                        for v in visited[i]:
+                            self._label[v] = label
+                        self.nodes_relabeled += len(visited[i])
+                    active.discard(g)
+
+    # --- Consultas ---
+
+    def _component(self, name):
+        node_id = self.network.node_id(name)
+        if node_id is None or self.network.is_failed(name):
+            return None
+        return self._find(self._label[node_id])
+
+    def connected(self, u, v):
+        # True si existe alguna ruta operativa entre u y v
+        cu = self._component(u)
+        return cu is not None and cu == self._component(v)
+
+    def stations_reaching(self, node, stations):
+        # Estaciones operativas que todavía tienen alguna ruta hasta node
+        target = self._component(node)
+        if target is None:
+            return []
+        return [s for s in stations if self._component(s) == target]
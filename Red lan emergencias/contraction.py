@@ -0,0 +1,375 @@
+# contraction.py
+
+import hashlib
+import heapq
+import os
+import struct
+import time
+from array import array
+
+from network import Network
+from routing import INF, SearchBuffers, bidirectional_dijkstra
+
+# Jerarquía de contracción (CH) para redes grandes. Los nodos se contraen en orden de
+# importancia (diferencia de aristas + vecinos ya contraídos); al quitar un nodo v se agrega un
+# atajo u-w con el peso u-v-w si no existe una ruta testigo igual o más corta que evite v.
+# Las consultas son dos búsquedas de Dijkstra que solo suben de rango y se encuentran en el
+# nodo de mayor rango de la ruta; los atajos se desempaquetan con el nodo intermedio guardado.
+MAGIC = b"RLCH"
+FORMAT_VERSION = 1
+# magic, versión, nodos, aristas ascendentes, sha256 de la topología
+_HEADER = struct.Struct("<4sIII32s")
+
+
+def _topology_digest(network):
+    # Huella de la topología completa (nombres y aristas) para validar un archivo guardado
+    digest = hashlib.sha256()
+    digest.update("\n".join(network.node_names).encode("utf-8"))
+    for arr in (network._edge_u, network._edge_v, network._edge_w):
+        digest.update(memoryview(arr).cast("B"))
+    return digest.digest()
+
+
+def _witness_search(adj, source, excluded, targets, limit, max_settled):
+    # Dijkstra local desde source que evita el nodo excluido; se corta al superar el límite
+    # de distancia, al fijar todos los destinos o al fijar max_settled nodos
+    dist = {source: 0}
+    pq = [(0, source)]
+    pending = set(targets)
+    settled = 0
+    while pq:
+        d, u = heapq.heappop(pq)
+        if d > dist[u]:
+            continue
+        if d > limit:
+            break
+        pending.discard(u)
+        settled += 1
+        if not pending or settled >= max_settled:
+            break
+        for v, w in adj[u].items():
+            if v == excluded:
+                continue
+            nd = d + w
+            if nd < dist.get(v, INF):
+                dist[v] = nd
+                heapq.heappush(pq, (nd, v))
+    return dist
+
+
+class ContractionHierarchy:
+    def __init__(self, network, max_settled=60, build=True):
+        self.network = network
+        self.max_settled = max_settled
+        self.shortcuts = 0
+        self.settled = 0
+        self._stale = True
+        network.subscribe(self._on_network_event)
+        if build:
+            self.build()
+
+    def close(self):
+
+        self.network.unsubscribe(self._on_network_event)
+
+    def _on_network_event(self, event, *args):
+        # Las fallas no invalidan la jerarquía (se verifican en cada consulta); los cambios de
+        # topología sí: mientras no se reconstruya, las consultas usan Dijkstra bidireccional
+        if event in ("edge_added", "edge_removed", "weight_changed", "topology_replaced"):
+            self._stale = True
+
+    @property
+    def stale(self):
+
+        return self._stale
+
+    # --- Preproceso ---
+
+    def _simulate(self, adj, v):
+        # Atajos necesarios si se contrajera v: lista de (u, w, peso)
+        neighbors = adj[v]
+        items = sorted(neighbors.items())
+        shortcuts = []
+        for idx, (u, wu) in enumerate(items):
+            rest = items[idx + 1:]
+            if not rest:
+                break
+            limit = wu + max(ww for _, ww in rest)
+            dist = _witness_search(adj, u, v, [w for w, _ in rest], limit, self.max_settled)
+            for w, ww in rest:
+                if dist.get(w, INF) > wu + ww:
+                    shortcuts.append((u, w, wu + ww))
+        return shortcuts
+
+    def _priority(self, adj, deleted, v):
+        return len(self._simulate(adj, v)) - len(adj[v]) + deleted[v]
+
+    def build(self):
+        # Contrae toda la topología (sin considerar fallas) y arma el grafo ascendente en CSR
+        network = self.network
+        n = network.node_count
+        link_key = network.link_key
+        adj = [{} for _ in range(n)]
+        for u, v, w in zip(network._edge_u, network._edge_v, network._edge_w):
+            adj[u][v] = w
+            adj[v][u] = w
+        deleted = [0] * n
+        priority = [self._priority(adj, deleted, v) for v in range(n)]
+        heap = [(p, v) for v, p in enumerate(priority)]
+        heapq.heapify(heap)
+        rank = array("i", [-1]) * n
+        middle = {}
+        upward = [None] * n
+        order = 0
+        self.shortcuts = 0
+        while heap:
+            p, v = heapq.heappop(heap)
+            if rank[v] >= 0 or p != priority[v]:
+                continue
+            # Actualización perezosa: si la prioridad empeoró y ya no es la mínima, se reinserta
+            current = self._priority(adj, deleted, v)
+            if heap and current > heap[0][0]:
+                priority[v] = current
+                heapq.heappush(heap, (current, v))
+                continue
+            for u, w, weight in self._simulate(adj, v):
+                if weight < adj[u].get(w, INF):
+                    adj[u][w] = weight
+                    adj[w][u] = weight
+                    middle[link_key(u, w)] = v
+                    self.shortcuts += 1
+            rank[v] = order
+            order += 1
+            neighbors = adj[v]
+            upward[v] = [(u, w, middle.get(link_key(u, v), -1)) for u, w in neighbors.items()]
+            for u in neighbors:
+                del adj[u][v]
+                deleted[u] += 1
+            adj[v] = {}
+            for u in neighbors:
+                priority[u] = self._priority(adj, deleted, u)
+                heapq.heappush(heap, (priority[u], u))
+        offsets = array("i", [0])
+        targets, weights, middles = array("i"), array("q"), array("i")
+        for v in range(n):
+            for u, w, mid in upward[v] or ():
+                targets.append(u)
+                weights.append(w)
+                middles.append(mid)
+            offsets.append(len(targets))
+        self._attach(rank, offsets, targets, weights, middles, _topology_digest(network))
+
+    def _attach(self, rank, offsets, targets, weights, middles, digest):
+        self.rank = rank
+        self._up = (offsets, targets, weights, middles)
+        self._digest = digest
+        # Nodo intermedio de cada atajo, para desempaquetar rutas
+        link_key = self.network.link_key
+        self._middle = {}
+        for v in range(len(rank)):
+            for i in range(offsets[v], offsets[v + 1]):
+                if middles[i] >= 0:
+                    self._middle[link_key(v, targets[i])] = middles[i]
+        self._buffers = SearchBuffers(len(rank))
+        self._stale = False
+
+    # --- Consultas ---
+
+    def _query(self, source, target):
+        # Búsqueda ascendente desde ambos extremos; cada lado se detiene cuando su mínimo
+        # alcanza la mejor distancia encontrada
+        offsets, targets, weights, _ = self._up
+        buffers = self._buffers
+        version = buffers.next_version()
+        dist, parent, seen, done = buffers.dist, buffers.parent, buffers.seen, buffers.done
+        queues = ([(0, source)], [(0, target)])
+        for side, origin in ((0, source), (1, target)):
+            dist[side][origin] = 0
+            parent[side][origin] = -1
+            seen[side][origin] = version
+        best, meet = INF, -1
+        side = 1
+        while queues[0] or queues[1]:
+            # Se alternan los lados mientras ambos tengan frontera
+            side = 1 - side if queues[1 - side] else side
+            pq = queues[side]
+            if pq[0][0] >= best:
+                pq.clear()
+                continue
+            d_side, p_side, s_side, f_side = dist[side], parent[side], seen[side], done[side]
+            current_dist, u = heapq.heappop(pq)
+            if f_side[u] == version:
+                continue
+            f_side[u] = version
+            buffers.settled += 1
+            other = 1 - side
+            if seen[other][u] == version and current_dist + dist[other][u] < best:
+                best, meet = current_dist + dist[other][u], u
+            start, end = offsets[u], offsets[u + 1]
+            # Stall-on-demand: en un grafo no dirigido los vecinos de mayor rango de u son sus
+            # aristas ascendentes; si alguno ya ofrece una distancia menor a u, la etiqueta de u
+            # no es óptima y no vale la pena expandirla
+            stalled = False
+            for i in range(start, end):
+                v = targets[i]
+                if s_side[v] == version and d_side[v] + weights[i] < current_dist:
+                    stalled = True
+                    break
+            if stalled:
+                continue
+            for i in range(start, end):
+                v = targets[i]
+                distance = current_dist + weights[i]
+                if s_side[v] != version or distance < d_side[v]:
+                    s_side[v] = version
+                    d_side[v] = distance
+                    p_side[v] = u
+                    heapq.heappush(pq, (distance, v))
+        self.settled = buffers.settled
+        if meet < 0:
+            return INF, []
+        path = []
+        node = meet
+        while node >= 0:
+            path.append(node)
+            node = parent[0][node]
+        path.reverse()
+        node = parent[1][meet]
+        while node >= 0:
+            path.append(node)
+            node = parent[1][node]
+        return best, self._unpack(path)
+
+    def _unpack(self, path):
+        # Reemplaza cada atajo a-b por a-m-b recursivamente (con pila, sin recursión)
+        middle = self._middle
+        link_key = self.network.link_key
+        result = [path[0]]
+        for a, b in zip(path, path[1:]):
+            stack = [b]
+            current = a
+            while stack:
+                top = stack[-1]
+                mid = middle.get(link_key(current, top), -1)
+                if mid >= 0:
+                    stack.append(mid)
+                else:
+                    result.append(top)
+                    current = stack.pop()
+        return result
+
+    def _path_is_operational(self, ids):
+        network = self.network
+        if not network.has_failures:
+            return True
+        failed, failed_links = network.failure_mask()
+        link_key = network.link_key
+        if any(failed[v] for v in ids):
+            return False
+        return not failed_links or all(link_key(a, b) not in failed_links for a, b in zip(ids, ids[1:]))
+
+    def shortest_path(self, start, end):
+
+        # Ruta punto a punto: (distancia, ruta), igual que routing.shortest_path
+        network = self.network
+        source, target = network.node_id(start), network.node_id(end)
+        if source is None or target is None or network.is_failed(start) or network.is_failed(end):
+            return INF, []
+        if self._stale:
+            return bidirectional_dijkstra(network, start, end)
+        distance, ids = self._query(source, target)
+        # Las fallas solo alargan distancias: si la ruta óptima de la topología completa sigue
+        # operativa, también es óptima con fallas; si no, se resuelve sobre la red actual
+        if ids and not self._path_is_operational(ids):
+            return bidirectional_dijkstra(network, start, end)
+        if not ids and network.has_failures:
+            return INF, []
+        names = network.node_names
+        return distance, [names[v] for v in ids]
+
+    def dijkstra(self, start, end):
+
+        # (dist, prev) sobre la ruta encontrada, compatible con routing.reconstruct_path
+        network = self.network
+        distance, path = self.shortest_path(start, end)
+        if not path:
+            if start in network.nodes and not network.is_failed(start):
+                return {start: 0}, {start: None}
+            return {}, {}
+        dist, prev = {path[0]: 0}, {path[0]: None}
+        for a, b in zip(path, path[1:]):
+            dist[b] = dist[a] + network.link_weight(network.node_id(a), network.node_id(b))
+            prev[b] = a
+        return dist, prev
+
+    # --- Persistencia ---
+
+    def save(self, path):
+        # Escribe la jerarquía en un temporal y lo reemplaza de forma atómica
+        offsets, targets, weights, middles = self._up
+        header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(self.rank), len(targets), self._digest)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(header)
+                for arr in (weights, self.rank, offsets, targets, middles):
+                    f.write(arr)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[ADVERTENCIA] No se pudo guardar la jerarquía de contracción: {e}")
+            return False
+        return True
+
+    @classmethod
+    def load(cls, network, path, max_settled=60):
+        # Carga una jerarquía guardada; devuelve None si no existe o no corresponde a la red
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < _HEADER.size:
+            return None
+        magic, version, n, m, digest = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION or n != network.node_count:
+            return None
+        if len(data) != _HEADER.size + 8 * m + 4 * (n + (n + 1) + 2 * m):
+            return None
+        if digest != _topology_digest(network):
+            return None
+        pos = _HEADER.size
+        arrays = []
+        for code, count in (("q", m), ("i", n), ("i", n + 1), ("i", m), ("i", m)):
+            arr = array(code)
+            arr.frombytes(data[pos:pos + count * arr.itemsize])
+            pos += count * arr.itemsize
+            arrays.append(arr)
+        weights, rank, offsets, targets, middles = arrays
+        hierarchy = cls(network, max_settled=max_settled, build=False)
+        hierarchy._attach(rank, offsets, targets, weights, middles, digest)
+        return hierarchy
+
+
+if __name__ == "__main__":
+    import random
+
+    grid = Network()
+    grid.create_grid_topology(100, 100, seed=1)
+    started = time.perf_counter()
+    ch = ContractionHierarchy(grid)
+    print(f"Preproceso: {time.perf_counter() - started:.2f} s, {ch.shortcuts} atajos")
+    rng = random.Random(0)
+    names = grid.node_names
+    pairs = [(rng.choice(names), rng.choice(names)) for _ in range(500)]
+    started = time.perf_counter()
+    settled = 0
+    for s, t in pairs:
+        ch.shortest_path(s, t)
+        settled += ch.settled
+    elapsed = time.perf_counter() - started
+    print(f"Consulta CH: {1e6 * elapsed / len(pairs):.0f} µs, {settled / len(pairs):.1f} nodos fijados")
+    started = time.perf_counter()
+    for s, t in pairs:
+        bidirectional_dijkstra(grid, s, t)
+    elapsed = time.perf_counter() - started
+    print(f"Dijkstra bidireccional: {1e6 * elapsed / len(pairs):.0f} µs")
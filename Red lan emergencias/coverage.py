@@ -0,0 +1,173 @@
+# coverage.py
+
+import heapq
+
+from network import Network
+from routing import INF
+
+# Isócronas y cobertura de servicio por tipo de recurso: qué nodos alcanza cada tipo dentro de
+# un presupuesto de distancia (minutos, con los pesos estáticos de la red). La búsqueda se corta
+# al superar el presupuesto, así que su costo depende del tamaño de la isócrona y no de la red.
+
+
+def bounded_search(network, sources, budget):
+    # Dijkstra multi-fuente acotado: {id: distancia} de los nodos a distancia <= budget de
+    # alguna fuente (nombres); usa diccionarios para no recorrer arreglos de tamaño n
+    offsets, targets, weights = network.csr()
+    failed, failed_links = network.failure_mask()
+    link_key = network.link_key
+    dist = {}
+    pq = []
+    for source in sources:
+        s = network.node_id(source)
+        if s is not None and not failed[s] and s not in dist:
+            dist[s] = 0
+            pq.append((0, s))
+    heapq.heapify(pq)
+    settled = {}
+    while pq:
+        d, u = heapq.heappop(pq)
+        if u in settled:
+            continue
+        settled[u] = d
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            if v in settled or failed[v]:
+                continue
+            if failed_links and link_key(u, v) in failed_links:
+                continue
+            distance = d + weights[i]
+            if distance <= budget and distance < dist.get(v, INF):
+                dist[v] = distance
+                heapq.heappush(pq, (distance, v))
+    return settled
+
+
+def isochrones(network, resources, budget):
+    # {tipo: conjunto de nodos alcanzables en <= budget} para cada tipo de {tipo: [estaciones]}
+    names = network.node_names
+    return {
+        kind: {names[v] for v in bounded_search(network, stations, budget)}
+        for kind, stations in resources.items()
+    }
+
+
+# Cobertura por tipo de recurso mantenida de forma incremental. Cada estación guarda su isócrona
+# y cada nodo cuántas estaciones de cada tipo lo cubren. Ante un evento de la red solo se marcan
+# las estaciones cuya isócrona contiene los nodos afectados (o un vecino, si el cambio puede
+# ampliarla); se recalculan al consultar, de modo que una ráfaga de fallas cuesta una búsqueda
+# acotada por estación afectada.
+class CoverageTracker:
+    def __init__(self, network, resources, budget):
+        self.network = network
+        self.resources = {kind: list(stations) for kind, stations in resources.items()}
+        self.budget = budget
+        self.searches = 0
+        self._stations = sorted({s for stations in self.resources.values() for s in stations})
+        network.subscribe(self._on_network_event)
+        self.rebuild()
+
+    def close(self):
+
+        self.network.unsubscribe(self._on_network_event)
+
+    def rebuild(self):
+        # Recalcula todas las isócronas desde cero
+        n = self.network.node_count
+        self._balls = {station: {} for station in self._stations}
+        self._counts = {kind: [0] * n for kind in self.resources}
+        self._covered = dict.fromkeys(self.resources, 0)
+        self._dirty = set(self._stations)
+
+    def _resize(self):
+        n = self.network.node_count
+        for counts in self._counts.values():
+            if len(counts) < n:
+                counts.extend([0] * (n - len(counts)))
+
+    # --- Eventos de la red ---
+
+    def _mark(self, nodes, station_ids=()):
+        # Marca las estaciones cuya isócrona toca alguno de los nodos indicados
+        for station, ball in self._balls.items():
+            if station in self._dirty:
+                continue
+            if any(v in ball for v in nodes) or self.network.node_id(station) in station_ids:
+                self._dirty.add(station)
+
+    def _on_network_event(self, event, *args):
+        if event == "topology_replaced":
+            self.rebuild()
+            return
+        self._resize()
+        if event == "node_failed":
+            self._mark(args[:1], args[:1])
+        elif event == "node_restored":
+            x = args[0]
+            offsets, targets, _ = self.network.csr()
+            self._mark([targets[i] for i in range(offsets[x], offsets[x + 1])], args[:1])
+        elif event in ("edge_added", "edge_removed", "weight_changed", "link_failed", "link_restored"):
+            self._mark(args[:2], args[:2])
+
+    def _refresh(self):
+        # Recalcula las isócronas marcadas y actualiza los contadores por tipo
+        if not self._dirty:
+            return
+        for station in self._dirty:
+            old = self._balls[station]
+            new = bounded_search(self.network, [station], self.budget)
+            self.searches += 1
+            for kind, stations in self.resources.items():
+                if station not in stations:
+                    continue
+                counts = self._counts[kind]
+                for v in old:
+                    if v not in new:
+                        counts[v] -= 1
+                        if not counts[v]:
+                            self._covered[kind] -= 1
+                for v in new:
+                    if v not in old:
+                        if not counts[v]:
+                            self._covered[kind] += 1
+                        counts[v] += 1
+            self._balls[station] = new
+        self._dirty.clear()
+
+    # --- Consultas ---
+
+    def coverage(self):
+        # {tipo: fracción de nodos operativos a <= budget de alguna estación del tipo}
+        self._refresh()
+        failed, _ = self.network.failure_mask()
+        operational = self.network.node_count - sum(failed)
+        return {kind: covered / operational if operational else 0.0 for kind, covered in self._covered.items()}
+
+    def isochrone(self, kind):
+        # Nodos que el tipo de recurso alcanza dentro del presupuesto
+        self._refresh()
+        names = self.network.node_names
+        counts = self._counts[kind]
+        return {names[v] for v in range(len(counts)) if counts[v]}
+
+    def uncovered(self, kind):
+
+        self._refresh()
+        failed, _ = self.network.failure_mask()
+        names = self.network.node_names
+        counts = self._counts[kind]
+        return {names[v] for v in range(len(counts)) if not counts[v] and not failed[v]}
+
+
+if __name__ == "__main__":
+    grid = Network()
+    grid.create_grid_topology(60, 60, seed=1)
+    recursos = {
+        "bomberos": ["N10_10", "N10_50", "N50_30"],
+        "ambulancia": ["N30_30", "N5_55"],
+    }
+    tracker = CoverageTracker(grid, recursos, budget=60)
+    print({kind: f"{value:.1%}" for kind, value in tracker.coverage().items()})
+    for node in ("N30_31", "N30_29", "N31_30", "N29_30"):
+        grid.fail_node(node)
+    print({kind: f"{value:.1%}" for kind, value in tracker.coverage().items()}, f"búsquedas: {tracker.searches}")
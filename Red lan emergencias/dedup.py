@@ -0,0 +1,94 @@
+# dedup.py
+
+from datetime import datetime
+
+# Detección de reportes duplicados. Durante una crisis el mismo incidente se reporta muchas
+# veces desde el mismo lugar o desde nodos vecinos. Regla de vecindad: un reporte corresponde
+# al incidente de su misma ubicación o de un vecino directo unido por un enlace de a lo sumo
+# radius minutos (peso estático del enlace); con radius=0 solo cuenta la misma ubicación (o
+# nodos unidos por enlaces de peso 0, que representan el mismo sitio). Cada incidente pendiente se indexa con la
+# clave (ubicación, franja de tiempo, tipo) en un diccionario por franja; cada clave guarda una
+# lista corta de ids, porque puede haber varios incidentes distintos del mismo tipo en el mismo
+# lugar. Un reporte nuevo consulta su ubicación y sus vecinos cercanos en la franja actual y la
+# anterior, así que la búsqueda cuesta O(grado) sin ninguna búsqueda de rutas. Las franjas
+# viejas se descartan completas a medida que avanza el tiempo (índice rodante).
+class ReportDeduplicator:
+    def __init__(self, network, manager, window_minutes=15, radius=0):
+        self.network = network
+        self.manager = manager
+        self.window = window_minutes * 60
+        self.radius = radius
+        self.merged = 0
+        self._buckets = {}
+        for emergency in manager.pending():
+            self.register(emergency)
+
+    def _bucket(self, moment):
+
+        return int(moment.timestamp() // self.window)
+
+    @staticmethod
+    def _kind(emergency_type):
+
+        return str(emergency_type).strip().lower()
+
+    def _neighborhood(self, location):
+        # La ubicación y sus vecinos directos por enlaces de peso <= radius (ubicaciones fuera de
+        # la red: solo ella misma)
+        return [location] + [v for v, w in self.network.neighbors(location) if v != location and w <= self.radius]
+
+    def _expire(self, current):
+        # Solo sirven la franja actual y la anterior
+        for bucket in [b for b in self._buckets if b < current - 1]:
+            del self._buckets[bucket]
+
+    def register(self, emergency):
+        # Indexa un incidente nuevo para que los reportes siguientes se puedan agrupar con él
+        bucket = self._bucket(emergency.timestamp)
+        current = self._bucket(datetime.now())
+        self._expire(current)
+        if bucket < current - 1:
+            return
+        key = (emergency.location, self._kind(emergency.emergency_type))
+        self._buckets.setdefault(bucket, {}).setdefault(key, []).append(emergency.id)
+
+    def find(self, location, emergency_type, when=None):
+        # Incidente pendiente del mismo tipo en la zona y en la ventana de tiempo, o None. Entre
+        # varios candidatos gana el de la misma ubicación, luego el más grave y luego el más
+        # antiguo; los ids ya atendidos se quitan del índice al pasar
+        current = self._bucket(when or datetime.now())
+        self._expire(current)
+        kind = self._kind(emergency_type)
+        best, best_key = None, None
+        for bucket in (current, current - 1):
+            index = self._buckets.get(bucket)
+            if not index:
+                continue
+            for rank, node in enumerate(self._neighborhood(location)):
+                ids = index.get((node, kind))
+                if not ids:
+                    continue
+                live = []
+                for emergency_id in ids:
+                    emergency = self.manager.get(emergency_id)
+                    if emergency is None or emergency.attended:
+                        continue
+                    live.append(emergency_id)
+                    severity = emergency.severity if isinstance(emergency.severity, (int, float)) else 0
+                    key = (rank > 0, -severity, emergency.timestamp)
+                    if best_key is None or key < best_key:
+                        best, best_key = emergency, key
+                if live:
+                    ids[:] = live
+                else:
+                    del index[(node, kind)]
+        return best
+
+    def merge(self, location, severity, emergency_type, description=""):
+        # Agrupa el reporte con un incidente existente; devuelve el incidente o None si es nuevo
+        emergency = self.find(location, emergency_type)
+        if emergency is None:
+            return None
+        self.manager.merge_report(emergency, location, severity, description)
+        self.merged += 1
+        return emergency
@@ -0,0 +1,100 @@
+# distance_matrix.py
+
+import weakref
+
+from routing import INF, _dijkstra_ids
+
+try:
+    import numpy as np
+except ImportError:  # Sin NumPy el resultado es una lista de listas
+    np = None
+
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import dijkstra as _csgraph_dijkstra
+except ImportError:  # SciPy es opcional: sin él se usa Dijkstra repetido en Python
+    csr_matrix = None
+
+# Matriz dispersa de la red operativa por red, reutilizada mientras no cambie su versión. Guarda
+# ambos sentidos de cada enlace y los pesos 0 como ceros explícitos (csgraph trata el 0 de una
+# matriz densa como "sin enlace", pero un cero explícito de una dispersa como enlace)
+_sparse_cache = weakref.WeakKeyDictionary()
+
+
+def to_sparse(network):
+    # Exporta la red operativa (sin nodos ni enlaces caídos) a una matriz CSR de SciPy n x n
+    if csr_matrix is None:
+        raise RuntimeError("to_sparse requiere SciPy")
+    cached = _sparse_cache.get(network)
+    if cached is not None and cached[0] == network.version:
+        return cached[1]
+    n = network.node_count
+    offsets, targets, weights = network.csr()
+    failed, failed_links = network.failure_mask()
+    indptr = np.frombuffer(offsets, dtype=np.int32)
+    src = np.repeat(np.arange(n, dtype=np.int64), np.diff(indptr))
+    dst = np.frombuffer(targets, dtype=np.int32).astype(np.int64)
+    data = np.frombuffer(weights, dtype=np.int64).astype(float)
+    down = np.frombuffer(bytes(failed), dtype=np.uint8).astype(bool)
+    alive = ~down[src] & ~down[dst]
+    if failed_links:
+        lo, hi = np.minimum(src, dst), np.maximum(src, dst)
+        alive &= ~np.isin((lo << 32) | hi, np.fromiter(failed_links, dtype=np.int64))
+    matrix = csr_matrix((data[alive], (src[alive], dst[alive])), shape=(n, n))
+    # csgraph solo respeta los enlaces de peso 0 si quedan como ceros explícitos en la matriz
+    if matrix.nnz != int(alive.sum()):
+        raise ValueError("la matriz dispersa perdió enlaces de peso 0")
+    _sparse_cache[network] = (network.version, matrix)
+    return matrix
+
+
+def _ids(network, names):
+    # Ids de los nodos operativos; -1 para nombres desconocidos o nodos caídos
+    ids = []
+    for name in names:
+        node_id = network.node_id(name)
+        ids.append(-1 if node_id is None or network.is_failed(name) else node_id)
+    return ids
+
+
+def distance_matrix(network, sources, targets):
+    # Distancias más cortas entre cada fuente y cada destino (filas = sources, columnas =
+    # targets) sobre la red operativa; inf si no hay ruta. Como la red es no dirigida, las
+    # búsquedas parten del lado más corto y se transpone al final.
+    source_ids, target_ids = _ids(network, sources), _ids(network, targets)
+    transpose = len(target_ids) < len(source_ids)
+    if transpose:
+        source_ids, target_ids = target_ids, source_ids
+    rows = sorted({i for i in source_ids if i >= 0})
+    matrix = None
+    if csr_matrix is not None and rows:
+        try:
+            matrix = to_sparse(network)
+        except ValueError as error:
+            print(f"distance_matrix: {error}; se usa Dijkstra en Python")
+    if matrix is not None:
+        # Una sola llamada vectorizada para todas las filas; la matriz ya tiene los dos sentidos
+        dist = _csgraph_dijkstra(matrix, directed=True, indices=rows)
+        row_of = {i: r for r, i in enumerate(rows)}
+        result = np.full((len(source_ids), len(target_ids)), np.inf)
+        valid_rows = [r for r, i in enumerate(source_ids) if i >= 0]
+        valid_cols = [c for c, j in enumerate(target_ids) if j >= 0]
+        if valid_rows and valid_cols:
+            picked = dist[np.ix_([row_of[source_ids[r]] for r in valid_rows], [target_ids[c] for c in valid_cols])]
+            result[np.ix_(valid_rows, valid_cols)] = picked
+        return result.T if transpose else result
+    result = []
+    computed = {}
+    for i in source_ids:
+        if i < 0:
+            result.append([INF] * len(target_ids))
+            continue
+        if i not in computed:
+            computed[i], _ = _dijkstra_ids(network, i)
+        dist = computed[i]
+        result.append([dist[j] if j >= 0 else INF for j in target_ids])
+    if transpose:
+        result = [[row[c] for row in result] for c in range(len(target_ids))]
+    if np is not None:
+        return np.array(result, dtype=float).reshape(len(sources), len(targets))
+    return result
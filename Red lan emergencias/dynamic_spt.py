@@ -0,0 +1,243 @@
+# dynamic_spt.py
+
+import heapq
+
+from routing import INF, _dijkstra_ids
+
+# Árbol de rutas más cortas desde una fuente que se repara de forma incremental (al estilo
+# Ramalingam–Reps) con los eventos de la red. Un aumento de costo (falla de nodo o enlace,
+# arista eliminada, peso mayor en una arista del árbol) solo invalida el subárbol colgado de
+# ella: esos nodos toman el mejor vecino no afectado y se propaga con Dijkstra. Una mejora
+# (restauración, arista nueva, peso menor) se propaga desde los extremos que mejoran. En
+# ambos casos el trabajo es proporcional a los nodos cuya distancia cambia y sus vecinos.
+class DynamicShortestPathTree:
+    def __init__(self, network, source, subscribe=True):
+        self.network = network
+        self.source = source
+        self.nodes_touched = 0
+        self._subscribed = subscribe
+        if subscribe:
+            network.subscribe(self.on_network_event)
+        self.rebuild()
+
+    def close(self):
+
+        if self._subscribed:
+            self.network.unsubscribe(self.on_network_event)
+            self._subscribed = False
+
+    def rebuild(self):
+        # Cálculo completo desde cero (al crear el árbol o si cae o se reemplaza la fuente)
+        network = self.network
+        source_id = network.node_id(self.source)
+        n = network.node_count
+        if source_id is None or network.is_failed(self.source):
+            self.dist, self.parent = [INF] * n, [-1] * n
+        else:
+            self.dist, self.parent = _dijkstra_ids(network, source_id)
+        self._source_id = source_id
+        self.nodes_touched += n
+
+    def _resize(self):
+        grow = self.network.node_count - len(self.dist)
+        if grow > 0:
+            self.dist.extend([INF] * grow)
+            self.parent.extend([-1] * grow)
+
+    # --- Eventos de la red ---
+
+    def on_network_event(self, event, *args):
+        # El árbol usa los pesos estáticos: un perfil horario no lo cambia
+        if event == "profile_changed":
+            return
+        if event == "topology_replaced":
+            self.rebuild()
+            return
+        self._resize()
+        if self._source_id is None:
+            # La fuente todavía no existía en la red
+            if self.network.node_id(self.source) is not None:
+                self.rebuild()
+            return
+        if event == "node_failed":
+            if args[0] == self._source_id:
+                self.rebuild()
+            else:
+                self._raise_subtree(args[0])
+        elif event == "node_restored":
+            if args[0] == self._source_id:
+                self.rebuild()
+            else:
+                self._lower_from(args[0])
+        elif event in ("link_failed", "edge_removed"):
+            self._cut(args[0], args[1])
+        elif event in ("link_restored", "edge_added"):
+            self._lower_from(args[0], args[1])
+        elif event == "weight_changed":
+            a, b, old, new = args
+            if new < old:
+                self._lower_from(a, b)
+            elif new > old:
+                self._cut(a, b)
+
+    def _cut(self, a, b):
+        # Solo importa si a-b es arista del árbol: se invalida el subárbol del hijo
+        if self.parent[b] == a:
+            self._raise_subtree(b)
+        elif self.parent[a] == b:
+            self._raise_subtree(a)
+
+    def _subtree(self, root):
+        # Hijos de u = vecinos cuyo padre es u; se recorre solo el subárbol afectado
+        offsets, targets, _ = self.network.csr()
+        parent = self.parent
+        nodes = [root]
+        stack = [root]
+        while stack:
+            u = stack.pop()
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                if parent[v] == u:
+                    parent[v] = -2  # marca temporal para no repetir nodos
+                    nodes.append(v)
+                    stack.append(v)
+        return nodes
+
+    def _raise_subtree(self, root):
+        if self.dist[root] == INF:
+            return
+        network = self.network
+        offsets, targets, weights = network.csr()
+        failed, failed_links = network.failure_mask()
+        link_key = network.link_key
+        dist, parent = self.dist, self.parent
+        affected = self._subtree(root)
+        for v in affected:
+            dist[v] = INF
+            parent[v] = -1
+        # Cada nodo afectado toma su mejor vecino fuera del subárbol
+        heap = []
+        for v in affected:
+            if failed[v]:
+                continue
+            best, via = INF, -1
+            for i in range(offsets[v], offsets[v + 1]):
+                u = targets[i]
+                if dist[u] == INF or failed[u]:
+                    continue
+                if failed_links and link_key(u, v) in failed_links:
+                    continue
+                if dist[u] + weights[i] < best:
+                    best, via = dist[u] + weights[i], u
+            if via >= 0:
+                dist[v], parent[v] = best, via
+                heap.append((best, v))
+        heapq.heapify(heap)
+        self.nodes_touched += len(affected)
+        self._propagate(heap)
+
+    def _lower_from(self, *nodes):
+        # Un nodo o enlace vuelve a estar disponible: se relajan sus extremos y se propaga
+        network = self.network
+        offsets, targets, weights = network.csr()
+        failed, failed_links = network.failure_mask()
+        link_key = network.link_key
+        dist, parent = self.dist, self.parent
+        heap = []
+        for v in nodes:
+            if failed[v]:
+                continue
+            for i in range(offsets[v], offsets[v + 1]):
+                u = targets[i]
+                if dist[u] == INF or failed[u]:
+                    continue
+                if failed_links and link_key(u, v) in failed_links:
+                    continue
+                if dist[u] + weights[i] < dist[v]:
+                    dist[v], parent[v] = dist[u] + weights[i], u
+            if dist[v] != INF:
+                heap.append((dist[v], v))
+        heapq.heapify(heap)
+        self._propagate(heap)
+
+    def _propagate(self, heap):
+        # Dijkstra a partir de los nodos cuya distancia bajó
+        network = self.network
+        offsets, targets, weights = network.csr()
+        failed, failed_links = network.failure_mask()
+        link_key = network.link_key
+        dist, parent = self.dist, self.parent
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            self.nodes_touched += 1
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                if failed[v]:
+                    continue
+                distance = d + weights[i]
+                if distance < dist[v]:
+                    if failed_links and link_key(u, v) in failed_links:
+                        continue
+                    dist[v] = distance
+                    parent[v] = u
+                    heapq.heappush(heap, (distance, v))
+
+    # --- Consultas ---
+
+    def distance(self, node):
+
+        node_id = self.network.node_id(node)
+        return INF if node_id is None else self.dist[node_id]
+
+    def path(self, node):
+        # Ruta fuente -> node siguiendo los padres del árbol
+        node_id = self.network.node_id(node)
+        if node_id is None or self.dist[node_id] == INF:
+            return []
+        names, parent = self.network.node_names, self.parent
+        path = []
+        while node_id >= 0:
+            path.append(names[node_id])
+            node_id = parent[node_id]
+        return path[::-1]
+
+
+# Un árbol dinámico por estación, con una sola suscripción a la red que reparte los eventos
+class StationTrees:
+    def __init__(self, network, stations):
+        self.network = network
+        self.trees = {station: DynamicShortestPathTree(network, station, subscribe=False) for station in stations}
+        network.subscribe(self._on_network_event)
+
+    def close(self):
+
+        self.network.unsubscribe(self._on_network_event)
+
+    def _on_network_event(self, event, *args):
+        for tree in self.trees.values():
+            tree.on_network_event(event, *args)
+
+    def __contains__(self, station):
+        return station in self.trees
+
+    def distance(self, station, node):
+
+        return self.trees[station].distance(node)
+
+    def path(self, station, node):
+
+        return self.trees[station].path(node)
+
+    def nearest(self, node, stations=None):
+        # Estación más cercana a node entre las indicadas: (estación, distancia, ruta estación -> node)
+        candidates = [s for s in (self.trees if stations is None else stations) if s in self.trees]
+        best, best_dist = None, INF
+        for station in candidates:
+            d = self.trees[station].distance(node)
+            if d < best_dist:
+                best, best_dist = station, d
+        if best is None:
+            return None, INF, []
+        return best, best_dist, self.trees[best].path(node)
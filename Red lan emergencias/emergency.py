@@ -1,43 +1,326 @@
-
 from datetime import datetime
+import heapq
 import uuid
 
+# Registro con __slots__: sin diccionario por instancia. Incluye los campos que la interfaz
+# asigna después de crearla (estación, recursos, si es simulada)
 class Emergency:
-    
+    __slots__ = ("id", "location", "severity", "emergency_type", "description", "timestamp", "status",
+                 "assigned_station", "attended", "assigned_resources", "simulada", "reports", "_order")
+
     def __init__(self, location, severity, emergency_type, description=""):
-        self.id = str(uuid.uuid4())[:8]  
-        self.location = location         
-        self.severity = severity         
-        self.emergency_type = emergency_type  
-        self.description = description   
-        self.timestamp = datetime.now()  
-        self.status = "PENDIENTE"        
+        self.id = str(uuid.uuid4())[:8]
+        self.location = location
+        self.severity = severity
+        self.emergency_type = emergency_type
+        self.description = description
+        self.timestamp = datetime.now()
+        self.status = "PENDIENTE"
+        self.assigned_station = None
+        self.attended = False
+        self.assigned_resources = None
+        self.simulada = False
+        self.reports = 1
+        self._order = 0
 
     def __str__(self):
         # Representación legible de la emergencia
         return f"[{self.id}] {self.emergency_type} en {self.location} (Gravedad: {self.severity})"
 
+    def to_record(self):
+        # Diccionario serializable a JSON (registro de eventos e instantáneas)
+        return {
+            "id": self.id,
+            "location": self.location,
+            "severity": self.severity,
+            "emergency_type": self.emergency_type,
+            "description": self.description,
+            "timestamp": self.timestamp.isoformat(),
+            "status": self.status,
+            "assigned_station": self.assigned_station,
+            "attended": self.attended,
+            "assigned_resources": self.assigned_resources,
+            "simulada": self.simulada,
+            "reports": self.reports,
+        }
+
+    @classmethod
+    def from_record(cls, record):
+
+        emergency = cls(record["location"], record["severity"], record["emergency_type"], record["description"])
+        emergency.id = record["id"]
+        emergency.timestamp = datetime.fromisoformat(record["timestamp"])
+        emergency.status = record["status"]
+        emergency.assigned_resources = record.get("assigned_resources")
+        emergency.simulada = record.get("simulada", False)
+        emergency.reports = record.get("reports", 1)
+        return emergency
+
+# Gestor indexado de emergencias. Todas viven en un diccionario por id; las pendientes tienen
+# además un índice por estación asignada y montículos de urgencia (gravedad y antigüedad),
+# uno global y uno por estación. Las entradas obsoletas de los montículos (emergencias ya
+# atendidas o reasignadas) se descartan al llegar a la cima, así que atender y reasignar son
+# O(1) y O(log n), y la siguiente emergencia más urgente es O(log n) amortizado. Con un
+# archive (archive.EmergencyArchive) las atendidas pueden pasar al archivo columnar, y con un
+# journal (event_log.EmergencyJournal) cada cambio se anexa al registro de eventos, y con un
+# store (emergency_store.EmergencyStore) queda en el historial consultable de SQLite.
 class EmergencyManager:
-    
-    def __init__(self):
-        self.emergencies = []            
-        self.attended_emergencies = []  
 
-    def add_emergency(self, location, severity, emergency_type, description=""):
-        
+    def __init__(self, archive=None, store=None):
+        self.archive = archive
+        self.store = store
+        self.journal = None
+        self._reset()
+
+    def _reset(self):
+        self._archived = 0
+        self._by_id = {}
+        self._pending = {}
+        self._by_station = {}
+        self._heap = []
+        self._station_heaps = {}
+        self._attended_count = 0
+        self._next_order = 0
+
+    def _record(self, event, subject=None, **data):
+        # Notifica un cambio al registro de eventos y, si hay emergencia afectada, al historial
+        # (con la secuencia del evento, para que la recuperación sepa qué ya está escrito)
+        sequence = self.journal.record(event, **data) if self.journal is not None else None
+        if self.store is not None and subject is not None:
+            self.store.save(subject, sequence)
+
+    @property
+    def emergencies(self):
+        # Emergencias en memoria (sin las archivadas) en orden de registro
+        return list(self._by_id.values())
+
+    @property
+    def attended_emergencies(self):
+
+        return [e for e in self._by_id.values() if e.attended]
+
+    def add_emergency(self, location, severity, emergency_type, description="", station=None):
+
         emergency = Emergency(location, severity, emergency_type, description)
-        self.emergencies.append(emergency)
+        # Los ids cortos pueden repetirse con cientos de miles de emergencias
+        while emergency.id in self._by_id:
+            emergency.id = str(uuid.uuid4())[:8]
+        self._insert(emergency, station)
+        self._record("created", emergency, emergency=emergency.to_record())
         return emergency
 
+    def _insert(self, emergency, station=None):
+        emergency._order = self._next_order
+        self._next_order += 1
+        self._by_id[emergency.id] = emergency
+        self._pending[emergency.id] = emergency
+        entry = (self._urgency(emergency), emergency._order, emergency.id)
+        heapq.heappush(self._heap, entry)
+        if station is not None:
+            self._assign(emergency, station)
+
+    @staticmethod
+    def _urgency(emergency):
+        # Clave de montículo: mayor gravedad primero (las gravedades no numéricas van al final)
+        severity = emergency.severity
+        return -severity if isinstance(severity, (int, float)) else 0
+
+    def get(self, emergency_id):
+
+        return self._by_id.get(emergency_id)
+
+    def assign(self, emergency, station):
+        # Asigna (o reasigna) una emergencia pendiente a una estación; None la deja sin asignar
+        self._assign(emergency, station)
+        self._record("assigned", emergency, id=emergency.id, station=station)
+
+    def _assign(self, emergency, station):
+        if emergency.id not in self._pending:
+            emergency.assigned_station = station
+            return
+        previous = emergency.assigned_station
+        if previous is not None:
+            bucket = self._by_station.get(previous)
+            if bucket is not None:
+                bucket.pop(emergency.id, None)
+                if not bucket:
+                    del self._by_station[previous]
+        emergency.assigned_station = station
+        if station is not None:
+            self._by_station.setdefault(station, {})[emergency.id] = emergency
+            heap = self._station_heaps.setdefault(station, [])
+            heapq.heappush(heap, (self._urgency(emergency), emergency._order, emergency.id))
+            self._compact(heap, len(self._by_station[station]))
+
+    def annotate(self, emergency, assigned_resources=None, simulada=None):
+        # Datos complementarios que la interfaz agrega después de registrar la emergencia
+        if assigned_resources is not None:
+            emergency.assigned_resources = assigned_resources
+        if simulada is not None:
+            emergency.simulada = simulada
+        self._record("annotated", emergency, id=emergency.id, assigned_resources=assigned_resources, simulada=simulada)
+
+    def merge_report(self, emergency, location, severity, description=""):
+        # Suma un reporte duplicado a un incidente existente; si el nuevo es más grave, el
+        # incidente sube de prioridad (la entrada anterior del montículo queda obsoleta)
+        self._merge(emergency, severity, description)
+        self._record("merged", emergency, id=emergency.id, location=location, severity=severity, description=description)
+
+    def _merge(self, emergency, severity, description):
+        emergency.reports += 1
+        if description and description not in emergency.description:
+            emergency.description = f"{emergency.description} | {description}" if emergency.description else description
+        if not isinstance(severity, (int, float)) or self._urgency(emergency) <= -severity:
+            return
+        emergency.severity = severity
+        if emergency.id in self._pending:
+            entry = (self._urgency(emergency), emergency._order, emergency.id)
+            heapq.heappush(self._heap, entry)
+            station = emergency.assigned_station
+            if station is not None:
+                heapq.heappush(self._station_heaps.setdefault(station, []), entry)
+
     def attend_emergency(self, emergency):
-        
-        if emergency in self.emergencies and emergency not in self.attended_emergencies:
-            self.attended_emergencies.append(emergency)
+
+        if not self._attend(emergency):
+            return False
+        self._record("attended", emergency, id=emergency.id)
+        return True
+
+    def _attend(self, emergency):
+        if self._pending.pop(emergency.id, None) is None:
+            return False
+        station = emergency.assigned_station
+        if station is not None:
+            bucket = self._by_station.get(station)
+            if bucket is not None:
+                bucket.pop(emergency.id, None)
+                if not bucket:
+                    del self._by_station[station]
+            heap = self._station_heaps.get(station)
+            if heap is not None:
+                self._compact(heap, len(self._by_station.get(station, ())))
+        self._compact(self._heap, len(self._pending))
+        emergency.attended = True
+        emergency.status = "ATENDIDA"
+        self._attended_count += 1
+        return True
+
+    def pending(self, station=None, by_urgency=False):
+        # Emergencias pendientes (de una estación, si se indica), en orden de registro o de urgencia
+        source = self._pending if station is None else self._by_station.get(station, {})
+        result = list(source.values())
+        if by_urgency:
+            result.sort(key=lambda e: (self._urgency(e), e._order))
+        elif station is not None:
+            # Una reasignación deja la emergencia al final del grupo de la estación
+            result.sort(key=lambda e: e._order)
+        return result
+
+    def pending_count(self, station=None):
+
+        return len(self._pending) if station is None else len(self._by_station.get(station, ()))
+
+    def next_urgent(self, station=None):
+        # Emergencia pendiente más urgente (global o de una estación), sin quitarla
+        if station is None:
+            heap, live = self._heap, self._pending
+        else:
+            heap, live = self._station_heaps.get(station, []), self._by_station.get(station, {})
+        while heap:
+            emergency = live.get(heap[0][2])
+            if emergency is not None and (station is None or emergency.assigned_station == station):
+                return emergency
+            heapq.heappop(heap)
+        return None
+
+    def _compact(self, heap, live):
+        # Reconstruye un montículo cuando las entradas obsoletas superan a las vivas
+        if len(heap) > 2 * live + 64:
+            heap[:] = [entry for entry in heap if self._is_live(entry[2], heap)]
+            heapq.heapify(heap)
+
+    def _is_live(self, emergency_id, heap):
+        emergency = self._pending.get(emergency_id)
+        if emergency is None:
+            return False
+        return heap is self._heap or self._station_heaps.get(emergency.assigned_station) is heap
+
+    def archive_attended(self):
+        # Mueve las emergencias atendidas al archivo columnar; devuelve cuántas se archivaron
+        if self.archive is None:
+            return 0
+        attended = [e for e in self._by_id.values() if e.attended]
+        if not attended:
+            return 0
+        self.archive.extend(attended)
+        for emergency in attended:
+            del self._by_id[emergency.id]
+        self._archived += len(attended)
+        self._record("archived")
+        return len(attended)
+
+    # --- Persistencia (event_log) ---
+
+    def snapshot(self):
+        # Estado completo serializable a JSON
+        return {
+            "emergencies": [e.to_record() for e in self._by_id.values()],
+            "archived": self._archived,
+        }
+
+    def load_snapshot(self, state):
+
+        self._reset()
+        for record in state["emergencies"]:
+            emergency = Emergency.from_record(record)
+            self._insert(emergency, record.get("assigned_station"))
+            if record.get("attended"):
+                self._attend(emergency)
+                emergency.status = record["status"]
+        self._archived = state.get("archived", 0)
+        self._attended_count += self._archived
+
+    def apply_event(self, event, sequence=None):
+        # Repite un evento del registro sin volver a anotarlo. El historial se actualiza solo
+        # con los eventos posteriores a su último lote escrito (la aplicación pudo cerrarse antes
+        # de escribirlo); los anteriores ya están en la base
+        kind = event["event"]
+        if kind == "created":
+            record = event["emergency"]
+            emergency = Emergency.from_record(record)
+            self._insert(emergency, record.get("assigned_station"))
+            self._save_replayed(emergency, sequence)
+            return
+        if kind == "archived":
+            journal, self.journal = self.journal, None
+            self.archive_attended()
+            self.journal = journal
+            return
+        emergency = self._by_id.get(event.get("id"))
+        if emergency is None:
+            return
+        if kind == "assigned":
+            self._assign(emergency, event["station"])
+        elif kind == "annotated":
+            if event.get("assigned_resources") is not None:
+                emergency.assigned_resources = event["assigned_resources"]
+            if event.get("simulada") is not None:
+                emergency.simulada = event["simulada"]
+        elif kind == "merged":
+            self._merge(emergency, event["severity"], event["description"])
+        elif kind in ("attended", "resolved"):
+            self._attend(emergency)
+        self._save_replayed(emergency, sequence)
+
+    def _save_replayed(self, emergency, sequence):
+        if self.store is not None and (sequence is None or sequence > self.store.flushed_sequence):
+            self.store.save(emergency, sequence)
 
     def get_statistics(self):
-        
-        total = len(self.emergencies)
-        attended = len(self.attended_emergencies)
+
+        total = len(self._by_id) + self._archived
+        attended = self._attended_count
         pending = total - attended
         return {
             "total": total,
@@ -53,4 +336,3 @@ emergency_type = "Fallo Crítico"
 description = "El nodo 42 ha dejado de funcionar y necesita atención inmediata."
 
 emergency = emergency_manager.add_emergency(failed_node, severity, emergency_type, description)
-
@@ -0,0 +1,231 @@
+# emergency_store.py
+
+import sqlite3
+from datetime import datetime
+
+# Historial de emergencias en SQLite para análisis posterior. La base trabaja en modo WAL (las
+# lecturas no bloquean a la escritura) y los cambios se acumulan en memoria y se escriben por
+# lotes con executemany sobre una sentencia preparada. Las fechas se guardan en ISO 8601, que
+# se ordena igual que el tiempo, y los índices compuestos cubren las consultas por ventana de
+# tiempo, por ubicación en el tiempo, por tipo y estado y por estación.
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS emergencies (
+    id TEXT PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    location TEXT,
+    severity INTEGER,
+    type TEXT,
+    description TEXT,
+    status TEXT,
+    station TEXT,
+    attended INTEGER NOT NULL DEFAULT 0,
+    simulated INTEGER NOT NULL DEFAULT 0,
+    resources TEXT,
+    reports INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_emergencies_timestamp ON emergencies (timestamp);
+CREATE INDEX IF NOT EXISTS idx_emergencies_location_timestamp ON emergencies (location, timestamp);
+CREATE INDEX IF NOT EXISTS idx_emergencies_type_status ON emergencies (type, status);
+CREATE INDEX IF NOT EXISTS idx_emergencies_station_timestamp ON emergencies (station, timestamp);
+CREATE TABLE IF NOT EXISTS journal_progress (
+    log_id TEXT PRIMARY KEY,
+    sequence INTEGER NOT NULL
+);
+"""
+
+_UPSERT = """
+INSERT INTO emergencies (id, timestamp, location, severity, type, description, status, station, attended, simulated, resources, reports)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    severity = excluded.severity, description = excluded.description,
+    status = excluded.status, station = excluded.station, attended = excluded.attended,
+    simulated = excluded.simulated, resources = excluded.resources, reports = excluded.reports
+"""
+
+_PROGRESS = """
+INSERT INTO journal_progress (log_id, sequence) VALUES (?, ?)
+ON CONFLICT (log_id) DO UPDATE SET sequence = excluded.sequence
+"""
+
+_COLUMNS = ("id", "timestamp", "location", "severity", "type", "description", "status", "station",
+            "attended", "simulated", "resources", "reports")
+
+# Columnas por las que se puede agrupar en count_by
+_GROUPABLE = {"location", "type", "status", "station", "severity", "attended", "simulated"}
+
+
+def _iso(moment):
+
+    return moment.isoformat() if isinstance(moment, datetime) else moment
+
+
+class EmergencyStore:
+    def __init__(self, path="emergencias.db", batch_size=1000):
+        self.path = path
+        self.batch_size = batch_size
+        self._pending = {}
+        # Registro de eventos seguido y última secuencia suya cuyos cambios ya están en la base
+        self._log_id = None
+        self.flushed_sequence = 0
+        self._pending_sequence = 0
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Con WAL, NORMAL solo sincroniza en los checkpoints; el registro de eventos es la fuente
+        # durable del estado vivo
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        # Bases creadas antes de que se agruparan reportes duplicados
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(emergencies)")}
+        if "reports" not in columns:
+            with self._conn:
+                self._conn.execute("ALTER TABLE emergencies ADD COLUMN reports INTEGER NOT NULL DEFAULT 1")
+
+    def _row(self, emergency):
+        # Acepta tanto emergency.Emergency como el Emergency del simulador
+        emergency_type = getattr(emergency.emergency_type, "value", emergency.emergency_type)
+        severity = getattr(emergency, "severity", None)
+        if severity is None and hasattr(emergency, "priority"):
+            severity = emergency.priority.value
+        if not isinstance(severity, int):
+            severity = None
+        resources = getattr(emergency, "assigned_resources", None) or getattr(emergency, "resources_assigned", None)
+        return (
+            emergency.id,
+            _iso(emergency.timestamp),
+            emergency.location,
+            severity,
+            str(emergency_type),
+            emergency.description,
+            emergency.status,
+            getattr(emergency, "assigned_station", None),
+            int(bool(getattr(emergency, "attended", emergency.status == "resolved"))),
+            int(bool(getattr(emergency, "simulada", False))),
+            ",".join(resources) if resources else None,
+            getattr(emergency, "reports", 1),
+        )
+
+    def track(self, log_id):
+        # Sigue un registro de eventos (event_log.EventLog.log_id): cada lote guarda, en la misma
+        # transacción, la secuencia más alta que refleja, y flushed_sequence la lee al abrir
+        self.flush()
+        self._log_id = log_id
+        row = self._conn.execute("SELECT sequence FROM journal_progress WHERE log_id = ?", (log_id,)).fetchone()
+        self.flushed_sequence = self._pending_sequence = row[0] if row else 0
+
+    def save(self, emergency, sequence=None):
+        # Alta o actualización diferida; varias del mismo id en un lote se escriben una vez.
+        # sequence es la del evento del registro que produjo el cambio, si lo hay
+        self._pending[emergency.id] = self._row(emergency)
+        if sequence is not None and sequence > self._pending_sequence:
+            self._pending_sequence = sequence
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def save_many(self, emergencies):
+
+        for emergency in emergencies:
+            self._pending[emergency.id] = self._row(emergency)
+        self.flush()
+
+    def flush(self):
+        # Escribe el lote pendiente (y el avance en el registro seguido) en una sola transacción
+        if not self._pending:
+            return
+        rows = list(self._pending.values())
+        self._pending.clear()
+        with self._conn:
+            self._conn.executemany(_UPSERT, rows)
+            if self._log_id is not None and self._pending_sequence > self.flushed_sequence:
+                self._conn.execute(_PROGRESS, (self._log_id, self._pending_sequence))
+        self.flushed_sequence = max(self.flushed_sequence, self._pending_sequence)
+
+    def close(self):
+
+        self.flush()
+        self._conn.close()
+
+    # --- Consultas ---
+
+    def _where(self, since, until, location, emergency_type, status, station):
+        # Cláusula WHERE con parámetros; el orden de las condiciones no importa al planificador
+        clauses, params = [], []
+        for column, value in (("location", location), ("type", emergency_type), ("status", status), ("station", station)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(_iso(since))
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(_iso(until))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, since=None, until=None, location=None, emergency_type=None, status=None, station=None, limit=None):
+        # Emergencias que cumplen los filtros, de la más reciente a la más antigua
+        self.flush()
+        where, params = self._where(since, until, location, emergency_type, status, station)
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM emergencies{where} ORDER BY timestamp DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [dict(zip(_COLUMNS, row)) for row in self._conn.execute(sql, params)]
+
+    def count(self, since=None, until=None, location=None, emergency_type=None, status=None, station=None):
+
+        self.flush()
+        where, params = self._where(since, until, location, emergency_type, status, station)
+        return self._conn.execute(f"SELECT COUNT(*) FROM emergencies{where}", params).fetchone()[0]
+
+    def count_by(self, column, since=None, until=None, location=None, emergency_type=None, status=None, station=None):
+        # {valor: cantidad} agrupando por una columna (type, location, station, status, ...)
+        if column not in _GROUPABLE:
+            raise ValueError(f"No se puede agrupar por {column}")
+        self.flush()
+        where, params = self._where(since, until, location, emergency_type, status, station)
+        sql = f"SELECT {column}, COUNT(*) FROM emergencies{where} GROUP BY {column} ORDER BY COUNT(*) DESC"
+        return dict(self._conn.execute(sql, params).fetchall())
+
+    def hourly_counts(self, since=None, until=None, location=None, emergency_type=None):
+        # {hora del día: cantidad}, para ver los picos de demanda
+        self.flush()
+        where, params = self._where(since, until, location, emergency_type, None, None)
+        sql = f"SELECT CAST(substr(timestamp, 12, 2) AS INTEGER) AS hour, COUNT(*) FROM emergencies{where} GROUP BY hour"
+        return dict(self._conn.execute(sql, params).fetchall())
+
+
+if __name__ == "__main__":
+    import os
+    import random
+    import tempfile
+    import time
+    from datetime import timedelta
+
+    from emergency import Emergency
+
+    rng = random.Random(1)
+    tipos = ["incendio", "accidente", "robo", "inundacion", "explosion"]
+    lugares = [f"N{r}_{c}" for r in range(30) for c in range(30)]
+    inicio = datetime(2025, 1, 1)
+    with tempfile.TemporaryDirectory() as directorio:
+        store = EmergencyStore(os.path.join(directorio, "historial.db"), batch_size=5000)
+        started = time.perf_counter()
+        for i in range(500_000):
+            e = Emergency(rng.choice(lugares), rng.randint(1, 10), rng.choice(tipos))
+            e.id = f"{i:08x}"
+            e.timestamp = inicio + timedelta(seconds=rng.randint(0, 365 * 86400))
+            e.assigned_station = f"Estacion{rng.randint(1, 6)}"
+            store.save(e)
+        store.flush()
+        print(f"500000 emergencias guardadas en {time.perf_counter() - started:.1f} s")
+        for nombre, consulta in (
+            ("marzo", lambda: store.count(since=datetime(2025, 3, 1), until=datetime(2025, 4, 1))),
+            ("N5_5 en marzo", lambda: store.count(since=datetime(2025, 3, 1), until=datetime(2025, 4, 1), location="N5_5")),
+            ("incendios pendientes", lambda: store.count(emergency_type="incendio", status="PENDIENTE")),
+            ("por estación en marzo", lambda: store.count_by("station", since=datetime(2025, 3, 1), until=datetime(2025, 4, 1))),
+        ):
+            started = time.perf_counter()
+            resultado = consulta()
+            print(f"  {nombre}: {resultado} ({(time.perf_counter() - started) * 1000:.1f} ms)")
+        store.close()
@@ -0,0 +1,338 @@
+# event_log.py
+
+import json
+import os
+import struct
+import time
+import uuid
+import zlib
+
+# Registro de eventos de solo anexado (write-ahead log) en segmentos:
+#   segmento: <primera secuencia>.log con registros  longitud | crc32 | secuencia | JSON
+#   instantánea: snapshot-<secuencia>.json con el estado completo hasta esa secuencia
+# Cada registro se escribe con os.write (llega al sistema operativo aunque la aplicación se
+# cierre de golpe) y los fsync se agrupan: uno cada batch_size registros o cada sync_interval
+# segundos. Al abrir se carga la última instantánea y solo se relee la cola posterior; un
+# registro final incompleto o con CRC inválido (escritura cortada) se descarta.
+
+# longitud del JSON, crc32 de secuencia + JSON, secuencia
+_RECORD = struct.Struct("<IIQ")
+_SEGMENT_SUFFIX = ".log"
+_SNAPSHOT_PREFIX = "snapshot-"
+# Identificador del registro: distingue un registro nuevo en el mismo directorio (las secuencias
+# vuelven a empezar) de la continuación del anterior
+_ID_FILE = "log-id"
+
+
+def _segment_name(sequence):
+
+    return f"{sequence:020d}{_SEGMENT_SUFFIX}"
+
+
+def _snapshot_name(sequence):
+
+    return f"{_SNAPSHOT_PREFIX}{sequence:020d}.json"
+
+
+def _fsync_directory(directory):
+    # Persiste las altas y bajas de archivos del directorio (no disponible en Windows)
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _read_records(path):
+    # Lee los registros válidos de un segmento: devuelve ([(secuencia, evento)], bytes válidos,
+    # tamaño del archivo). La lectura se detiene en el primer registro cortado o dañado
+    with open(path, "rb") as f:
+        data = f.read()
+    records = []
+    offset = 0
+    while offset + _RECORD.size <= len(data):
+        length, crc, sequence = _RECORD.unpack_from(data, offset)
+        start = offset + _RECORD.size
+        payload = data[start:start + length]
+        if len(payload) < length or zlib.crc32(payload, zlib.crc32(struct.pack("<Q", sequence))) != crc:
+            break
+        records.append((sequence, json.loads(payload)))
+        offset = start + length
+    return records, offset, len(data)
+
+
+class EventLog:
+    def __init__(self, directory, segment_bytes=4 << 20, batch_size=64, sync_interval=1.0):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.batch_size = batch_size
+        self.sync_interval = sync_interval
+        self.snapshot_state = None
+        self.snapshot_sequence = 0
+        self.syncs = 0
+        self._fd = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+        self.log_id = self._load_id()
+        self._load_snapshot()
+        self._tail = self._scan_tail()
+
+    # --- Apertura y recuperación ---
+
+    def _load_id(self):
+
+        path = os.path.join(self.directory, _ID_FILE)
+        try:
+            with open(path, encoding="utf-8") as f:
+                log_id = f.read().strip()
+            if log_id:
+                return log_id
+        except OSError:
+            pass
+        log_id = uuid.uuid4().hex
+        temp = path + ".tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            f.write(log_id)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, path)
+        _fsync_directory(self.directory)
+        return log_id
+
+    def _segments(self):
+        # [(primera secuencia, ruta)] ordenados
+        found = []
+        for name in os.listdir(self.directory):
+            if name.endswith(_SEGMENT_SUFFIX) and name[:-len(_SEGMENT_SUFFIX)].isdigit():
+                found.append((int(name[:-len(_SEGMENT_SUFFIX)]), os.path.join(self.directory, name)))
+        return sorted(found)
+
+    def _snapshots(self):
+
+        found = []
+        for name in os.listdir(self.directory):
+            stem = name[len(_SNAPSHOT_PREFIX):-len(".json")]
+            if name.startswith(_SNAPSHOT_PREFIX) and name.endswith(".json") and stem.isdigit():
+                found.append((int(stem), os.path.join(self.directory, name)))
+        return sorted(found)
+
+    def _load_snapshot(self):
+        # Última instantánea legible; se escriben de forma atómica, así que solo se descartan
+        # las que no se pueden leer
+        for sequence, path in reversed(self._snapshots()):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.snapshot_state = json.load(f)
+                self.snapshot_sequence = sequence
+                return
+            except (OSError, ValueError):
+                continue
+
+    def _scan_tail(self):
+        # Registros posteriores a la instantánea. Solo se leen los segmentos que pueden
+        # contenerlos, así que el costo no depende de la historia total
+        segments = [s for s in self._segments()]
+        start = 0
+        for i, (first, _) in enumerate(segments):
+            if first <= self.snapshot_sequence + 1:
+                start = i
+        tail = []
+        self._next_sequence = self.snapshot_sequence + 1
+        self._segment_path = None
+        for i, (first, path) in enumerate(segments[start:], start):
+            records, valid, size = _read_records(path)
+            if valid < size:
+                if i != len(segments) - 1:
+                    raise ValueError(f"Registro de eventos dañado en {path}")
+                # Escritura cortada al final del último segmento: se descarta
+                with open(path, "r+b") as f:
+                    f.truncate(valid)
+                    os.fsync(f.fileno())
+            for sequence, event in records:
+                if sequence > self.snapshot_sequence:
+                    tail.append((sequence, event))
+                self._next_sequence = max(self._next_sequence, sequence + 1)
+            self._segment_path = path
+        return tail
+
+    def replay(self):
+        # Eventos posteriores a la última instantánea, en orden: [(secuencia, evento)]
+        return list(self._tail)
+
+    # --- Escritura ---
+
+    @property
+    def next_sequence(self):
+        return self._next_sequence
+
+    def _open_segment(self):
+        if self._segment_path is None or os.path.getsize(self._segment_path) >= self.segment_bytes:
+            self._rotate()
+        else:
+            self._fd = os.open(self._segment_path, os.O_WRONLY | os.O_APPEND | getattr(os, "O_BINARY", 0))
+
+    def _rotate(self):
+        # Cierra el segmento actual (ya sincronizado) y empieza uno nuevo
+        if self._fd is not None:
+            self.sync()
+            os.close(self._fd)
+        self._segment_path = os.path.join(self.directory, _segment_name(self._next_sequence))
+        self._fd = os.open(self._segment_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+        _fsync_directory(self.directory)
+
+    def append(self, event):
+        # Anexa un evento (diccionario serializable a JSON); devuelve su número de secuencia
+        if self._fd is None:
+            self._open_segment()
+        sequence = self._next_sequence
+        payload = json.dumps(event, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        crc = zlib.crc32(payload, zlib.crc32(struct.pack("<Q", sequence)))
+        os.write(self._fd, _RECORD.pack(len(payload), crc, sequence) + payload)
+        self._next_sequence += 1
+        self._unsynced += 1
+        if self._unsynced >= self.batch_size or time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+        if os.path.getsize(self._segment_path) >= self.segment_bytes:
+            self._rotate()
+        return sequence
+
+    def sync(self):
+        # Commit de grupo: un solo fsync para todos los registros escritos desde el anterior
+        if self._fd is not None and self._unsynced:
+            os.fsync(self._fd)
+            self.syncs += 1
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def snapshot(self, state):
+        # Guarda el estado completo hasta el último evento anexado y borra los segmentos e
+        # instantáneas que ya no hacen falta para recuperar
+        self.sync()
+        sequence = self._next_sequence - 1
+        path = os.path.join(self.directory, _snapshot_name(sequence))
+        temp = path + ".tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(state, f, separators=(",", ":"), ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, path)
+        _fsync_directory(self.directory)
+        self.snapshot_state = state
+        self.snapshot_sequence = sequence
+        self._tail = []
+        for old, old_path in self._snapshots():
+            if old < sequence:
+                os.remove(old_path)
+        segments = self._segments()
+        for (first, seg_path), (next_first, _) in zip(segments, segments[1:]):
+            if next_first <= sequence + 1 and seg_path != self._segment_path:
+                os.remove(seg_path)
+        return sequence
+
+    def close(self):
+
+        if self._fd is not None:
+            self.sync()
+            os.close(self._fd)
+            self._fd = None
+
+
+# Diario de las emergencias: anexa al registro las altas, asignaciones, atenciones y
+# resoluciones que informa el EmergencyManager (y el simulador), y las fallas y restauraciones
+# de nodos de la red. Cada snapshot_every eventos guarda una instantánea del estado.
+class EmergencyJournal:
+    def __init__(self, directory, manager, network=None, simulator=None, snapshot_every=1000, **log_options):
+        self.log = EventLog(directory, **log_options)
+        self.manager = manager
+        self.network = network
+        self.simulator = simulator
+        self.snapshot_every = snapshot_every
+        self._since_snapshot = 0
+        self._attached = False
+
+    def recover(self):
+        # Reconstruye el estado: instantánea + cola del registro; después empieza a registrar.
+        # El historial SQLite indica hasta qué secuencia de este registro ya escribió, para no
+        # volver a guardar los eventos repetidos que ya tiene
+        if self.manager.store is not None:
+            self.manager.store.track(self.log.log_id)
+        state = self.log.snapshot_state or {}
+        if "manager" in state:
+            self.manager.load_snapshot(state["manager"])
+        if "simulator" in state and self.simulator is not None:
+            self.simulator.load_snapshot(state["simulator"])
+        if self.network is not None:
+            for node in state.get("failed_nodes", []):
+                self.network.fail_node(node)
+        replayed = self.log.replay()
+        for sequence, event in replayed:
+            kind = event["event"]
+            if kind == "node_failed" and self.network is not None:
+                self.network.fail_node(event["node"])
+            elif kind == "node_restored" and self.network is not None:
+                self.network.restore_node(event["node"])
+            elif kind.startswith("sim_"):
+                # Emergencias del simulador (sus ids no existen en el EmergencyManager)
+                if self.simulator is not None:
+                    self.simulator.apply_event(event)
+            elif kind != "node_failed" and kind != "node_restored":
+                self.manager.apply_event(event, sequence)
+        self._since_snapshot = len(replayed)
+        self.attach()
+        return len(replayed)
+
+    def attach(self):
+
+        if self._attached:
+            return
+        self.manager.journal = self
+        if self.simulator is not None:
+            self.simulator.journal = self
+        if self.network is not None:
+            self.network.subscribe(self._on_network_event)
+        self._attached = True
+
+    def _on_network_event(self, event, *args):
+        if event in ("node_failed", "node_restored"):
+            self.record(event, node=self.network.node_names[args[0]])
+
+    def record(self, event, **data):
+
+        data["event"] = event
+        sequence = self.log.append(data)
+        self._since_snapshot += 1
+        if self._since_snapshot >= self.snapshot_every:
+            self.snapshot()
+        return sequence
+
+    def snapshot(self):
+
+        state = {"manager": self.manager.snapshot()}
+        if self.simulator is not None:
+            state["simulator"] = self.simulator.snapshot()
+        if self.network is not None:
+            state["failed_nodes"] = sorted(self.network.failed_nodes)
+        self._since_snapshot = 0
+        return self.log.snapshot(state)
+
+    def sync(self):
+
+        self.log.sync()
+
+    def close(self):
+        # Instantánea final: el próximo arranque no necesita releer eventos
+        if self._attached:
+            if self.network is not None:
+                self.network.unsubscribe(self._on_network_event)
+            self.manager.journal = None
+            if self.simulator is not None:
+                self.simulator.journal = None
+            self._attached = False
+        self.snapshot()
+        self.log.close()
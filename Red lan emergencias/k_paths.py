@@ -0,0 +1,212 @@
+# k_paths.py
+
+import heapq
+
+from network import Network
+from routing import INF, _dijkstra_ids
+
+
+def _tree_suffix(network, tree_next, node, target, banned, banned_links):
+    # Resto de la ruta node -> destino siguiendo el árbol de rutas más cortas, o None si
+    # atraviesa un nodo o enlace prohibido en esta búsqueda
+    link_key = network.link_key
+    suffix = []
+    while node != target:
+        nxt = tree_next[node]
+        if nxt in banned or link_key(node, nxt) in banned_links:
+            return None
+        suffix.append(nxt)
+        node = nxt
+    return suffix
+
+
+def _spur_path(network, h, tree_next, spur, target, banned, banned_links):
+    # A* desde el nodo de desvío con la distancia exacta al destino (árbol inverso) como
+    # heurística. En cuanto el nodo extraído puede seguir el árbol sin tocar nada prohibido,
+    # esa continuación es óptima y la búsqueda termina.
+    offsets, targets, weights = network.csr()
+    failed, failed_links = network.failure_mask()
+    link_key = network.link_key
+    g = {spur: 0}
+    parent = {spur: -1}
+    done = set()
+    pq = [(h[spur], 0, spur)]
+    while pq:
+        _, d, u = heapq.heappop(pq)
+        if u in done:
+            continue
+        done.add(u)
+        suffix = _tree_suffix(network, tree_next, u, target, banned, banned_links)
+        if suffix is not None:
+            path = []
+            node = u
+            while node >= 0:
+                path.append(node)
+                node = parent[node]
+            path.reverse()
+            return d + h[u], path + suffix
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            if v in done or v in banned or failed[v] or h[v] == INF:
+                continue
+            key = link_key(u, v)
+            if key in banned_links or (failed_links and key in failed_links):
+                continue
+            distance = d + weights[i]
+            if distance < g.get(v, INF):
+                g[v] = distance
+                parent[v] = u
+                heapq.heappush(pq, (distance + h[v], distance, v))
+    return INF, None
+
+
+def k_shortest_paths(network, start, end, k=3):
+    # k rutas más cortas sin ciclos (Yen) sobre la red operativa: lista de (ruta, distancia)
+    # en orden creciente. Un único árbol de rutas más cortas hacia el destino da la primera
+    # ruta y la heurística exacta de todas las búsquedas de desvío.
+    source, target = network.node_id(start), network.node_id(end)
+    if source is None or target is None or network.is_failed(start) or network.is_failed(end) or k <= 0:
+        return []
+    h, tree_next = _dijkstra_ids(network, target)
+    if h[source] == INF:
+        return []
+    first = [source] + _tree_suffix(network, tree_next, source, target, (), ())
+    found = [(h[source], first)]
+    candidates = []
+    seen = {tuple(first)}
+    link_key = network.link_key
+    while len(found) < k:
+        _, last = found[-1]
+        root_cost = 0
+        for i in range(len(last) - 1):
+            spur, root = last[i], last[:i + 1]
+            # Se prohíbe el siguiente enlace de toda ruta ya encontrada que comparta la raíz
+            banned_links = {link_key(p[i], p[i + 1]) for _, p in found if len(p) > i + 1 and p[:i + 1] == root}
+            cost, spur_path = _spur_path(network, h, tree_next, spur, target, set(root), banned_links)
+            if spur_path is not None:
+                path = root[:-1] + spur_path
+                if tuple(path) not in seen:
+                    seen.add(tuple(path))
+                    heapq.heappush(candidates, (root_cost + cost, len(path), path))
+            root_cost += network.link_weight(last[i], last[i + 1])
+        if not candidates:
+            break
+        cost, _, path = heapq.heappop(candidates)
+        found.append((cost, path))
+    names = network.node_names
+    return [([names[v] for v in path], cost) for cost, path in found]
+
+
+def disjoint_routes(network, start, end, k=2, mode="node"):
+    # Hasta k rutas mutuamente independientes (sin nodos intermedios comunes con mode="node",
+    # sin enlaces comunes con mode="edge") de costo total mínimo, por flujo de costo mínimo con
+    # caminos aumentantes sucesivos. Con mode="node" cada nodo se divide en entrada -> salida
+    # con capacidad 1. Devuelve [(ruta, distancia), ...] ordenado por distancia.
+    if mode not in ("node", "edge"):
+        raise ValueError("mode debe ser 'node' o 'edge'")
+    source, target = network.node_id(start), network.node_id(end)
+    if source is None or target is None or network.is_failed(start) or network.is_failed(end) or k <= 0:
+        return []
+    if source == target:
+        return [([start], 0)]
+    offsets, targets, weights = network.csr()
+    failed, failed_links = network.failure_mask()
+    link_key = network.link_key
+    n = network.node_count
+    split = mode == "node"
+    size = 2 * n if split else n
+    head = [[] for _ in range(size)]
+    to, cap, cost = [], [], []
+
+    def add_arc(a, b, capacity, weight):
+        head[a].append(len(to))
+        to.append(b)
+        cap.append(capacity)
+        cost.append(weight)
+        head[b].append(len(to))
+        to.append(a)
+        cap.append(0)
+        cost.append(-weight)
+
+    if split:
+        node_in = lambda v: 2 * v
+        node_out = lambda v: 2 * v + 1
+        for v in range(n):
+            if not failed[v]:
+                add_arc(node_in(v), node_out(v), k if v in (source, target) else 1, 0)
+    else:
+        node_in = node_out = lambda v: v
+    for u in range(n):
+        if failed[u]:
+            continue
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            if v < u or failed[v] or (failed_links and link_key(u, v) in failed_links):
+                continue
+            add_arc(node_out(u), node_in(v), 1, weights[i])
+            add_arc(node_out(v), node_in(u), 1, weights[i])
+
+    s, t = node_out(source), node_in(target)
+    potential = [0] * size
+    flow = 0
+    while flow < k:
+        # Dijkstra con costos reducidos (potenciales de Johnson) sobre la red residual
+        dist = [INF] * size
+        via = [-1] * size
+        dist[s] = 0
+        pq = [(0, s)]
+        while pq:
+            d, x = heapq.heappop(pq)
+            if d > dist[x]:
+                continue
+            for e in head[x]:
+                if cap[e] <= 0:
+                    continue
+                y = to[e]
+                nd = d + cost[e] + potential[x] - potential[y]
+                if nd < dist[y]:
+                    dist[y] = nd
+                    via[y] = e
+                    heapq.heappush(pq, (nd, y))
+        if dist[t] == INF:
+            break
+        for x in range(size):
+            if dist[x] != INF:
+                potential[x] += dist[x]
+        x = t
+        while x != s:
+            e = via[x]
+            cap[e] -= 1
+            cap[e ^ 1] += 1
+            x = to[e ^ 1]
+        flow += 1
+
+    # Descomposición del flujo en rutas: se siguen los arcos directos (índice par) con flujo
+    names = network.node_names
+    used = [cap[e ^ 1] for e in range(len(to))]
+    routes = []
+    for _ in range(flow):
+        x, walk = s, [source]
+        while x != t:
+            for e in head[x]:
+                if e % 2 == 0 and used[e] > 0:
+                    used[e] -= 1
+                    x = to[e]
+                    break
+            v = x // 2 if split else x
+            if v != walk[-1]:
+                walk.append(v)
+        distance = sum(network.link_weight(a, b) for a, b in zip(walk, walk[1:]))
+        routes.append(([names[v] for v in walk], distance))
+    routes.sort(key=lambda route: route[1])
+    return routes
+
+
+if __name__ == "__main__":
+    demo = Network()
+    demo.create_default_topology()
+    for path, distance in k_shortest_paths(demo, "Estacion1", "Estacion5", k=4):
+        print(f"{distance:>4}  {' → '.join(path)}")
+    print("Rutas independientes (sin nodos comunes):")
+    for path, distance in disjoint_routes(demo, "Estacion1", "Estacion5", k=3):
+        print(f"{distance:>4}  {' → '.join(path)}")
@@ -5,8 +5,24 @@ from tkinter import simpledialog, messagebox
 from tkinter import font
 from network import Network
 from emergency import EmergencyManager
-from routing import dijkstra, reconstruct_path
+from routing import reconstruct_path, multi_source_dijkstra
 from simulator import EmergencySimulator
+from alt_routing import ALTEngine
+from contraction import ContractionHierarchy
+from k_paths import disjoint_routes
+from dynamic_spt import StationTrees
+from connectivity import ComponentIndex
+from coverage import CoverageTracker
+from event_log import EmergencyJournal
+from emergency_store import EmergencyStore
+from dedup import ReportDeduplicator
+from archive import EmergencyArchive
+from route_cache import RouteCache
+from time_dependent import time_dependent_dijkstra
+from distance_matrix import distance_matrix
+from datetime import datetime, timedelta
+from resilience import criticality_report, format_report
+from cascade import simulate_cascades, format_summary
 import random
 import graphviz
 import shutil
@@ -27,22 +43,94 @@ recursos_disponibles = {
     "ambiental": ["Estacion3"]
 }
 
+# Recursos que se envían a cada tipo de emergencia
+RECURSOS_POR_EMERGENCIA = {
+    "desastre_natural": ["rescate", "bomberos", "ambulancia", "policia"],
+    "incendio": ["bomberos"],
+    "accidente_transito": ["ambulancia", "policia"],
+    "violencia": ["policia"],
+    "salud_publica": ["salud", "ambulancia"],
+    "medio_ambiente": ["ambiental", "bomberos"]
+}
+
 # Lista de estaciones de la red
 estaciones = ["Estacion1", "Estacion2", "Estacion3", "Estacion4", "Estacion5", "Estacion6"]
 
+# Tiempo máximo de respuesta (minutos) para considerar un nodo cubierto por un tipo de recurso
+MINUTOS_COBERTURA = 15
+
+# Directorio del registro de eventos de emergencias (se recupera al iniciar)
+DIRECTORIO_REGISTRO = "registro_emergencias"
+# Historial SQLite de emergencias para análisis posterior
+ARCHIVO_HISTORIAL = "historial_emergencias.db"
+# Cada cuánto (ms) las emergencias atendidas pasan de objetos en memoria al archivo columnar
+ARCHIVAR_CADA_MS = 60_000
+# Reportes duplicados: un reporte se agrupa con un incidente pendiente del mismo tipo, de la
+# última ventana de VENTANA_DUPLICADOS minutos, en la misma ubicación o en un nodo vecino unido
+# por un enlace de a lo sumo RADIO_DUPLICADOS minutos. Con 0 solo se agrupan reportes del mismo
+# nodo: las estaciones de topology.txt están a 5 minutos o más y son sitios distintos
+VENTANA_DUPLICADOS = 15
+RADIO_DUPLICADOS = 0
+# Desde este tamaño de red las rutas punto a punto usan la jerarquía de contracción, guardada
+# junto a la topología; por debajo, A* con landmarks (el preproceso de la jerarquía no compensa)
+NODOS_JERARQUIA = 5000
+ARCHIVO_JERARQUIA = "topology.txt.ch.cache"
+
 def run_gui():
     
     network = Network()  
-    emergency_manager = EmergencyManager()  
+    # Archivo columnar de las emergencias atendidas; sin NumPy siguen como objetos en memoria
+    try:
+        archivo = EmergencyArchive()
+    except RuntimeError as error:
+        print(error)
+        archivo = None
+    emergency_manager = EmergencyManager(archive=archivo, store=EmergencyStore(ARCHIVO_HISTORIAL))
     simulator = EmergencySimulator()  
     nodos_fuera = set()  
 
     network.load_topology("topology.txt")
+    topology_watcher = network.watch_topology("topology.txt")
+    # Registro durable de emergencias y fallas: recupera la sesión anterior (última instantánea
+    # más los eventos posteriores) y desde aquí anota cada cambio
+    try:
+        diario = EmergencyJournal(DIRECTORIO_REGISTRO, emergency_manager, network, simulator)
+    except ValueError as error:
+        # Segmento dañado antes del final: se aparta para revisarlo y se empieza un registro
+        # nuevo en lugar de impedir el arranque
+        apartado = f"{DIRECTORIO_REGISTRO}-dañado-{datetime.now():%Y%m%d%H%M%S}"
+        os.replace(DIRECTORIO_REGISTRO, apartado)
+        aviso = f" {error}. Se apartó en {apartado} y se inició un registro nuevo"
+        print(aviso)
+        notificaciones_globales.append(aviso)
+        diario = EmergencyJournal(DIRECTORIO_REGISTRO, emergency_manager, network, simulator)
+    diario.recover()
+    nodos_fuera.update(network.failed_nodes)
+    # Agrupa reportes repetidos del mismo incidente (mismo tipo, lugar o vecino cercano, y ventana de tiempo)
+    deduplicador = ReportDeduplicator(network, emergency_manager, window_minutes=VENTANA_DUPLICADOS,
+                                      radius=RADIO_DUPLICADOS)
+    # Rutas punto a punto: jerarquía de contracción en redes grandes, A* con cotas por landmarks en las
+    # demás (ambas se reprocesan solo si cambia la topología)
+    if network.node_count >= NODOS_JERARQUIA:
+        rutas = ContractionHierarchy.load(network, ARCHIVO_JERARQUIA)
+        if rutas is None:
+            rutas = ContractionHierarchy(network)
+            rutas.save(ARCHIVO_JERARQUIA)
+    else:
+        rutas = ALTEngine(network)
+    # Caché LRU de rutas consultadas; se invalida sola cuando cambia la versión de la red
+    cache_rutas = RouteCache(network, solver=rutas.shortest_path)
+    # Un árbol de rutas más cortas por estación, reparado incrementalmente ante fallas y restauraciones
+    arboles = StationTrees(network, estaciones)
+    # Componentes conexas de la red operativa: descarta en O(α) las consultas sin ruta posible
+    componentes = ComponentIndex(network)
+    # Cobertura por tipo de recurso dentro de MINUTOS_COBERTURA, actualizada ante fallas y restauraciones
+    cobertura = CoverageTracker(network, recursos_disponibles, MINUTOS_COBERTURA)
 
     # Configuración de la ventana principal de Tkinter
     root = tk.Tk()
     root.title("Simulador de Red LAN para Emergencias")
-    root.geometry("400x500")
+    root.geometry("400x660")
     root.configure(bg="#f8f9fa")
 
     #Definición de fuentes para la interfaz
@@ -58,33 +146,46 @@ def run_gui():
     frame = tk.Frame(root, bg="#f9f9fa")
     frame.pack(expand=True)
 
+    # Busca la fuente operativa más cercana a una ubicación con una sola búsqueda multi-fuente
+    def fuente_mas_cercana(ubicacion, fuentes, excluir=None):
+        semillas = [f for f in fuentes if f in network.nodes and f not in nodos_fuera and f != excluir]
+        # Solo las fuentes que siguen conectadas a la ubicación; si no queda ninguna no se busca
+        semillas = componentes.stations_reaching(ubicacion, semillas)
+        if not semillas:
+            return None, float('inf'), []
+        # Estaciones: lectura directa de sus árboles dinámicos (rutas estación -> ubicación)
+        if all(f in arboles for f in semillas):
+            return arboles.nearest(ubicacion, semillas)
+        # Otras fuentes: una sola búsqueda multi-fuente
+        dist, origen, prev = multi_source_dijkstra(network, semillas, ubicacion)
+        if ubicacion not in dist:
+            return None, float('inf'), []
+        fuente = origen[ubicacion]
+        return fuente, dist[ubicacion], reconstruct_path(prev, fuente, ubicacion)
+
     # Función para asignar el recurso más cercano a una emergencia
     def asignar_recurso_mas_cercano(emergency_location, resource_type):
-        min_dist = float('inf')
-        mejor_recurso = None
-        for recurso in recursos_disponibles.get(resource_type, []):
-            # Calcula la distancia desde cada recurso disponible hasta la emergencia
-            temp_graph = {n: [(v, w) for v, w in network.graph[n] if v not in nodos_fuera] for n in network.graph if n not in nodos_fuera}
-            dist, _ = dijkstra(temp_graph, recurso, emergency_location)
-            if emergency_location in dist and dist[emergency_location] < min_dist:
-                min_dist = dist[emergency_location]
-                mejor_recurso = recurso
-        return mejor_recurso, min_dist
+        recurso, distancia, _ = fuente_mas_cercana(emergency_location, recursos_disponibles.get(resource_type, []))
+        return recurso, distancia
 
     # Función para encontrar la estación más cercana a una ubicación
     def estacion_mas_cercana(ubicacion_emergencia, excluir=None):
-        min_dist = float('inf')
-        estacion_cercana = None
-        for estacion in estaciones:
-            # Solo considera estaciones operativas y distintas a la excluida
-            if estacion not in network.nodes or estacion in nodos_fuera or estacion == excluir:
-                continue
-            temp_graph = {n: [(v, w) for v, w in network.graph[n] if v not in nodos_fuera] for n in network.graph if n not in nodos_fuera}
-            dist, _ = dijkstra(temp_graph, estacion, ubicacion_emergencia)
-            if ubicacion_emergencia in dist and dist[ubicacion_emergencia] < min_dist:
-                min_dist = dist[ubicacion_emergencia]
-                estacion_cercana = estacion
-        return estacion_cercana, min_dist
+        estacion, distancia, _ = fuente_mas_cercana(ubicacion_emergencia, estaciones, excluir)
+        return estacion, distancia
+
+    # Estación más cercana a un nodo ficticio unido a las estaciones operativas con los pesos dados:
+    # se siembra cada estación con su peso, como si la búsqueda partiera del nodo ficticio
+    def estacion_mas_cercana_ficticia(nodo_ficticio, pesos):
+        if not pesos:
+            return None, float('inf'), []
+        dist, origen, prev = multi_source_dijkstra(network, pesos)
+        alcanzadas = [est for est in pesos if est in dist]
+        if not alcanzadas:
+            return None, float('inf'), []
+        estacion = min(alcanzadas, key=lambda est: dist[est])
+        # La ruta estación -> nodo ficticio es la inversa de la ruta sembrada hasta la estación
+        ruta = reconstruct_path(prev, origen[estacion], estacion) or [estacion]
+        return estacion, dist[estacion], ruta[::-1] + [nodo_ficticio]
 
     # Función para mostrar la asignación de recursos a una emergencia
     def mostrar_asignacion(asignacion, emergency_type):
@@ -201,14 +302,30 @@ def run_gui():
             dot.edge(path[-2], path[-1], color="#ee5253", penwidth='4', style='dashed')
         dot.render("ruta_mas_corta", view=True)
 
+    # Si el reporte repite un incidente pendiente, se suma a él sin despachar recursos ni buscar rutas
+    def reporte_duplicado(ubicacion, gravedad, tipo, descripcion):
+        existente = deduplicador.merge(ubicacion, gravedad, tipo, descripcion)
+        if existente is None:
+            return False
+        messagebox.showinfo(
+            "Reporte duplicado",
+            f"El reporte se agregó a la emergencia {existente.id} ({existente.emergency_type} en {existente.location}).\n"
+            f"Reportes recibidos: {existente.reports}\n"
+            f"Estación asignada: {existente.assigned_station or 'sin asignar'}"
+        )
+        return True
+
     # FUNCIÓN CENTRAL PARA GESTIONAR EMERGENCIAS EN CUALQUIER PUNTO
     def gestionar_emergencia_en_punto(location, severity, emergency_type, description):
-        estacion, distancia = estacion_mas_cercana(location)
+        if reporte_duplicado(location, severity, emergency_type, description):
+            return
+        estacion, distancia, path = fuente_mas_cercana(location, estaciones)
         if not estacion:
             messagebox.showinfo("Emergencia", "No hay estaciones disponibles para atender la emergencia.")
             return
 
         emergency = emergency_manager.add_emergency(location, severity, emergency_type, description)
+        deduplicador.register(emergency)
         asignacion = simulator.assign_resources(emergency)
 
         # Notificar a todas las estaciones
@@ -227,10 +344,7 @@ def run_gui():
         mostrar_asignacion(asignacion, emergency_type)
 
         # Visualizar la ruta óptima desde la estación más cercana
-        temp_graph = {n: [(v, w) for v, w in network.graph[n] if v not in nodos_fuera] for n in network.graph if n not in nodos_fuera}
-        distances, prev = dijkstra(temp_graph, estacion, location)
-        if location in distances and distances[location] != float('inf'):
-            path = reconstruct_path(prev, estacion, location)
+        if path:
             visualizar_ruta_grafica(path)
 
     def ver_topologia():
@@ -270,49 +384,35 @@ def run_gui():
         if not gravedad:
             return
         desc = simpledialog.askstring("Descripción", "Descripción (opcional):") or ""
+        if reporte_duplicado(ubicacion, gravedad, tipo, desc):
+            return
 
         nodo_ficticio = None
-        temp_graph = {n: [(v, w) for v, w in network.graph[n] if v not in nodos_fuera] for n in network.graph if n not in nodos_fuera}
         ruta_guardada = None
         ruta_es_ficticia = False
 
         if ubicacion in ubicaciones_ficticias:
             nodo_ficticio = ubicacion
-            for est in estaciones:
-                if est in temp_graph:
-                    peso = random.randint(5, 25)
-                    temp_graph.setdefault(nodo_ficticio, []).append((est, peso))
-                    temp_graph[est].append((nodo_ficticio, peso))
-            min_dist = float('inf')
-            estacion_cercana = None
-            for est in estaciones:
-                if est in temp_graph:
-                    dist, prev = dijkstra(temp_graph, est, nodo_ficticio)
-                    if nodo_ficticio in dist and dist[nodo_ficticio] < min_dist:
-                        min_dist = dist[nodo_ficticio]
-                        estacion_cercana = est
-                        ruta_guardada = reconstruct_path(prev, estacion_cercana, nodo_ficticio)
-                        ruta_es_ficticia = True
-            distancia = min_dist
+            pesos = {
+                est: random.randint(5, 25)
+                for est in estaciones if est in network.nodes and est not in nodos_fuera
+            }
+            estacion_cercana, distancia, ruta_guardada = estacion_mas_cercana_ficticia(nodo_ficticio, pesos)
+            ruta_es_ficticia = bool(ruta_guardada)
         else:
-            # Si la emergencia ocurre en una estación, exclúyela de la búsqueda
-            estacion_cercana, distancia = estacion_mas_cercana(ubicacion, excluir=ubicacion)
-            # Guardar la ruta ANTES de sacar la estación de servicio
-            temp_graph2 = {n: [(v, w) for v, w in network.graph[n] if v not in nodos_fuera] for n in network.graph if n not in nodos_fuera}
-            dist, prev = dijkstra(temp_graph2, estacion_cercana, ubicacion)
-            if ubicacion in dist and dist[ubicacion] != float('inf'):
-                ruta_guardada = reconstruct_path(prev, estacion_cercana, ubicacion)
-                ruta_es_ficticia = False
+            # Si la emergencia ocurre en una estación, exclúyela de la búsqueda.
+            # La ruta se guarda ANTES de sacar la estación de servicio
+            estacion_cercana, distancia, ruta_guardada = fuente_mas_cercana(ubicacion, estaciones, excluir=ubicacion)
+            ruta_es_ficticia = False
 
         if not estacion_cercana:
             messagebox.showinfo("Emergencia", "No hay estaciones disponibles para atender la emergencia.")
             return
 
-        emergency = emergency_manager.add_emergency(ubicacion, gravedad, tipo, desc)
+        emergency = emergency_manager.add_emergency(ubicacion, gravedad, tipo, desc, station=estacion_cercana)
+        deduplicador.register(emergency)
         asignacion = simulator.assign_resources(emergency)
-        emergency.assigned_station = estacion_cercana
-        emergency.assigned_resources = [datos['resource_id'] for datos in asignacion["assignments"].values()] if isinstance(asignacion, dict) and "assignments" in asignacion else []
-        emergency.attended = False
+        emergency_manager.annotate(emergency, assigned_resources=[datos['resource_id'] for datos in asignacion["assignments"].values()] if isinstance(asignacion, dict) and "assignments" in asignacion else [])
 
         # SACAR EL NODO DE SERVICIO
         if ubicacion in network.nodes:
@@ -369,26 +469,14 @@ def run_gui():
         lugar = random.choice(lugares_ficticios)
         nodo_ficticio = lugar
 
-        # Crear grafo temporal con nodo ficticio conectado a estaciones operativas
-        temp_graph = {n: [(v, w) for v, w in network.graph[n] if v not in nodos_fuera] for n in network.graph if n not in nodos_fuera}
-        for est in estaciones:
-            if est in temp_graph:
-                peso = random.randint(5, 25)
-                temp_graph.setdefault(nodo_ficticio, []).append((est, peso))
-                temp_graph[est].append((nodo_ficticio, peso))
+        # Nodo ficticio conectado a las estaciones operativas con pesos aleatorios
+        pesos = {
+            est: random.randint(5, 25)
+            for est in estaciones if est in network.nodes and est not in nodos_fuera
+        }
 
         # Calcular estación más cercana al nodo ficticio y la ruta más corta
-        min_dist = float('inf')
-        estacion_cercana = None
-        mejor_path = []
-        for est in estaciones:
-            if est in temp_graph:
-                dist, prev = dijkstra(temp_graph, est, nodo_ficticio)
-                if nodo_ficticio in dist and dist[nodo_ficticio] < min_dist:
-                    min_dist = dist[nodo_ficticio]
-                    estacion_cercana = est
-                    mejor_path = reconstruct_path(prev, est, nodo_ficticio)
-        distancia = min_dist
+        estacion_cercana, distancia, mejor_path = estacion_mas_cercana_ficticia(nodo_ficticio, pesos)
 
         gravedad = random.randint(1, 10)
         tipos_emergencia = [
@@ -400,15 +488,7 @@ def run_gui():
 
         # Simular ayuda enviada
         ayuda = []
-        recursos_tipo = {
-            "desastre_natural": ["rescate", "bomberos", "ambulancia", "policia"],
-            "incendio": ["bomberos"],
-            "accidente_transito": ["ambulancia", "policia"],
-            "violencia": ["policia"],
-            "salud_publica": ["salud", "ambulancia"],
-            "medio_ambiente": ["ambiental", "bomberos"]
-        }
-        for recurso in recursos_tipo.get(tipo, []):
+        for recurso in RECURSOS_POR_EMERGENCIA.get(tipo, []):
             ayuda.append(f"{recurso.capitalize()} desde {estacion_cercana}")
 
         ayuda_str = "\n".join([f"• {a} | ETA: {int(distancia)} minuto{'s' if int(distancia) != 1 else ''}" for a in ayuda]) if ayuda else "No se pudo asignar ayuda."
@@ -417,11 +497,8 @@ def run_gui():
         estaciones_afectadas = sorted(set(estaciones) - {estacion_cercana})
 
         # REGISTRAR LA EMERGENCIA SIMULADA EN EL MANAGER
-        emergencia_simulada = emergency_manager.add_emergency(lugar, gravedad, tipo, descripcion)
-        emergencia_simulada.simulada = True
-        emergencia_simulada.assigned_station = estacion_cercana
-        emergencia_simulada.assigned_resources = ayuda
-        emergencia_simulada.attended = False
+        emergencia_simulada = emergency_manager.add_emergency(lugar, gravedad, tipo, descripcion, station=estacion_cercana)
+        emergency_manager.annotate(emergencia_simulada, assigned_resources=ayuda, simulada=True)
 
         # Notificar a todas las estaciones
         for n in estaciones:
@@ -462,6 +539,41 @@ def run_gui():
         if mejor_path and distancia != float('inf'):
             visualizar_ruta_grafica_personalizada(mejor_path, nodo_ficticio)
 
+    # Despacho de crisis: compara todas las unidades libres con todas las emergencias pendientes
+    # en una sola matriz de distancias y asigna, por urgencia, la unidad libre más cercana de
+    # cada tipo de recurso que requiere la emergencia (cada unidad atiende una sola emergencia)
+    def despacho_crisis():
+        pendientes = emergency_manager.pending(by_urgency=True)
+        if not pendientes:
+            messagebox.showinfo("Despacho de crisis", "No hay emergencias pendientes.")
+            return
+        unidades = [(tipo, est) for tipo, lista in recursos_disponibles.items() for est in lista
+                    if est in network.nodes and est not in nodos_fuera]
+        origenes = sorted({est for _, est in unidades})
+        if not origenes:
+            messagebox.showinfo("Despacho de crisis", "No hay unidades operativas.")
+            return
+        fila = {est: i for i, est in enumerate(origenes)}
+        matriz = distance_matrix(network, origenes, [e.location for e in pendientes])
+        libres = set(unidades)
+        lineas = []
+        for col, emergencia in enumerate(pendientes):
+            tipo = emergencia.emergency_type
+            requeridos = [tipo] if tipo in recursos_disponibles else RECURSOS_POR_EMERGENCIA.get(tipo, [])
+            enviados = []
+            for recurso in requeridos:
+                candidatas = [u for u in libres if u[0] == recurso and matriz[fila[u[1]]][col] != float('inf')]
+                if not candidatas:
+                    continue
+                unidad = min(candidatas, key=lambda u: (matriz[fila[u[1]]][col], u[1]))
+                libres.discard(unidad)
+                enviados.append(f"{recurso.capitalize()} desde {unidad[1]} ({int(matriz[fila[unidad[1]]][col])} min)")
+            if enviados:
+                emergency_manager.annotate(emergencia, assigned_resources=enviados)
+            lineas.append(f"• {emergencia.emergency_type} en {emergencia.location}: "
+                          f"{', '.join(enviados) if enviados else 'sin unidades libres alcanzables'}")
+        messagebox.showinfo("Despacho de crisis", "\n".join(lineas))
+
     def pronostico_ia():
         eventos = [
             {"tipo": "sismo", "prob": 0.2},
@@ -493,32 +605,35 @@ def run_gui():
             estaciones_operativas = [e for e in estaciones if e in network.nodes and e not in nodos_fuera and e != estacion_afectada]
             if estaciones_operativas:
                 origen = random.choice(estaciones_operativas)
-                temp_graph = {n: [(v, w) for v, w in network.graph[n] if v not in nodos_fuera] for n in network.graph if n not in nodos_fuera}
-                distances, prev = dijkstra(temp_graph, origen, estacion_afectada)
-                if estacion_afectada in distances and distances[estacion_afectada] != float('inf'):
-                    path = reconstruct_path(prev, origen, estacion_afectada)
+                _, path = cache_rutas.route(origen, estacion_afectada)
+                if path:
                     visualizar_ruta_grafica_personalizada(path, estacion_afectada)
 
     def mostrar_estadisticas():
         em_stats = emergency_manager.get_statistics()
         net_stats = network.get_network_stats()
+        cache_stats = cache_rutas.get_stats()
         estaciones_fuera = sorted(nodos_fuera & set(estaciones))
+        cobertura_tipos = "\n".join(f"   {tipo}: {valor:.0%}" for tipo, valor in cobertura.coverage().items())
+        ultimas_24h = emergency_manager.store.count(since=datetime.now() - timedelta(days=1))
         info = (
             f" **Estadísticas Generales**\n\n"
             f" Emergencias: {em_stats.get('total', 0)} total\n"
             f" Pendientes: {em_stats.get('pending', 0)}\n"
             f" Atendidas: {em_stats.get('attended', 0)}\n"
+            f" Historial, últimas 24 h: {ultimas_24h}\n"
             f" Nodos en red: {net_stats.get('total_nodes', 0)}\n"
             f" Conexiones: {net_stats.get('total_connections', 0)}\n"
+            f" Conexiones operativas: {net_stats.get('operational_connections', 0)}\n"
+            f" Caché de rutas: {cache_stats['hits']} aciertos / {cache_stats['misses']} fallos\n"
+            f" Cobertura en {MINUTOS_COBERTURA} min por tipo de recurso:\n{cobertura_tipos}\n"
             f" Estaciones fuera de servicio: {len(estaciones_fuera)}\n"
             f"{'• ' + ', '.join(estaciones_fuera) if estaciones_fuera else ''}"
         )
 
         def ver_detalles():
             detalles = ""
-            if not emergency_manager.emergencies:
-                detalles = "No hay emergencias registradas."
-            else:
+            if emergency_manager.emergencies:
                 for idx, e in enumerate(emergency_manager.emergencies, 1):
                     estado = "Atendida" if getattr(e, "attended", False) else "Pendiente"
                     asignacion = getattr(e, "assigned_station", None)
@@ -531,6 +646,19 @@ def run_gui():
                         f"{idx}. Ubicación: {getattr(e, 'location', '?')} | Tipo: {getattr(e, 'emergency_type', getattr(e, 'type', '?'))} | "
                         f"Gravedad: {getattr(e, 'severity', '?')} | Estado: {estado}{asignacion_str}{recursos_str}\n"
                     )
+            # Las atendidas más recientes que ya pasaron al archivo columnar
+            if archivo is not None and len(archivo):
+                desde = max(0, len(archivo) - 100)
+                detalles += f"\nArchivadas ({len(archivo)}, se muestran las últimas {len(archivo) - desde}):\n"
+                for idx in range(desde, len(archivo)):
+                    r = archivo[idx]
+                    recursos_str = f" | Recursos enviados: {', '.join(r['resources'])}" if r["resources"] else ""
+                    detalles += (
+                        f"• Ubicación: {r['location']} | Tipo: {r['emergency_type']} | Gravedad: {r['severity']} | "
+                        f"Atendida por: {r['station']}{recursos_str}\n"
+                    )
+            if not detalles:
+                detalles = "No hay emergencias registradas."
             detalles_win = tk.Toplevel(root)
             detalles_win.title("Detalles de Emergencias")
             detalles_win.geometry("500x400")
@@ -545,7 +673,7 @@ def run_gui():
         # Ventana de estadísticas con botón de detalles
         stats_win = tk.Toplevel(root)
         stats_win.title("Estadísticas")
-        stats_win.geometry("400x350")
+        stats_win.geometry("400x520")
         stats_win.configure(bg="#f8f9fa")
         tk.Label(stats_win, text=info, bg="#f9f9fa", fg="#222f3e", font=button_font, justify="left").pack(pady=(18, 10))
         tk.Button(stats_win, text="Detalles", command=ver_detalles, bg="#0984e3", fg="white", font=button_font, width=18).pack(pady=10)
@@ -586,14 +714,15 @@ def run_gui():
             "Escribe el nombre de la estación a restaurar o '[Restaurar todos]' para restaurar toda la red:"
         )
         if nodo == "[Restaurar todos]":
+            for nf in nodos_fuera:
+                network.restore_node(nf)
             nodos_fuera.clear()
-            network.load_topology("topology.txt")
+            # Aplica solo las diferencias con topology.txt (sin duplicar conexiones)
+            network.reload_topology("topology.txt")
             messagebox.showinfo("Restaurar", "¡Todas las estaciones han sido restauradas!")
         elif nodo in fuera:
             nodos_fuera.remove(nodo)
-            network.load_topology("topology.txt")
-            for nf in nodos_fuera:
-                network.simulate_node_failure(nf)
+            network.restore_node(nodo)
             messagebox.showinfo("Restaurar", f"Estación {nodo} restaurada.")
         else:
             messagebox.showinfo("Restaurar", "Estación no válida.")
@@ -602,11 +731,24 @@ def run_gui():
         start = simpledialog.askstring("Ruta", f"Nodos disponibles: {sorted(network.nodes)}\nNodo origen:")
         end = simpledialog.askstring("Ruta", "Nodo destino:")
         if start in network.nodes and end in network.nodes:
-            temp_graph = {n: [(v, w) for v, w in network.graph[n] if v not in nodos_fuera] for n in network.graph if n not in nodos_fuera}
-            distances, prev = dijkstra(temp_graph, start, end)
-            if end in distances and distances[end] != float('inf'):
-                path = reconstruct_path(prev, start, end)
-                info = f"Ruta más corta: {' → '.join(path)}\nDistancia total: {distances[end]} unidades"
+            if componentes.connected(start, end):
+                distancia, path = cache_rutas.route(start, end)
+            else:
+                distancia, path = float('inf'), []
+            if path:
+                info = f"Ruta más corta: {' → '.join(path)}\nDistancia total: {distancia} unidades"
+                if network.has_profiles:
+                    # Tiempo estimado saliendo ahora, con los pesos de cada franja horaria
+                    ahora = datetime.now()
+                    tiempos, _ = time_dependent_dijkstra(network, start, end, ahora.hour * 60 + ahora.minute)
+                    if end in tiempos:
+                        info += f"\nTiempo estimado saliendo ahora ({ahora:%H:%M}): {tiempos[end]} min"
+                # Par de rutas sin estaciones intermedias en común: si una cae, la otra sigue disponible
+                independientes = disjoint_routes(network, start, end, k=2)
+                if len(independientes) == 2:
+                    info += "\nRutas independientes (principal / respaldo):"
+                    for ruta, distancia_ruta in independientes:
+                        info += f"\n  {' → '.join(ruta)} ({distancia_ruta} unidades)"
                 visualizar_ruta_grafica(path)
             else:
                 if end in nodos_fuera:
@@ -639,9 +781,9 @@ def run_gui():
         emergency = emergency_manager.add_emergency(nodo, severity, emergency_type, description)
         asignacion = simulator.assign_resources(emergency)
         
-        emergency.assigned_station, _ = estacion_mas_cercana(nodo, excluir=nodo)
-        emergency.assigned_resources = [datos['resource_id'] for datos in asignacion["assignments"].values()] if isinstance(asignacion, dict) and "assignments" in asignacion else []
-        emergency.attended = False
+        estacion_asignada, _ = estacion_mas_cercana(nodo, excluir=nodo)
+        emergency_manager.assign(emergency, estacion_asignada)
+        emergency_manager.annotate(emergency, assigned_resources=[datos['resource_id'] for datos in asignacion["assignments"].values()] if isinstance(asignacion, dict) and "assignments" in asignacion else [])
 
         if nodo in network.nodes:
             nodos_fuera.add(nodo)
@@ -651,16 +793,13 @@ def run_gui():
                                      f"Estaciones notificadas: {', '.join(estaciones_afectadas)}")
 
         # REASIGNAR EMERGENCIAS PENDIENTES
-        pendientes = [
-            e for e in emergency_manager.emergencies
-            if not getattr(e, "attended", False) and getattr(e, "assigned_station", None) == nodo
-        ]
+        pendientes = emergency_manager.pending(nodo)
         reasignaciones = []
         for emergencia in pendientes:
             nueva_estacion, nueva_dist = estacion_mas_cercana(emergencia.location, excluir=nodo)
             if nueva_estacion:
                 anterior = emergencia.assigned_station
-                emergencia.assigned_station = nueva_estacion
+                emergency_manager.assign(emergencia, nueva_estacion)
                 noti = (
                     f"Emergencia en {emergencia.location} ha sido reasignada a {nueva_estacion} "
                     f"por falla de {nodo}."
@@ -672,7 +811,7 @@ def run_gui():
                     f"   reasignada de {anterior} a {nueva_estacion}."
                 )
             else:
-                emergencia.assigned_station = None  
+                emergency_manager.assign(emergencia, None)
                 reasignaciones.append(
                     f"• Emergencia en {emergencia.location} (tipo: {getattr(emergencia, 'emergency_type', getattr(emergencia, 'type', '?'))}, gravedad: {getattr(emergencia, 'severity', '?')})\n"
                     f"   no pudo ser reasignada (no hay estaciones disponibles)."
@@ -725,30 +864,37 @@ def run_gui():
             if destino not in otros:
                 messagebox.showinfo("Ruta", "Estación destino no válida o fuera de servicio.")
                 return
-            temp_graph = {n: [(v, w) for v, w in network.graph[n] if v not in nodos_fuera] for n in network.graph if n not in nodos_fuera}
-            distances, prev = dijkstra(temp_graph, estacion, destino)
-            if destino in distances and distances[destino] != float('inf'):
-                path = reconstruct_path(prev, estacion, destino)
-                info = f"Ruta más corta: {' → '.join(path)}\nDistancia total: {distances[destino]} unidades"
+            if componentes.connected(estacion, destino):
+                distancia, path = cache_rutas.route(estacion, destino)
+            else:
+                distancia, path = float('inf'), []
+            if path:
+                info = f"Ruta más corta: {' → '.join(path)}\nDistancia total: {distancia} unidades"
+                if network.has_profiles:
+                    # Tiempo estimado saliendo ahora, con los pesos de cada franja horaria
+                    ahora = datetime.now()
+                    tiempos, _ = time_dependent_dijkstra(network, estacion, destino, ahora.hour * 60 + ahora.minute)
+                    if destino in tiempos:
+                        info += f"\nTiempo estimado saliendo ahora ({ahora:%H:%M}): {tiempos[destino]} min"
+                # Par de rutas sin estaciones intermedias en común: si una cae, la otra sigue disponible
+                independientes = disjoint_routes(network, estacion, destino, k=2)
+                if len(independientes) == 2:
+                    info += "\nRutas independientes (principal / respaldo):"
+                    for ruta, distancia_ruta in independientes:
+                        info += f"\n  {' → '.join(ruta)} ({distancia_ruta} unidades)"
                 visualizar_ruta_grafica(path)
             else:
                 info = "No existe ruta disponible."
             messagebox.showinfo("Ruta más corta", info)        
            
         def marcar_atendida():
-            emergencia_activa = None
-            for e in emergency_manager.emergencies:
-                if not getattr(e, "attended", False) and getattr(e, "assigned_station", None) == estacion:
-                    emergencia_activa = e
-                    break
+            # La emergencia pendiente más urgente de la estación
+            emergencia_activa = emergency_manager.next_urgent(estacion)
             if emergencia_activa:
-                emergencia_activa.attended = True
                 emergency_manager.attend_emergency(emergencia_activa)
                 if emergencia_activa.location in nodos_fuera:
                     nodos_fuera.remove(emergencia_activa.location)
-                    network.load_topology("topology.txt")
-                    for nf in nodos_fuera:
-                        network.simulate_node_failure(nf)
+                    network.restore_node(emergencia_activa.location)
                 messagebox.showinfo("Atendida", f"La emergencia en {emergencia_activa.location} ha sido atendida y la estación ha sido reconectada.")
             else:
                 messagebox.showinfo("Atendida", f" No hay emergencia activa asignada a esta estación.\nLa estación está operativa.")
@@ -760,11 +906,7 @@ def run_gui():
                 messagebox.showinfo("Notifs", "\n".join(notificaciones_globales))
 
         def ver_emergencias_pendientes():
-            pendientes = [
-                e for e in emergency_manager.emergencies
-                if not getattr(e, "attended", False) and getattr(e, "assigned_station", None) == estacion
-            ]
-            pendientes.sort(key=lambda e: (-getattr(e, "severity", 0), getattr(e, "timestamp", 0)))
+            pendientes = emergency_manager.pending(estacion, by_urgency=True)
             if pendientes:
                 ventana = tk.Toplevel(est_win)
                 ventana.title("Emergencias pendientes")
@@ -781,7 +923,6 @@ def run_gui():
                     )
                     tk.Label(frame_em, text=info, bg="#f9f9fa", fg="#222f3e", font=("Segoe UI", 10)).pack(side="left", padx=(0, 8))
                     def marcar_atendida_local(em=e, fr=frame_em):
-                        em.attended = True
                         emergency_manager.attend_emergency(em)
                         messagebox.showinfo("Atendida", f"La emergencia en {em.location} ha sido marcada como atendida.")
                         fr.destroy()
@@ -800,7 +941,55 @@ def run_gui():
         tk.Button(est_win, text="⬅ Volver al menú principal", width=32, command=est_win.destroy, bg="#e9ecef", fg="#222f3e", font=button_font).pack(pady=12)
 
    
+    # Aplica en caliente los cambios de topology.txt sin reiniciar la aplicación
+    def vigilar_topologia():
+        cambios = topology_watcher.poll()
+        if cambios and any(cambios.values()):
+            noti = (
+                f" Topología actualizada: {cambios['added']} conexiones nuevas, "
+                f"{cambios['removed']} eliminadas, {cambios['reweighted']} con peso modificado."
+            )
+            notificaciones_globales.append(noti)
+            # Mientras la jerarquía esté desactualizada sus consultas caen a Dijkstra bidireccional
+            if isinstance(rutas, ContractionHierarchy) and rutas.stale:
+                rutas.build()
+                rutas.save(ARCHIVO_JERARQUIA)
+        root.after(2000, vigilar_topologia)
+
+    # Estaciones y enlaces cuya pérdida más afecta a la red (aislamiento e intermediación)
+    def analizar_criticidad():
+        muestra = 200 if network.node_count > 2000 else None
+        informe = criticality_report(network, top=5, sample=muestra, seed=0, workers=1)
+        messagebox.showinfo("Análisis de criticidad", format_report(informe))
+
+    # Fallas múltiples (p. ej. un sismo): degradación promedio de la conectividad y de la cobertura
+    # de las estaciones cuando caen al azar hasta la cantidad de nodos indicada. Los ensayos corren
+    # en este proceso: main.py arranca la interfaz al importarse y no admite procesos de trabajo
+    def simular_fallas_multiples():
+        operativos = network.node_count - len(network.failed_nodes)
+        maximo = simpledialog.askinteger(
+            "Fallas múltiples", f"¿Cuántos nodos pueden caer a la vez? (1-{operativos})",
+            minvalue=1, maxvalue=max(1, operativos))
+        if not maximo:
+            return
+        resultado = simulate_cascades(network, estaciones, trials=500, max_failures=maximo, seed=0, workers=1)
+        messagebox.showinfo("Fallas múltiples", format_summary(resultado, every=max(1, maximo // 10)))
+
+    # Commit de grupo periódico: los eventos anotados quedan en disco aunque no llegue otro
+    def sincronizar_registro():
+        diario.sync()
+        emergency_manager.store.flush()
+        root.after(1000, sincronizar_registro)
+
+    # Pasa las atendidas al archivo columnar para no acumular objetos durante la sesión
+    def archivar_atendidas():
+        emergency_manager.archive_attended()
+        root.after(ARCHIVAR_CADA_MS, archivar_atendidas)
+
     def salir():
+        diario.close()
+        emergency_manager.store.close()
+        network.close()
         root.destroy()
 
     
@@ -815,6 +1004,9 @@ def run_gui():
         (" reportar emergencia", reportar_emergencia_estacion),  
         (" Ingresar a una estación", ingresar_estacion),  
         (" Pronóstico IA de emergencias", pronostico_ia), 
+        (" Despacho de crisis", despacho_crisis),
+        (" Análisis de criticidad", analizar_criticidad),
+        (" Simular fallas múltiples", simular_fallas_multiples),
         ("Salir", salir)  
     ]
 
@@ -825,7 +1017,10 @@ def run_gui():
             bg="#e9ecef", fg="#222f3e", font=button_font, relief="groove", bd=2, activebackground="#dee2e6"
         ).pack(pady=4)
 
-    
+    root.after(2000, vigilar_topologia)
+    root.after(1000, sincronizar_registro)
+    root.after(ARCHIVAR_CADA_MS, archivar_atendidas)
+    root.protocol("WM_DELETE_WINDOW", salir)
     root.mainloop()
 
 
@@ -1,35 +1,605 @@
 # network.py
 
+from array import array
 from collections import defaultdict
+from collections.abc import Mapping
+import os
+
+import topology_cache
+
+
+# Vista de solo lectura que expone la red como el antiguo diccionario de adyacencia
+# {nodo: [(vecino, peso), ...]}; las listas se generan a partir del CSR al consultarlas
+class _GraphView(Mapping):
+    __slots__ = ("_network",)
+
+    def __init__(self, network):
+        self._network = network
+
+    def __getitem__(self, node):
+        return self._network.neighbors(node)
+
+    def __contains__(self, node):
+        return node in self._network._ids
+
+    def __iter__(self):
+        return iter(self._network._names)
+
+    def __len__(self):
+        return len(self._network._names)
+
 
 # Clase que representa la red de estaciones y sus conexiones
 class Network:
     def __init__(self):
-        # Inicializa el grafo, el conjunto de nodos y las estadísticas de tráfico
-        self.graph = defaultdict(list)
-        self.nodes = set()
-        self.stats = defaultdict(int)  
+        # Tablas de internado nombre <-> id entero
+        self._ids = {}
+        self._names = []
+        self._node_set = set()
+        # Lista de aristas no dirigidas (una entrada por par de nodos, sin paralelas)
+        self._edge_u = array("i")
+        self._edge_v = array("i")
+        self._edge_w = array("q")
+        # Representación CSR (offsets/targets/weights), reconstruida bajo demanda
+        self._offsets = array("i", [0])
+        self._targets = array("i")
+        self._weights = array("q")
+        self._csr_valid = True
+        # Contabilidad incremental: índice de pares únicos, grados y conexiones operativas
+        self._edge_index = {}
+        self._edge_count = 0
+        self._degree = array("i")
+        self._degree_hist = [0]
+        self._degree_total = 0
+        self._max_degree = 0
+        self._operational_edges = 0
+        # Máscara de fallas: un byte por nodo y claves empaquetadas de enlaces caídos
+        self._failed = bytearray()
+        self._failed_count = 0
+        self._failed_links = set()
+        # Perfiles horarios opcionales: clave de enlace -> array('q') con 24 pesos (uno por hora)
+        self._profiles = {}
+        # Suscriptores a cambios de la red (oráculos, árboles, índices derivados)
+        self._listeners = []
+        # Versión de la red: aumenta con cada cambio de topología, pesos o fallas
+        self._version = 0
+        # Mapa en memoria de la caché de topología cuyos arreglos usa la red (o None)
+        self._mapped = None
+        self.stats = defaultdict(int)
+
+    @property
+    def graph(self):
+        # Compatibilidad con el acceso network.graph[nodo]
+        return _GraphView(self)
+
+    @property
+    def nodes(self):
+        # Conjunto de los nombres de nodo, mantenido al internar (no se debe modificar)
+        return self._node_set
+
+    @property
+    def node_count(self):
+        return len(self._names)
+
+    @property
+    def node_names(self):
+        return self._names
+
+    @property
+    def version(self):
+        return self._version
+
+    def node_id(self, name):
+        # Devuelve el id entero de un nodo o None si no existe
+        return self._ids.get(name)
+
+    def subscribe(self, callback):
+        # callback(evento, *args) con ids enteros: "edge_added" (a, b, peso), "edge_removed"
+        # (a, b, peso), "weight_changed" (a, b, anterior, nuevo), "node_failed" / "node_restored"
+        # (a), "link_failed" / "link_restored" (a, b), "profile_changed" (a, b) y
+        # "topology_replaced" ()
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, event, *args):
+        for callback in tuple(self._listeners):
+            callback(event, *args)
+
+    def _intern(self, name):
+        node_id = self._ids.get(name)
+        if node_id is None:
+            node_id = len(self._names)
+            self._ids[name] = node_id
+            self._names.append(name)
+            self._node_set.add(name)
+            self._degree.append(0)
+            self._degree_hist[0] += 1
+            self._failed.append(0)
+            self._csr_valid = False
+        return node_id
+
+    def _attach_arrays(self, names, edge_u, edge_v, edge_w, offsets, targets, weights, degree, edge_count,
+                       profiles=None):
+        # Adopta arreglos ya construidos (p. ej. vistas de solo lectura de la caché mapeada)
+        self._names = names
+        self._ids = dict(zip(names, range(len(names))))
+        self._node_set = set(names)
+        self._failed = bytearray(len(names))
+        self._failed_count = 0
+        self._failed_links = set()
+        self._edge_u, self._edge_v, self._edge_w = edge_u, edge_v, edge_w
+        self._offsets, self._targets, self._weights = offsets, targets, weights
+        self._csr_valid = True
+        # El índice de pares se construye recién cuando se modifica la red
+        self._edge_index = None
+        self._edge_count = edge_count
+        self._degree = degree
+        self._degree_hist = None
+        self._degree_total = sum(degree)
+        self._max_degree = max(degree, default=0)
+        self._operational_edges = edge_count
+        self._profiles = profiles or {}
+        self._version += 1
+        if self._listeners:
+            self._notify("topology_replaced")
+
+    def close(self):
+        # Copia a arreglos propios las vistas de la caché mapeada y cierra el mapa; la red sigue
+        # siendo utilizable
+        if self._mapped is None:
+            return
+        self._ensure_mutable()
+        self._offsets, self._targets, self._weights = array("i", [0]), array("i"), array("q")
+        self._csr_valid = False
+        mapped, self._mapped = self._mapped, None
+        try:
+            mapped.close()
+        except BufferError:
+            # Alguien conserva una vista del CSR anterior: el mapa se cierra cuando la suelte
+            pass
+
+    def _ensure_mutable(self):
+        # Copia a arreglos propios las vistas de solo lectura antes de modificar la red
+        if isinstance(self._edge_u, array):
+            return
+        edge_u, edge_v, edge_w = array("i"), array("i"), array("q")
+        edge_u.frombytes(self._edge_u.cast("B"))
+        edge_v.frombytes(self._edge_v.cast("B"))
+        edge_w.frombytes(self._edge_w.cast("B"))
+        degree = array("i")
+        degree.frombytes(self._degree.cast("B"))
+        self._edge_u, self._edge_v, self._edge_w = edge_u, edge_v, edge_w
+        self._degree = degree
+        self._csr_valid = False
+        self._ensure_index()
+        # Histograma de grados para mantener el grado máximo al quitar conexiones
+        hist = [0] * (self._max_degree + 1)
+        for d in degree:
+            hist[d] += 1
+        self._degree_hist = hist
+
+    def _ensure_index(self):
+        # Índice clave de par -> primera posición en la lista de aristas
+        if self._edge_index is not None:
+            return
+        link_key = self.link_key
+        index = {}
+        for slot, (a, b) in enumerate(zip(self._edge_u, self._edge_v)):
+            index.setdefault(link_key(a, b), slot)
+        self._edge_index = index
+
+    def _add_degree(self, node_id):
+        degree = self._degree[node_id] + 1
+        self._degree[node_id] = degree
+        self._degree_total += 1
+        hist = self._degree_hist
+        hist[degree - 1] -= 1
+        if degree == len(hist):
+            hist.append(0)
+        hist[degree] += 1
+        if degree > self._max_degree:
+            self._max_degree = degree
+
+    def _remove_degree(self, node_id):
+        degree = self._degree[node_id] - 1
+        self._degree[node_id] = degree
+        self._degree_total -= 1
+        hist = self._degree_hist
+        hist[degree + 1] -= 1
+        hist[degree] += 1
+        if degree + 1 == self._max_degree and not hist[degree + 1]:
+            self._max_degree = degree
+
+    def _operational_degree(self, node_id):
+        # Vecinos distintos alcanzables desde node_id por enlaces operativos
+        offsets, targets, _ = self.csr()
+        failed, failed_links, link_key = self._failed, self._failed_links, self.link_key
+        neighbors = set()
+        for i in range(offsets[node_id], offsets[node_id + 1]):
+            v = targets[i]
+            if not failed[v] and not (failed_links and link_key(node_id, v) in failed_links):
+                neighbors.add(v)
+        return len(neighbors)
 
     def add_connection(self, u, v, weight):
         
-        self.graph[u].append((v, weight))
-        self.graph[v].append((u, weight))
-        self.nodes.add(u)
-        self.nodes.add(v)
+        self._ensure_mutable()
+        a = self._intern(u)
+        b = self._intern(v)
+        key = self.link_key(a, b)
+        slot = self._edge_index.get(key)
+        if slot is not None:
+            # Las aristas paralelas se deduplican conservando el menor peso
+            if weight < self._edge_w[slot]:
+                self._set_slot_weight(slot, weight)
+            return
+        self._edge_index[key] = len(self._edge_u)
+        self._edge_count += 1
+        self._add_degree(a)
+        if b != a:
+            self._add_degree(b)
+        if not (self._failed[a] or self._failed[b] or key in self._failed_links):
+            self._operational_edges += 1
+        self._edge_u.append(a)
+        self._edge_v.append(b)
+        self._edge_w.append(weight)
+        self._csr_valid = False
+        self._version += 1
+        if self._listeners:
+            self._notify("edge_added", a, b, weight)
+
+    def remove_connection(self, u, v):
+        # Quita la conexión entre u y v; los nodos quedan registrados aunque queden aislados
+        a, b = self._ids.get(u), self._ids.get(v)
+        if a is None or b is None:
+            return False
+        self._ensure_mutable()
+        key = self.link_key(a, b)
+        slot = self._edge_index.pop(key, None)
+        if slot is None:
+            return False
+        if not (self._failed[a] or self._failed[b] or key in self._failed_links):
+            self._operational_edges -= 1
+        self._failed_links.discard(key)
+        self._profiles.pop(key, None)
+        self._edge_count -= 1
+        self._remove_degree(a)
+        if b != a:
+            self._remove_degree(b)
+        # Se mueve la última arista al hueco para mantener la lista compacta
+        edge_u, edge_v, edge_w = self._edge_u, self._edge_v, self._edge_w
+        weight = edge_w[slot]
+        last = len(edge_u) - 1
+        if slot != last:
+            edge_u[slot], edge_v[slot], edge_w[slot] = edge_u[last], edge_v[last], edge_w[last]
+            self._edge_index[self.link_key(edge_u[slot], edge_v[slot])] = slot
+        edge_u.pop()
+        edge_v.pop()
+        edge_w.pop()
+        self._csr_valid = False
+        self._version += 1
+        if self._listeners:
+            self._notify("edge_removed", a, b, weight)
+        return True
+
+    def set_weight(self, u, v, weight):
+        # Cambia el peso de una conexión existente sin reconstruir el CSR
+        a, b = self._ids.get(u), self._ids.get(v)
+        if a is None or b is None:
+            return False
+        self._ensure_mutable()
+        slot = self._edge_index.get(self.link_key(a, b))
+        if slot is None:
+            return False
+        self._set_slot_weight(slot, weight)
+        return True
+
+    def _set_slot_weight(self, slot, weight):
+        old_weight = self._edge_w[slot]
+        self._edge_w[slot] = weight
+        a, b = self._edge_u[slot], self._edge_v[slot]
+        if self._csr_valid:
+            # Parcha las dos entradas dirigidas del CSR en O(grado)
+            offsets, targets, weights = self._offsets, self._targets, self._weights
+            for x, y in ((a, b), (b, a)):
+                for i in range(offsets[x], offsets[x + 1]):
+                    if targets[i] == y:
+                        weights[i] = weight
+        self._version += 1
+        if self._listeners:
+            self._notify("weight_changed", a, b, old_weight, weight)
+
+    def set_profile(self, u, v, hourly):
+        # Perfil horario de una conexión existente: 24 pesos (uno por hora) o None para quitarlo.
+        # El peso estático sigue siendo el de las consultas sin hora de salida
+        a, b = self._ids.get(u), self._ids.get(v)
+        if a is None or b is None:
+            return False
+        self._ensure_index()
+        key = self.link_key(a, b)
+        if key not in self._edge_index:
+            return False
+        if hourly is None:
+            if self._profiles.pop(key, None) is None:
+                return False
+        else:
+            if len(hourly) != 24:
+                raise ValueError("El perfil horario debe tener 24 pesos")
+            self._profiles[key] = array("q", hourly)
+        self._version += 1
+        if self._listeners:
+            self._notify("profile_changed", a, b)
+        return True
+
+    def link_profile(self, a, b):
+        # Perfil horario del enlace entre los ids a y b, o None si solo tiene peso estático
+        return self._profiles.get(self.link_key(a, b))
+
+    def link_profiles(self):
+        # Itera (a, b, perfil) sobre los enlaces con perfil horario, con ids enteros
+        for key, profile in self._profiles.items():
+            yield key >> 32, key & 0xFFFFFFFF, profile
+
+    @property
+    def has_profiles(self):
+        return bool(self._profiles)
+
+    def csr(self):
+        # Devuelve (offsets, targets, weights); los vecinos de i están en offsets[i]:offsets[i+1]
+        if not self._csr_valid:
+            self._build_csr()
+        return self._offsets, self._targets, self._weights
+
+    def _build_csr(self):
+        
+        n = len(self._names)
+        edge_u, edge_v, edge_w = self._edge_u, self._edge_v, self._edge_w
+        # Conteo de grados y suma prefija (counting sort por nodo origen)
+        offsets = array("i", bytes(4 * (n + 1)))
+        for a in edge_u:
+            offsets[a + 1] += 1
+        for b in edge_v:
+            offsets[b + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+        total = offsets[n]
+        targets = array("i", bytes(4 * total))
+        weights = array("q", bytes(8 * total))
+        cursor = offsets[:-1]
+        # Se conserva el orden de inserción de vecinos de cada nodo
+        for a, b, w in zip(edge_u, edge_v, edge_w):
+            pos = cursor[a]
+            targets[pos] = b
+            weights[pos] = w
+            cursor[a] = pos + 1
+            pos = cursor[b]
+            targets[pos] = a
+            weights[pos] = w
+            cursor[b] = pos + 1
+        self._offsets, self._targets, self._weights = offsets, targets, weights
+        self._csr_valid = True
+
+    def link_weight(self, a, b):
+        # Peso de la conexión entre los ids a y b, o None si no existe
+        self._ensure_index()
+        slot = self._edge_index.get(self.link_key(a, b))
+        return None if slot is None else self._edge_w[slot]
+
+    def neighbors(self, node):
+        # Lista [(vecino, peso), ...] de un nodo por nombre
+        node_id = self._ids.get(node)
+        if node_id is None:
+            return []
+        offsets, targets, weights = self.csr()
+        names = self._names
+        return [(names[targets[i]], weights[i]) for i in range(offsets[node_id], offsets[node_id + 1])]
+
+    @staticmethod
+    def link_key(a, b):
+        # Clave entera de un enlace no dirigido entre los ids a y b
+        return (a << 32) | b if a < b else (b << 32) | a
+
+    def failure_mask(self):
+        # Devuelve (nodos caídos por id, claves de enlaces caídos) para los algoritmos de ruteo
+        return self._failed, self._failed_links
+
+    @property
+    def failed_nodes(self):
+        names = self._names
+        return {names[i] for i, failed in enumerate(self._failed) if failed} if self._failed_count else set()
+
+    @property
+    def has_failures(self):
+        return bool(self._failed_count or self._failed_links)
+
+    def is_failed(self, node):
+        node_id = self._ids.get(node)
+        return node_id is not None and bool(self._failed[node_id])
+
+    def fail_node(self, node):
+        # Marca un nodo como fuera de servicio en O(1); devuelve False si no cambió nada
+        node_id = self._ids.get(node)
+        if node_id is None or self._failed[node_id]:
+            return False
+        self._operational_edges -= self._operational_degree(node_id)
+        self._failed[node_id] = 1
+        self._failed_count += 1
+        self._version += 1
+        if self._listeners:
+            self._notify("node_failed", node_id)
+        return True
+
+    def restore_node(self, node):
+        
+        node_id = self._ids.get(node)
+        if node_id is None or not self._failed[node_id]:
+            return False
+        self._failed[node_id] = 0
+        self._failed_count -= 1
+        self._operational_edges += self._operational_degree(node_id)
+        self._version += 1
+        if self._listeners:
+            self._notify("node_restored", node_id)
+        return True
+
+    def fail_link(self, u, v):
+        
+        a, b = self._ids.get(u), self._ids.get(v)
+        if a is None or b is None:
+            return False
+        key = self.link_key(a, b)
+        if key in self._failed_links:
+            return False
+        self._ensure_index()
+        if key in self._edge_index and not (self._failed[a] or self._failed[b]):
+            self._operational_edges -= 1
+        self._failed_links.add(key)
+        self._version += 1
+        if self._listeners:
+            self._notify("link_failed", a, b)
+        return True
+
+    def restore_link(self, u, v):
+        
+        a, b = self._ids.get(u), self._ids.get(v)
+        if a is None or b is None:
+            return False
+        key = self.link_key(a, b)
+        if key not in self._failed_links:
+            return False
+        self._failed_links.discard(key)
+        if key in self._edge_index and not (self._failed[a] or self._failed[b]):
+            self._operational_edges += 1
+        self._version += 1
+        if self._listeners:
+            self._notify("link_restored", a, b)
+        return True
+
+    def operational_graph(self):
+        # Copia en diccionario de la red operativa, para grafos temporales con nodos ficticios
+        offsets, targets, weights = self.csr()
+        names, failed, failed_links = self._names, self._failed, self._failed_links
+        temp_graph = {}
+        for a, name in enumerate(names):
+            if failed[a]:
+                continue
+            temp_graph[name] = [
+                (names[targets[i]], weights[i])
+                for i in range(offsets[a], offsets[a + 1])
+                if not failed[targets[i]] and not (failed_links and self.link_key(a, targets[i]) in failed_links)
+            ]
+        return temp_graph
+
+    @classmethod
+    def from_graph(cls, graph):
+        # Red a partir de un diccionario {nodo: [(vecino, peso), ...]}, como el de operational_graph
+        network = cls()
+        for node, edges in graph.items():
+            network._intern(node)
+            for neighbor, weight in edges:
+                network.add_connection(node, neighbor, weight)
+        return network
+
+    def load_topology(self, filename, use_cache=True):
+        
+        # Con la red vacía se intenta primero la versión compilada (ver topology_cache)
+        cacheable = use_cache and not self._names
+        if cacheable and topology_cache.load(self, filename):
+            print(f"Topología cargada: {len(self.nodes)} nodos, {self.count_edges()} conexiones")
+            return
+        for u, v, w, profile in self._parse_topology(filename):
+            self.add_connection(u, v, w)
+            if profile is not None:
+                self.set_profile(u, v, profile)
+        if cacheable:
+            topology_cache.save(self, filename)
+        print(f"Topología cargada: {len(self.nodes)} nodos, {self.count_edges()} conexiones")
 
-    def load_topology(self, filename):
+    @staticmethod
+    def _parse_topology(filename):
         
         with open(filename, "r", encoding="utf-8") as f:
-            for line in f:
+            for number, line in enumerate(f, 1):
                 line = line.strip()
                 if not line or line.startswith("#"):
                     continue
                 parts = line.split()
-                if len(parts) != 3:
+                if len(parts) < 3:
                     continue  # Salta líneas mal formateadas
-                u, v, w = parts[0], parts[1], int(parts[2])
+                try:
+                    weight = int(parts[2])
+                except ValueError:
+                    continue
+                profile = None
+                if len(parts) > 3:
+                    # Una franja mal escrita no descarta el enlace: queda con su peso fijo
+                    try:
+                        profile = Network._parse_profile(weight, parts[3:])
+                    except ValueError:
+                        print(f"Franjas horarias inválidas en la línea {number} ({line}); se usa el peso fijo")
+                yield parts[0], parts[1], weight, profile
+
+    @staticmethod
+    def _parse_profile(base, tokens):
+        # Franjas "h1-h2:peso" (horas 0-23, ambas inclusivas; 22-5 cruza la medianoche) sobre
+        # el peso base; devuelve los 24 pesos horarios
+        hourly = [base] * 24
+        for token in tokens:
+            hours, weight = token.split(":")
+            start, end = (int(h) for h in hours.split("-"))
+            if not (0 <= start < 24 and 0 <= end < 24):
+                raise ValueError(f"Hora fuera de rango en {token}")
+            hour = start
+            while True:
+                hourly[hour] = int(weight)
+                if hour == end:
+                    break
+                hour = (hour + 1) % 24
+        return hourly
+
+    def reload_topology(self, filename, use_cache=True):
+        # Recarga idempotente: compara el archivo con la red y aplica solo las diferencias
+        self._ensure_mutable()
+        desired = {}
+        for u, v, w, profile in self._parse_topology(filename):
+            key = self.link_key(self._intern(u), self._intern(v))
+            if key not in desired or w < desired[key][2]:
+                desired[key] = (u, v, w, profile)
+        names, edge_u, edge_v, edge_w = self._names, self._edge_u, self._edge_v, self._edge_w
+        removed = [
+            (names[edge_u[slot]], names[edge_v[slot]])
+            for key, slot in self._edge_index.items() if key not in desired
+        ]
+        for u, v in removed:
+            self.remove_connection(u, v)
+        added = reweighted = 0
+        for key, (u, v, w, profile) in desired.items():
+            slot = self._edge_index.get(key)
+            current = self._profiles.get(key)
+            profile_changed = (list(current) if current is not None else None) != profile
+            if slot is None:
                 self.add_connection(u, v, w)
-        print(f"Topología cargada: {len(self.nodes)} nodos, {self.count_edges()} conexiones")
+                added += 1
+            elif edge_w[slot] != w or profile_changed:
+                if edge_w[slot] != w:
+                    self._set_slot_weight(slot, w)
+                reweighted += 1
+            if profile_changed:
+                self.set_profile(u, v, profile)
+        changes = {"added": added, "removed": len(removed), "reweighted": reweighted}
+        if any(changes.values()):
+            if use_cache:
+                topology_cache.save(self, filename)
+            print(f"Topología recargada: +{added} -{len(removed)} ~{reweighted} conexiones")
+        return changes
+
+    def watch_topology(self, filename):
+        # Devuelve un vigilante que aplica con reload_topology los cambios del archivo
+        return TopologyWatcher(self, filename)
 
     def create_default_topology(self):
         
@@ -46,28 +616,30 @@ class Network:
         for u, v, w in connections:
             self.add_connection(u, v, w)
 
+    def create_grid_topology(self, rows, cols, min_weight=1, max_weight=10, seed=None):
+        # Cuadrícula rows x cols con pesos aleatorios; sirve como red urbana sintética para pruebas
+        import random
+
+        rng = random.Random(seed)
+        for r in range(rows):
+            for c in range(cols):
+                if c + 1 < cols:
+                    self.add_connection(f"N{r}_{c}", f"N{r}_{c + 1}", rng.randint(min_weight, max_weight))
+                if r + 1 < rows:
+                    self.add_connection(f"N{r}_{c}", f"N{r + 1}_{c}", rng.randint(min_weight, max_weight))
+
     def count_edges(self):
         
-        edges = set()
-        for node in self.graph:
-            for neighbor, _ in self.graph[node]:
-                edge = tuple(sorted([node, neighbor]))
-                edges.add(edge)
-        return len(edges)
+        # Pares de nodos conectados (sin contar aristas paralelas), mantenido en add_connection
+        return self._edge_count
 
     def simulate_node_failure(self, failed_node):
         
+        # La falla queda registrada en la máscara; el ruteo sobre la red ya la respeta
         if failed_node in self.nodes:
             print(f"⚠️  FALLA SIMULADA: Nodo {failed_node} fuera de servicio")
-           
-            temp_graph = defaultdict(list)
-            for node in self.graph:
-                if node != failed_node:
-                    for neighbor, weight in self.graph[node]:
-                        if neighbor != failed_node:
-                            temp_graph[node].append((neighbor, weight))
-            return temp_graph
-        return self.graph
+            self.fail_node(failed_node)
+        return self
 
     def update_traffic_stats(self, node):
         
@@ -75,9 +647,14 @@ class Network:
 
     def get_network_stats(self):
        
+        total_nodes = len(self._names)
         return {
-            'total_nodes': len(self.nodes),
-            'total_connections': self.count_edges(),
+            'total_nodes': total_nodes,
+            'total_connections': self._edge_count,
+            'operational_nodes': total_nodes - self._failed_count,
+            'operational_connections': self._operational_edges,
+            'average_degree': self._degree_total / total_nodes if total_nodes else 0,
+            'max_degree': self._max_degree,
             'traffic_per_node': dict(self.stats)
         }
 
@@ -117,4 +694,27 @@ class Network:
                     added_edges.add(edge)
 
         dot.render(output_file, view=True)
-        print(f"Gráfico generado: {output_file}.png")
\ No newline at end of file
+        print(f"Gráfico generado: {output_file}.png")
+
+
+# Vigila un archivo de topología (tamaño y fecha) y aplica sus cambios sin reiniciar
+class TopologyWatcher:
+    def __init__(self, network, filename):
+        self.network = network
+        self.filename = filename
+        self._signature = self._stat()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.filename)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def poll(self):
+        # Devuelve el resumen de cambios aplicados, o None si el archivo no cambió
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return None
+        self._signature = signature
+        return self.network.reload_topology(self.filename)
@@ -0,0 +1,222 @@
+# parallel.py
+
+import os
+import time
+from array import array
+from multiprocessing import Pool, shared_memory, util
+
+from network import Network
+from routing import _dijkstra_ids
+
+# Ejecutor paralelo de búsquedas desde una fuente. La red (CSR + máscara de fallas) se copia una
+# sola vez a bloques de multiprocessing.shared_memory; los procesos de trabajo solo reciben los
+# nombres de los bloques y se adjuntan a ellos sin deserializar el grafo.
+
+# Arreglos compartidos: nombre, código de tipo
+_ARRAYS = (("offsets", "i"), ("targets", "i"), ("weights", "q"), ("failed", "B"), ("failed_links", "q"))
+
+
+# Vista de solo lectura de la red sobre memoria compartida, con la interfaz que usan las
+# búsquedas de routing (csr, failure_mask, node_count, link_key)
+class SharedGraph:
+    link_key = staticmethod(Network.link_key)
+
+    def __init__(self, descriptor):
+        self.node_count = descriptor["node_count"]
+        self._blocks = []
+        views = {}
+        for key, code in _ARRAYS:
+            name, length = descriptor[key]
+            block = shared_memory.SharedMemory(name=name)
+            self._blocks.append(block)
+            views[key] = block.buf[:length * array(code).itemsize].cast(code)
+        self._views = list(views.values())
+        self._csr = (views["offsets"], views["targets"], views["weights"])
+        self._mask = (views["failed"], frozenset(views["failed_links"]))
+
+    def csr(self):
+        return self._csr
+
+    def failure_mask(self):
+        return self._mask
+
+    def close(self):
+
+        # Las vistas se liberan antes: un bloque con vistas exportadas no se puede cerrar
+        self._csr = self._mask = None
+        for view in self._views:
+            view.release()
+        self._views = []
+        for block in self._blocks:
+            block.close()
+        self._blocks = []
+
+
+def _share(network):
+    # Copia la red a bloques compartidos; devuelve (bloques, descriptor picklable)
+    offsets, targets, weights = network.csr()
+    failed, failed_links = network.failure_mask()
+    sources = {
+        "offsets": offsets,
+        "targets": targets,
+        "weights": weights,
+        "failed": bytes(failed),
+        "failed_links": array("q", sorted(failed_links)),
+    }
+    blocks = []
+    descriptor = {"node_count": network.node_count}
+    for key, code in _ARRAYS:
+        data = memoryview(sources[key]).cast("B")
+        # SharedMemory no admite tamaño cero
+        block = shared_memory.SharedMemory(create=True, size=max(1, data.nbytes))
+        block.buf[:data.nbytes] = data
+        blocks.append(block)
+        descriptor[key] = (block.name, data.nbytes // array(code).itemsize)
+    return blocks, descriptor
+
+
+_worker_graph = None
+
+
+def _init_worker(descriptor):
+    global _worker_graph
+    _worker_graph = SharedGraph(descriptor)
+    # Los procesos del Pool terminan con os._exit (no corre atexit); los finalizadores de
+    # multiprocessing sí se ejecutan al salir del proceso de trabajo
+    util.Finalize(None, _worker_graph.close, exitpriority=10)
+    util.Finalize(None, _close_output, exitpriority=10)
+
+
+def _run_batch(task):
+    func, batch = task
+    return [func(_worker_graph, item) for item in batch]
+
+
+class ParallelExecutor:
+    def __init__(self, network, workers=None):
+        self.network = network
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = None
+        self._blocks = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self):
+        # La red se comparte con el estado que tiene ahora; los cambios posteriores no se ven
+        if self.workers > 1 and self._pool is None:
+            self._blocks, descriptor = _share(self.network)
+            self._pool = Pool(self.workers, initializer=_init_worker, initargs=(descriptor,))
+
+    def close(self):
+
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def map(self, func, items, batch_size=None):
+        # Aplica func(grafo, item) a cada item en lotes; func debe ser una función de módulo.
+        # Los resultados llegan en el orden en que terminan los lotes
+        items = list(items)
+        if self.workers <= 1 or len(items) <= 1:
+            for item in items:
+                yield func(self.network, item)
+            return
+        self.start()
+        if batch_size is None:
+            batch_size = max(1, len(items) // (self.workers * 4))
+        tasks = [(func, items[i:i + batch_size]) for i in range(0, len(items), batch_size)]
+        for results in self._pool.imap_unordered(_run_batch, tasks):
+            yield from results
+
+
+def _distances_from(graph, source):
+    dist, _ = _dijkstra_ids(graph, source)
+    return source, array("d", dist)
+
+
+# Bloque de salida al que está adjunto el proceso de trabajo: (nombre, bloque, vista de dobles)
+_worker_output = None
+
+
+def _close_output():
+    global _worker_output
+    if _worker_output is not None:
+        _, block, view = _worker_output
+        view.release()
+        block.close()
+        _worker_output = None
+
+
+def _distances_into(graph, task):
+    # Escribe las distancias desde la fuente en su fila del bloque de salida compartido; por la
+    # tubería solo vuelve el número de fila
+    global _worker_output
+    name, row, source = task
+    if _worker_output is None or _worker_output[0] != name:
+        _close_output()
+        block = shared_memory.SharedMemory(name=name)
+        _worker_output = (name, block, block.buf.cast("d"))
+    n = graph.node_count
+    dist, _ = _dijkstra_ids(graph, source)
+    _worker_output[2][row * n:(row + 1) * n] = array("d", dist)
+    return row
+
+
+def single_source_distances(network, sources, workers=None):
+    # {fuente: array('d') de distancias} para cada id de fuente, en paralelo. Las filas se
+    # escriben en un bloque compartido de len(sources) x n dobles en lugar de volver serializadas
+    sources = list(sources)
+    n = network.node_count
+    with ParallelExecutor(network, workers) as executor:
+        if executor.workers <= 1 or len(sources) <= 1:
+            return dict(_distances_from(network, source) for source in sources)
+        output = shared_memory.SharedMemory(create=True, size=max(8, len(sources) * n * 8))
+        try:
+            tasks = [(output.name, row, source) for row, source in enumerate(sources)]
+            for _ in executor.map(_distances_into, tasks):
+                pass
+            result = {}
+            for row, source in enumerate(sources):
+                distances = array("d")
+                distances.frombytes(output.buf[row * n * 8:(row + 1) * n * 8])
+                result[source] = distances
+            return result
+        finally:
+            output.close()
+            output.unlink()
+
+
+def benchmark(network, sources=400, max_workers=None):
+    # Tiempo de un lote de búsquedas desde una fuente con 1..max_workers procesos
+    n = network.node_count
+    batch = [i * n // sources for i in range(sources)]
+    max_workers = max_workers or os.cpu_count() or 1
+    report = {}
+    baseline = None
+    print(f"Nodos: {n}, búsquedas: {len(batch)}, núcleos: {os.cpu_count()}")
+    workers = 1
+    while workers <= max_workers:
+        started = time.perf_counter()
+        single_source_distances(network, batch, workers)
+        elapsed = time.perf_counter() - started
+        baseline = baseline or elapsed
+        report[workers] = elapsed
+        print(f"  {workers:>2} procesos: {elapsed:7.2f} s   aceleración x{baseline / elapsed:.2f}")
+        workers *= 2
+    return report
+
+
+if __name__ == "__main__":
+    grid = Network()
+    grid.create_grid_topology(150, 150, seed=1)
+    benchmark(grid)
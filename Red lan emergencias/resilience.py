@@ -0,0 +1,234 @@
+# resilience.py
+
+import heapq
+import random
+
+from network import Network
+from parallel import ParallelExecutor
+
+# Análisis de resiliencia de la red operativa: puntos de articulación y puentes (Tarjan, tiempo
+# lineal), centralidad de intermediación ponderada (Brandes, en paralelo por fuentes y con
+# muestreo opcional) y un informe que ordena estaciones y enlaces por criticidad.
+
+
+def _tarjan(network):
+    # DFS iterativo con tiempos de descubrimiento y low-link. Devuelve ({id: nodos separados}
+    # para cada punto de articulación, [(a, b, nodos separados)] para cada puente). "Nodos
+    # separados" son los que quedan fuera del fragmento mayor al perder el nodo o el enlace
+    offsets, targets, _ = network.csr()
+    failed, failed_links = network.failure_mask()
+    link_key = network.link_key
+    n = network.node_count
+    disc = [-1] * n
+    low = [0] * n
+    size = [1] * n
+    parent = [-1] * n
+    cut = {}
+    bridges = []
+    timer = 0
+    for root in range(n):
+        if failed[root] or disc[root] >= 0:
+            continue
+        first = timer
+        disc[root] = low[root] = timer
+        timer += 1
+        # Tamaños de los subárboles que se separan de cada nodo si este cae
+        fragments = {}
+        component_bridges = []
+        stack = [(root, offsets[root])]
+        while stack:
+            u, i = stack[-1]
+            if i < offsets[u + 1]:
+                stack[-1] = (u, i + 1)
+                v = targets[i]
+                if failed[v] or (failed_links and link_key(u, v) in failed_links):
+                    continue
+                if disc[v] < 0:
+                    parent[v] = u
+                    disc[v] = low[v] = timer
+                    timer += 1
+                    stack.append((v, offsets[v]))
+                elif v != parent[u] and disc[v] < low[u]:
+                    low[u] = disc[v]
+                continue
+            stack.pop()
+            p = parent[u]
+            if p < 0:
+                continue
+            size[p] += size[u]
+            if low[u] < low[p]:
+                low[p] = low[u]
+            if low[u] > disc[p]:
+                component_bridges.append((p, u))
+            if p == root or low[u] >= disc[p]:
+                fragments.setdefault(p, []).append(size[u])
+        component = timer - first
+        for p, sizes in fragments.items():
+            if p == root and len(sizes) < 2:
+                continue
+            rest = component - 1 - sum(sizes)
+            cut[p] = component - 1 - max(sizes + [rest])
+        for p, u in component_bridges:
+            bridges.append((p, u, min(size[u], component - size[u])))
+    return cut, bridges
+
+
+def articulation_points(network):
+    # {estación: nodos que quedan separados si cae}
+    names = network.node_names
+    cut, _ = _tarjan(network)
+    return {names[a]: separated for a, separated in cut.items()}
+
+
+def bridges(network):
+    # [((u, v), nodos que quedan separados si cae el enlace)]
+    names = network.node_names
+    _, found = _tarjan(network)
+    return [((names[a], names[b]), separated) for a, b, separated in found]
+
+
+def _brandes_chunk(graph, sources):
+    # Dependencias acumuladas de un lote de fuentes (Brandes con Dijkstra): por nodo y por
+    # posición dirigida del CSR
+    offsets, targets, weights = graph.csr()
+    failed, failed_links = graph.failure_mask()
+    link_key = graph.link_key
+    node_bc = [0.0] * graph.node_count
+    edge_bc = [0.0] * len(targets)
+    for s in sources:
+        if failed[s]:
+            continue
+        dist = {s: 0}
+        sigma = {s: 1}
+        preds = {s: []}
+        order = []
+        done = set()
+        pq = [(0, s)]
+        while pq:
+            d, u = heapq.heappop(pq)
+            if u in done:
+                continue
+            done.add(u)
+            order.append(u)
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                if v in done or failed[v]:
+                    continue
+                if failed_links and link_key(u, v) in failed_links:
+                    continue
+                distance = d + weights[i]
+                known = dist.get(v)
+                if known is None or distance < known:
+                    dist[v] = distance
+                    sigma[v] = sigma[u]
+                    preds[v] = [(u, i)]
+                    heapq.heappush(pq, (distance, v))
+                elif distance == known:
+                    sigma[v] += sigma[u]
+                    preds[v].append((u, i))
+        delta = dict.fromkeys(order, 0.0)
+        for w in reversed(order):
+            coeff = (1 + delta[w]) / sigma[w]
+            for u, i in preds[w]:
+                contribution = sigma[u] * coeff
+                delta[u] += contribution
+                edge_bc[i] += contribution
+            if w != s:
+                node_bc[w] += delta[w]
+    return node_bc, edge_bc
+
+
+def betweenness(network, sample=None, seed=None, workers=None, normalized=True):
+    # Centralidad de intermediación ponderada de estaciones y enlaces de la red operativa.
+    # Con sample=k se usan k fuentes al azar y se escala por n/k (aproximación para redes
+    # grandes). Devuelve ({estación: valor}, {(u, v): valor})
+    failed, _ = network.failure_mask()
+    alive = [v for v in range(network.node_count) if not failed[v]]
+    n = len(alive)
+    sources = alive
+    if sample is not None and sample < n:
+        sources = random.Random(seed).sample(alive, sample)
+    scale = n / len(sources) if sources else 0
+    with ParallelExecutor(network, workers) as executor:
+        parts = max(1, min(len(sources), executor.workers * 4))
+        chunks = [sources[k::parts] for k in range(parts)]
+        node_bc = [0.0] * network.node_count
+        edge_bc = None
+        for chunk_nodes, chunk_edges in executor.map(_brandes_chunk, chunks, batch_size=1):
+            node_bc = [a + b for a, b in zip(node_bc, chunk_nodes)]
+            edge_bc = chunk_edges if edge_bc is None else [a + b for a, b in zip(edge_bc, chunk_edges)]
+    # Grafo no dirigido: cada par se cuenta desde ambos extremos
+    node_norm = (n - 1) * (n - 2) / 2 if normalized and n > 2 else 1
+    edge_norm = n * (n - 1) / 2 if normalized and n > 1 else 1
+    names = network.node_names
+    nodes = {names[v]: node_bc[v] * scale / 2 / node_norm for v in alive}
+    offsets, targets, _ = network.csr()
+    links = {}
+    for u in range(network.node_count):
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            if edge_bc is None or not edge_bc[i]:
+                continue
+            key = (names[u], names[v]) if u < v else (names[v], names[u])
+            links[key] = links.get(key, 0.0) + edge_bc[i] * scale / 2 / edge_norm
+    return nodes, links
+
+
+def criticality_report(network, top=10, sample=None, seed=None, workers=None):
+    # Estaciones y enlaces ordenados por criticidad: primero por nodos que quedarían aislados
+    # (impacto estructural) y luego por intermediación (cuántas rutas más cortas se desvían)
+    names = network.node_names
+    cut, found = _tarjan(network)
+    node_bc, link_bc = betweenness(network, sample=sample, seed=seed, workers=workers)
+    bridge_impact = {}
+    for a, b, separated in found:
+        key = (names[a], names[b]) if a < b else (names[b], names[a])
+        bridge_impact[key] = separated
+    stations = [
+        {
+            "station": name,
+            "betweenness": value,
+            "articulation_point": network.node_id(name) in cut,
+            "disconnected": cut.get(network.node_id(name), 0),
+        }
+        for name, value in node_bc.items()
+    ]
+    stations.sort(key=lambda e: (-e["disconnected"], -e["betweenness"], e["station"]))
+    links = [
+        {
+            "link": key,
+            "betweenness": link_bc.get(key, 0.0),
+            "bridge": key in bridge_impact,
+            "disconnected": bridge_impact.get(key, 0),
+        }
+        for key in set(link_bc) | set(bridge_impact)
+    ]
+    links.sort(key=lambda e: (-e["disconnected"], -e["betweenness"], e["link"]))
+    return {
+        "stations": stations[:top],
+        "links": links[:top],
+        "articulation_points": sorted(names[a] for a in cut),
+        "bridges": sorted(bridge_impact),
+        "sampled": sample is not None and sample < len(node_bc),
+    }
+
+
+def format_report(report, top=5):
+
+    lines = ["Estaciones más críticas:"]
+    for e in report["stations"][:top]:
+        flag = f" | aísla {e['disconnected']} nodos" if e["articulation_point"] else ""
+        lines.append(f"  {e['station']}: intermediación {e['betweenness']:.3f}{flag}")
+    lines.append("Enlaces más críticos:")
+    for e in report["links"][:top]:
+        flag = f" | puente, aísla {e['disconnected']} nodos" if e["bridge"] else ""
+        lines.append(f"  {e['link'][0]} - {e['link'][1]}: intermediación {e['betweenness']:.3f}{flag}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    demo = Network()
+    demo.create_default_topology()
+    demo.add_connection("Estacion5", "Estacion6", 9)
+    demo.add_connection("Estacion6", "Estacion7", 4)
+    print(format_report(criticality_report(demo)))
@@ -0,0 +1,75 @@
+# route_cache.py
+
+import sys
+from collections import OrderedDict
+
+from routing import shortest_path
+
+# Costo aproximado por entrada además de la lista de la ruta: clave, tupla del valor y nodo
+# del OrderedDict
+_ENTRY_OVERHEAD = 200
+
+
+# Caché LRU acotada de rutas punto a punto. La clave incluye la versión de la red, que aumenta
+# con cada cambio de topología, pesos o fallas; al detectar una versión nueva se descartan las
+# entradas anteriores, que ya no pueden volver a consultarse.
+class RouteCache:
+    def __init__(self, network, solver=None, max_entries=4096, max_bytes=8 * 1024 * 1024):
+        self.network = network
+        # solver(origen, destino) -> (distancia, ruta); por defecto routing.shortest_path
+        self.solver = solver or (lambda start, end: shortest_path(network, start, end))
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._version = network.version
+
+    def clear(self):
+
+        self._entries.clear()
+        self._bytes = 0
+
+    def route(self, start, end):
+        # (distancia, ruta) desde la caché si la red no cambió desde que se calculó
+        version = self.network.version
+        if version != self._version:
+            self.invalidations += len(self._entries)
+            self.clear()
+            self._version = version
+        key = (start, end, version)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            distance, path, _ = entry
+            return distance, list(path)
+        self.misses += 1
+        distance, path = self.solver(start, end)
+        stored = tuple(path)
+        size = sys.getsizeof(stored) + _ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return distance, path
+        self._entries[key] = (distance, stored, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+        return distance, path
+
+    def get_stats(self):
+
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
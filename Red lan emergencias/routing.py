@@ -1,9 +1,17 @@
 # routing.py
 import heapq
+import weakref
 from collections import defaultdict
+from network import Network
+
+INF = float('inf')
 
 def dijkstra(graph, start, end=None):
    
+    # Sobre un Network se recorre directamente la representación CSR
+    if isinstance(graph, Network):
+        return _dijkstra_network(graph, start, end)
+
     if start not in graph:
         return {}, {}
     
@@ -13,7 +21,7 @@ def dijkstra(graph, start, end=None):
         for neighbor, _ in graph[node]:
             all_nodes.add(neighbor)
     
-    dist = {node: float('inf') for node in all_nodes}
+    dist = {node: INF for node in all_nodes}
     dist[start] = 0
     prev = {node: None for node in all_nodes}
     pq = [(0, start)] 
@@ -45,6 +53,275 @@ def dijkstra(graph, start, end=None):
     
     return dist, prev
 
+def _dijkstra_ids(network, source, target=-1, ignore_failures=False):
+    # Dijkstra sobre ids enteros; devuelve listas dist/prev indexadas por id.
+    # Con ignore_failures se recorre la topología completa, sin aplicar la máscara de fallas
+    offsets, targets, weights = network.csr()
+    failed, failed_links = network.failure_mask()
+    if ignore_failures:
+        failed, failed_links = bytes(len(failed)), None
+    link_key = network.link_key
+    n = network.node_count
+    dist = [INF] * n
+    prev = [-1] * n
+    # Los nodos caídos se marcan como visitados para que nunca se relajen
+    visited = bytearray(failed)
+    dist[source] = 0
+    pq = [(0, source)]
+    while pq:
+        current_dist, u = heapq.heappop(pq)
+        if visited[u]:
+            continue
+        visited[u] = 1
+        if u == target:
+            break
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            if visited[v]:
+                continue
+            if failed_links and link_key(u, v) in failed_links:
+                continue
+            distance = current_dist + weights[i]
+            if distance < dist[v]:
+                dist[v] = distance
+                prev[v] = u
+                heapq.heappush(pq, (distance, v))
+    return dist, prev
+
+# Buffers reutilizables para búsquedas punto a punto. En vez de limpiarlos en cada consulta,
+# cada entrada lleva la versión de la búsqueda que la escribió: una marca distinta de la versión
+# actual equivale a "sin visitar". Así una consulta solo toca los nodos que explora.
+class SearchBuffers:
+    def __init__(self, size=0):
+        self.version = 0
+        self.settled = 0
+        self.dist = ([], [])
+        self.parent = ([], [])
+        self.seen = ([], [])
+        self.done = ([], [])
+        self.resize(size)
+
+    def resize(self, size):
+        
+        grow = size - len(self.seen[0])
+        if grow <= 0:
+            return
+        for side in (0, 1):
+            self.dist[side].extend([INF] * grow)
+            self.parent[side].extend([-1] * grow)
+            self.seen[side].extend([0] * grow)
+            self.done[side].extend([0] * grow)
+
+    def next_version(self):
+        
+        self.version += 1
+        self.settled = 0
+        return self.version
+
+_search_buffers = weakref.WeakKeyDictionary()
+
+def search_buffers(network):
+    # Buffers asociados a la red, creados la primera vez y ampliados si la red crece
+    buffers = _search_buffers.get(network)
+    if buffers is None:
+        buffers = _search_buffers[network] = SearchBuffers()
+    buffers.resize(network.node_count)
+    return buffers
+
+def _dijkstra_buffered(network, source, target, buffers):
+    # Dijkstra hacia un destino usando los buffers versionados; devuelve la lista de nodos tocados
+    offsets, targets, weights = network.csr()
+    failed, failed_links = network.failure_mask()
+    link_key = network.link_key
+    version = buffers.next_version()
+    dist, parent, seen, done = buffers.dist[0], buffers.parent[0], buffers.seen[0], buffers.done[0]
+    dist[source] = 0
+    parent[source] = -1
+    seen[source] = version
+    touched = [source]
+    pq = [(0, source)]
+    while pq:
+        current_dist, u = heapq.heappop(pq)
+        if done[u] == version:
+            continue
+        done[u] = version
+        buffers.settled += 1
+        if u == target:
+            break
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            if done[v] == version or failed[v]:
+                continue
+            if failed_links and link_key(u, v) in failed_links:
+                continue
+            distance = current_dist + weights[i]
+            if seen[v] != version:
+                seen[v] = version
+                touched.append(v)
+            elif distance >= dist[v]:
+                continue
+            dist[v] = distance
+            parent[v] = u
+            heapq.heappush(pq, (distance, v))
+    return touched
+
+def _dijkstra_network(network, start, end=None):
+    
+    source = network.node_id(start)
+    if source is None or network.is_failed(start):
+        return {}, {}
+    target = network.node_id(end) if end else None
+    names = network.node_names
+    if target is not None:
+        # Con destino conocido solo se traducen los nodos que la búsqueda llegó a tocar
+        buffers = search_buffers(network)
+        touched = _dijkstra_buffered(network, source, target, buffers)
+        dist, parent = buffers.dist[0], buffers.parent[0]
+        dist_by_name = {names[v]: dist[v] for v in touched}
+        prev_by_name = {names[v]: (names[parent[v]] if parent[v] >= 0 else None) for v in touched}
+        return dist_by_name, prev_by_name
+    dist, prev = _dijkstra_ids(network, source, -1)
+    # Traduce los resultados a nombres para mantener la interfaz de dijkstra
+    dist_by_name = dict(zip(names, dist))
+    prev_by_name = {names[i]: (names[p] if p >= 0 else None) for i, p in enumerate(prev)}
+    return dist_by_name, prev_by_name
+
+def bidirectional_dijkstra(network, start, end, buffers=None):
+    
+    # Búsqueda punto a punto simultánea desde el origen y desde el destino; se detiene cuando
+    # la suma de los mínimos de ambas colas alcanza la mejor ruta encontrada por el punto de
+    # encuentro. Devuelve (distancia, ruta) o (inf, []) si no hay ruta.
+    source, target = network.node_id(start), network.node_id(end)
+    if source is None or target is None or network.is_failed(start) or network.is_failed(end):
+        return INF, []
+    if source == target:
+        return 0, [start]
+    if buffers is None:
+        buffers = search_buffers(network)
+    offsets, targets, weights = network.csr()
+    failed, failed_links = network.failure_mask()
+    link_key = network.link_key
+    version = buffers.next_version()
+    dist, parent, seen, done = buffers.dist, buffers.parent, buffers.seen, buffers.done
+    queues = ([(0, source)], [(0, target)])
+    for side, origin in ((0, source), (1, target)):
+        dist[side][origin] = 0
+        parent[side][origin] = -1
+        seen[side][origin] = version
+    best, meet = INF, -1
+    while queues[0] and queues[1]:
+        if queues[0][0][0] + queues[1][0][0] >= best:
+            break
+        # Se expande el lado con la frontera más pequeña
+        side = 0 if len(queues[0]) <= len(queues[1]) else 1
+        other = 1 - side
+        pq = queues[side]
+        d_side, p_side, s_side, f_side = dist[side], parent[side], seen[side], done[side]
+        d_other, s_other = dist[other], seen[other]
+        current_dist, u = heapq.heappop(pq)
+        if f_side[u] == version:
+            continue
+        f_side[u] = version
+        buffers.settled += 1
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            if f_side[v] == version or failed[v]:
+                continue
+            if failed_links and link_key(u, v) in failed_links:
+                continue
+            distance = current_dist + weights[i]
+            if s_side[v] != version or distance < d_side[v]:
+                s_side[v] = version
+                d_side[v] = distance
+                p_side[v] = u
+                heapq.heappush(pq, (distance, v))
+            if s_other[v] == version:
+                total = d_side[v] + d_other[v]
+                if total < best:
+                    best, meet = total, v
+    if meet < 0:
+        return INF, []
+    names = network.node_names
+    path = []
+    node = meet
+    while node >= 0:
+        path.append(names[node])
+        node = parent[0][node]
+    path.reverse()
+    node = parent[1][meet]
+    while node >= 0:
+        path.append(names[node])
+        node = parent[1][node]
+    return best, path
+
+def shortest_path(network, start, end):
+    
+    # Ruta punto a punto sobre la red: (distancia, ruta)
+    return bidirectional_dijkstra(network, start, end)
+
+def _multi_source_ids(network, seeds, target=-1):
+    # Dijkstra con varias fuentes; seeds es una lista de (distancia inicial, id).
+    # Devuelve dist/prev/origin por id (origin[v] es la fuente más cercana a v) y la marca
+    # de nodos visitados, que incluye a los caídos
+    offsets, targets, weights = network.csr()
+    failed, failed_links = network.failure_mask()
+    link_key = network.link_key
+    n = network.node_count
+    dist = [INF] * n
+    prev = [-1] * n
+    origin = [-1] * n
+    visited = bytearray(failed)
+    pq = []
+    for d, s in seeds:
+        if not visited[s] and d < dist[s]:
+            dist[s] = d
+            origin[s] = s
+            pq.append((d, s))
+    heapq.heapify(pq)
+    while pq:
+        current_dist, u = heapq.heappop(pq)
+        if visited[u]:
+            continue
+        visited[u] = 1
+        if u == target:
+            break
+        source = origin[u]
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            if visited[v]:
+                continue
+            if failed_links and link_key(u, v) in failed_links:
+                continue
+            distance = current_dist + weights[i]
+            if distance < dist[v]:
+                dist[v] = distance
+                prev[v] = u
+                origin[v] = source
+                heapq.heappush(pq, (distance, v))
+    return dist, prev, origin, visited
+
+def multi_source_dijkstra(network, sources, end=None):
+    
+    # Siembra todas las fuentes a la vez (a distancia 0, o a la indicada si sources es un dict
+    # {fuente: distancia}) y en una sola pasada obtiene, para cada nodo alcanzado, su fuente
+    # más cercana: la partición de Voronoi de la red. Si se da end, se detiene al fijarlo.
+    # Devuelve (dist, nearest, prev) solo con los nodos ya fijados; la ruta desde la fuente
+    # se obtiene con reconstruct_path(prev, nearest[nodo], nodo).
+    items = sources.items() if isinstance(sources, dict) else ((s, 0) for s in sources)
+    seeds = [(d, network.node_id(s)) for s, d in items if s in network.nodes]
+    target = network.node_id(end) if end else None
+    dist, prev, origin, visited = _multi_source_ids(network, seeds, -1 if target is None else target)
+    failed, _ = network.failure_mask()
+    names = network.node_names
+    dist_by_name, nearest, prev_by_name = {}, {}, {}
+    for i, d in enumerate(dist):
+        if visited[i] and not failed[i]:
+            name = names[i]
+            dist_by_name[name] = d
+            nearest[name] = names[origin[i]]
+            prev_by_name[name] = names[prev[i]] if prev[i] >= 0 else None
+    return dist_by_name, nearest, prev_by_name
+
 def reconstruct_path(prev, start, end):
     
     if end not in prev or prev[end] is None:
@@ -61,25 +338,9 @@ def reconstruct_path(prev, start, end):
 
 def find_alternative_routes(graph, start, end, k=3):
     
-    routes = []
-    temp_graph = dict(graph)
-    
-    for _ in range(k):
-        dist, prev = dijkstra(temp_graph, start, end)
-        
-        if end not in dist or dist[end] == float('inf'):
-            break
-        
-        path = reconstruct_path(prev, start, end)
-        if path:
-            routes.append((path, dist[end]))
-            
-            # Remueve las aristas del camino encontrado para buscar rutas alternativas
-            for i in range(len(path) - 1):
-                u, v = path[i], path[i + 1]
-                if u in temp_graph:
-                    temp_graph[u] = [(n, w) for n, w in temp_graph[u] if n != v]
-        else:
-            break
-    
-    return routes
\ No newline at end of file
+    # k rutas más cortas sin ciclos (Yen): [(ruta, distancia), ...] en orden creciente.
+    # Los grafos en diccionario se convierten a Network para usar el mismo motor
+    from k_paths import k_shortest_paths
+
+    network = graph if isinstance(graph, Network) else Network.from_graph(graph)
+    return k_shortest_paths(network, start, end, k)
\ No newline at end of file
@@ -23,8 +23,8 @@ class Priority(Enum):
     ALTA = 3
     CRITICA = 4
 
-# Clase que representa una emergencia individual
-@dataclass
+# Clase que representa una emergencia individual (con __slots__, sin diccionario por instancia)
+@dataclass(slots=True)
 class Emergency:
     id: str
     emergency_type: EmergencyType
@@ -62,6 +62,37 @@ class Emergency:
             "duration_minutes": self.get_duration_minutes()
         }
 
+    def to_record(self) -> Dict:
+        # Diccionario serializable a JSON con todo el estado (registro de eventos e instantáneas)
+        return {
+            "id": self.id,
+            "type": self.emergency_type.value,
+            "location": self.location,
+            "description": self.description,
+            "priority": self.priority.name,
+            "timestamp": self.timestamp.isoformat(),
+            "status": self.status,
+            "response_time": self.response_time,
+            "resources_assigned": list(self.resources_assigned),
+            "resolution_time": self.resolution_time.isoformat() if self.resolution_time else None,
+        }
+
+    @classmethod
+    def from_record(cls, record: Dict) -> "Emergency":
+        
+        return cls(
+            id=record["id"],
+            emergency_type=EmergencyType(record["type"]),
+            location=record["location"],
+            description=record["description"],
+            priority=Priority[record["priority"]],
+            timestamp=datetime.fromisoformat(record["timestamp"]),
+            status=record["status"],
+            response_time=record.get("response_time"),
+            resources_assigned=list(record.get("resources_assigned") or []),
+            resolution_time=datetime.fromisoformat(record["resolution_time"]) if record.get("resolution_time") else None,
+        )
+
 # Generador de emergencias aleatorias y escenarios realistas 
 class EmergencyGenerator:
     def __init__(self):
@@ -225,11 +256,14 @@ class EmergencySimulator:
             "policia": ["P1", "P2", "P3", "P4", "P5", "P6", "P7", "P8"]
         }
         self.resource_assignments = {}  # Recursos actualmente asignados
+        self.journal = None  # event_log.EmergencyJournal opcional para registrar altas y resoluciones
 
     def add_emergency(self, emergency: Emergency):
         
         self.active_emergencies.append(emergency)
         self.simulation_stats["total_emergencies"] += 1
+        if self.journal is not None:
+            self.journal.record("sim_created", emergency=emergency.to_record())
         print(f"🚨 Nueva emergencia: {emergency.id} - {emergency.emergency_type.value} en {emergency.location}")
 
     def assign_resources(self, emergency):
@@ -271,6 +305,15 @@ class EmergencySimulator:
         if not resolution_time:
             resolution_time = datetime.now()
 
+        self._resolve(emergency, resolution_time)
+        if self.journal is not None:
+            self.journal.record("sim_resolved", id=emergency_id, resolution_time=resolution_time.isoformat())
+
+        print(f" Emergencia {emergency_id} resuelta - Duración: {emergency.get_duration_minutes()} min")
+        return True
+
+    def _resolve(self, emergency: Emergency, resolution_time: datetime):
+        
         emergency.status = "resolved"
         emergency.resolution_time = resolution_time
 
@@ -283,8 +326,29 @@ class EmergencySimulator:
         self.active_emergencies.remove(emergency)
         self.resolved_emergencies.append(emergency)
 
-        print(f" Emergencia {emergency_id} resuelta - Duración: {emergency.get_duration_minutes()} min")
-        return True
+    def snapshot(self) -> Dict:
+        # Estado de las emergencias simuladas, serializable a JSON
+        return {
+            "active": [e.to_record() for e in self.active_emergencies],
+            "resolved": [e.to_record() for e in self.resolved_emergencies],
+            "total_emergencies": self.simulation_stats["total_emergencies"],
+        }
+
+    def load_snapshot(self, state: Dict):
+        
+        self.active_emergencies = [Emergency.from_record(r) for r in state["active"]]
+        self.resolved_emergencies = [Emergency.from_record(r) for r in state["resolved"]]
+        self.simulation_stats["total_emergencies"] = state.get("total_emergencies", 0)
+
+    def apply_event(self, event: Dict):
+        # Repite un evento del registro (sim_created, sim_resolved) sin volver a anotarlo
+        if event["event"] == "sim_created":
+            self.active_emergencies.append(Emergency.from_record(event["emergency"]))
+            self.simulation_stats["total_emergencies"] += 1
+        elif event["event"] == "sim_resolved":
+            emergency = self.find_emergency_by_id(event["id"])
+            if emergency is not None:
+                self._resolve(emergency, datetime.fromisoformat(event["resolution_time"]))
 
     def find_emergency_by_id(self, emergency_id: str) -> Optional[Emergency]:
         
@@ -0,0 +1,51 @@
+# test_alt_routing.py
+
+from alt_routing import ALTEngine
+from conftest import path_cost, reference_distances
+from routing import INF, reconstruct_path
+
+
+def check_all_pairs(engine, network):
+    names = network.node_names
+    for start in names[::4]:
+        expected = reference_distances(network, start)
+        for end in names[::3]:
+            distance, path = engine.shortest_path(start, end)
+            if not expected or expected[end] == INF:
+                assert (distance, path) == (INF, [])
+                continue
+            assert distance == expected[end]
+            assert path[0] == start and path[-1] == end
+            assert path_cost(network, path) == distance
+
+
+def test_alt_matches_dijkstra_with_failures(damaged_grid):
+    engine = ALTEngine(damaged_grid, num_landmarks=4, seed=1)
+    check_all_pairs(engine, damaged_grid)
+    dist, prev = engine.dijkstra("N0_2", "N5_3")
+    assert dist["N5_3"] == reference_distances(damaged_grid, "N0_2")["N5_3"]
+    assert reconstruct_path(prev, "N0_2", "N5_3")[-1] == "N5_3"
+    engine.close()
+
+
+def test_failures_do_not_require_preprocessing(grid):
+    engine = ALTEngine(grid, num_landmarks=4, seed=1)
+    landmarks = engine._landmark_dist
+    grid.fail_node("N2_2")
+    grid.fail_link("N0_0", "N1_0")
+    check_all_pairs(engine, grid)
+    assert engine._landmark_dist is landmarks
+    engine.close()
+
+
+def test_topology_changes_rebuild_landmarks(grid):
+    engine = ALTEngine(grid, num_landmarks=4, seed=1)
+    landmarks = engine._landmark_dist
+    # Un atajo nuevo y un peso menor invalidan las cotas: se reprocesa en la siguiente consulta
+    grid.set_weight("N0_0", "N0_1", 1)
+    grid.add_connection("N0_0", "N5_5", 2)
+    grid.add_connection("N5_5", "Z", 1)
+    check_all_pairs(engine, grid)
+    assert engine._landmark_dist is not landmarks
+    assert engine.shortest_path("N0_0", "Z") == (3, ["N0_0", "N5_5", "Z"])
+    engine.close()
@@ -0,0 +1,109 @@
+# test_archive.py
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from archive import EmergencyArchive
+from emergency import Emergency, EmergencyManager
+from simulator import Emergency as SimEmergency, EmergencyType, Priority
+
+pytest.importorskip("numpy")
+
+TYPES = ["incendio", "accidente", "robo"]
+PLACES = ["N0", "N1", "N2", "N3"]
+
+
+def closed_emergencies(count, seed=1):
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    result = []
+    for i in range(count):
+        e = Emergency(rng.choice(PLACES), rng.choice([1, 5, 9, "Alta"]), rng.choice(TYPES), f"reporte {i} ñ")
+        e.timestamp = start + timedelta(hours=i)
+        e.assigned_station = rng.choice(["Estacion1", "Estacion2", None])
+        e.assigned_resources = rng.choice([None, ["Bomberos desde Estacion1", "Policia desde Estacion2"]])
+        e.attended = True
+        e.status = "ATENDIDA"
+        result.append(e)
+    return result
+
+
+def test_rows_round_trip():
+    emergencies = closed_emergencies(40)
+    archive = EmergencyArchive(capacity=4)
+    archive.extend(emergencies[:30])
+    for e in emergencies[30:]:
+        archive.append(e)
+    assert len(archive) == 40
+    for i, e in enumerate(emergencies):
+        record = archive[i]
+        assert record["id"] == e.id
+        assert record["timestamp"] == e.timestamp
+        assert record["severity"] == (e.severity if isinstance(e.severity, int) else None)
+        assert (record["emergency_type"], record["location"], record["station"]) == (e.emergency_type, e.location, e.assigned_station)
+        assert record["description"] == e.description
+        assert record["resources"] == (e.assigned_resources or [])
+        assert record["attended"] and record["status"] == "ATENDIDA"
+    assert archive[-1]["id"] == emergencies[-1].id
+    assert archive.find(emergencies[17].id) == 17 and archive.find("nada") is None
+    with pytest.raises(IndexError):
+        archive[40]
+
+
+def test_select_and_count_match_linear_filters():
+    emergencies = closed_emergencies(200, seed=4)
+    archive = EmergencyArchive()
+    archive.extend(emergencies)
+    since, until = datetime(2025, 1, 3), datetime(2025, 1, 6)
+    rows = archive.select(emergency_type="robo", since=since, until=until, min_severity=5)
+    expected = [i for i, e in enumerate(emergencies)
+                if e.emergency_type == "robo" and since <= e.timestamp < until
+                and isinstance(e.severity, int) and e.severity >= 5]
+    assert list(rows) == expected
+    assert list(archive.select(location="N9")) == []
+    counts = archive.count_by("location", archive.select(station="Estacion1"))
+    expected_counts = {}
+    for e in emergencies:
+        if e.assigned_station == "Estacion1":
+            expected_counts[e.location] = expected_counts.get(e.location, 0) + 1
+    assert counts == expected_counts
+
+
+def test_accepts_simulator_emergencies():
+    archive = EmergencyArchive()
+    sim = SimEmergency("abc12345", EmergencyType.INCENDIO, "N5", "humo", Priority.ALTA, datetime(2025, 2, 1),
+                       status="resolved", resources_assigned=["camion"])
+    archive.append(sim)
+    record = archive[0]
+    assert (record["emergency_type"], record["severity"], record["resources"]) == ("incendio", 3, ["camion"])
+    assert record["attended"]
+
+
+def test_manager_moves_attended_emergencies_to_the_archive():
+    manager = EmergencyManager(archive=EmergencyArchive())
+    first = manager.add_emergency("N1", 3, "incendio", station="Estacion1")
+    second = manager.add_emergency("N2", 8, "robo")
+    assert manager.archive_attended() == 0
+    manager.attend_emergency(first)
+    stats = manager.get_statistics()
+    assert manager.archive_attended() == 1
+    assert manager.emergencies == [second]
+    assert manager.archive[0]["id"] == first.id and manager.archive[0]["station"] == "Estacion1"
+    assert manager.get_statistics() == stats
+    # Una instantánea después de archivar conserva los conteos
+    restored = EmergencyManager(archive=EmergencyArchive())
+    restored.load_snapshot(manager.snapshot())
+    assert restored.get_statistics() == stats
+
+
+def test_archive_is_smaller_than_objects():
+    import sys
+
+    emergencies = closed_emergencies(2000)
+    archive = EmergencyArchive()
+    archive.extend(emergencies)
+    objects = sum(sys.getsizeof(e) + sys.getsizeof(e.id) + sys.getsizeof(e.timestamp) + sys.getsizeof(e.description)
+                  for e in emergencies)
+    assert archive.nbytes < objects / 3
@@ -0,0 +1,73 @@
+# test_cascade.py
+
+import pytest
+
+from cascade import _run_trial, _trial_rng, format_summary, simulate_cascades
+from conftest import damage, grid_network
+
+STATIONS = ["N0_0", "N2_2", "N4_3"]
+
+
+def brute_force_metrics(network, removed, stations):
+    # (componentes, componente mayor, nodos unidos a alguna estación) por BFS sobre la red
+    # operativa sin los nodos quitados
+    graph = network.operational_graph()
+    alive = set(graph) - set(removed)
+    seen = set()
+    components = largest = covered = 0
+    for root in sorted(alive):
+        if root in seen:
+            continue
+        seen.add(root)
+        part = [root]
+        for u in part:
+            for v, _ in graph[u]:
+                if v in alive and v not in seen:
+                    seen.add(v)
+                    part.append(v)
+        components += 1
+        largest = max(largest, len(part))
+        if any(s in part for s in stations):
+            covered += len(part)
+    return components, largest, covered
+
+
+def test_trial_matches_brute_force_after_each_failure():
+    network = damage(grid_network(5, 5, seed=3))
+    names = network.node_names
+    pool = [v for v in range(network.node_count) if not network.is_failed(names[v])]
+    station_ids = [network.node_id(s) for s in STATIONS]
+    for trial in range(5):
+        metrics = _run_trial(network, (trial, 7, pool, station_ids, 12))
+        order = _trial_rng(7, trial).sample(pool, 12)
+        for k, observed in enumerate(metrics):
+            removed = [names[v] for v in order[:k]]
+            assert observed == brute_force_metrics(network, removed, STATIONS)
+
+
+def test_averages_are_reproducible_and_match_trials():
+    network = damage(grid_network(4, 4, seed=2))
+    total = len(network.node_names) - len(network.failed_nodes)
+    result = simulate_cascades(network, STATIONS[:2], trials=40, max_failures=6, seed=3, workers=1)
+    assert simulate_cascades(network, STATIONS[:2], trials=40, max_failures=6, seed=3, workers=2) == result
+    names = network.node_names
+    pool = [v for v in range(network.node_count) if not network.is_failed(names[v])]
+    covered = [0] * 7
+    for trial in range(40):
+        order = _trial_rng(3, trial).sample(pool, 6)
+        for k in range(7):
+            covered[k] += brute_force_metrics(network, [names[v] for v in order[:k]], STATIONS[:2])[2]
+    assert result["nodes"] == total
+    assert result["station_coverage"] == pytest.approx([c / (40 * total) for c in covered])
+    assert result["largest_component"][0] == brute_force_metrics(network, [], [])[1] / total
+    assert result["worst_coverage"][6] <= result["station_coverage"][6] <= result["best_coverage"][6]
+
+
+def test_candidates_limit_the_failures():
+    network = grid_network(4, 4, seed=1)
+    result = simulate_cascades(network, ["N0_0"], trials=10, candidates=["N1_1", "N2_2", "NoExiste"], seed=0, workers=1)
+    # Solo dos candidatos válidos: con ambos caídos la cuadrícula sigue conectada
+    assert result["failures"] == [0, 1, 2]
+    assert result["components"] == [1, 1, 1]
+    assert result["station_coverage"][2] == pytest.approx(14 / 16)
+    assert "10 ensayos sobre 16 nodos" in format_summary(result)
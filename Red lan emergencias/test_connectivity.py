@@ -0,0 +1,87 @@
+# test_connectivity.py
+
+import random
+
+from conftest import grid_network
+from connectivity import ComponentIndex
+
+
+def bfs_labels(network):
+    # Componente de cada nodo operativo por BFS sobre la copia en diccionario
+    graph = network.operational_graph()
+    label = {}
+    for root in graph:
+        if root in label:
+            continue
+        label[root] = root
+        queue = [root]
+        for u in queue:
+            for v, _ in graph[u]:
+                if v not in label:
+                    label[v] = root
+                    queue.append(v)
+    return label
+
+
+def assert_matches_bfs(network, index, names):
+    label = bfs_labels(network)
+    for u in names:
+        for v in names:
+            expected = u in label and v in label and label[u] == label[v]
+            assert index.connected(u, v) == expected, (u, v)
+    stations = names[::5]
+    for node in names:
+        expected = [s for s in stations if node in label and label.get(s) == label[node]]
+        assert index.stations_reaching(node, stations) == expected
+
+
+def test_random_events_match_bfs():
+    rng = random.Random(11)
+    network = grid_network(5, 5, seed=2)
+    index = ComponentIndex(network)
+    names = list(network.node_names)
+    for step in range(400):
+        u, v = rng.sample(names, 2)
+        action = rng.random()
+        if action < 0.3:
+            network.fail_node(u)
+        elif action < 0.6:
+            network.restore_node(u)
+        elif action < 0.75:
+            network.fail_link(u, v)
+        elif action < 0.85:
+            network.restore_link(u, v)
+        elif action < 0.93:
+            network.add_connection(u, v, rng.randint(1, 9))
+        else:
+            network.remove_connection(u, v)
+        if step % 10 == 0:
+            assert_matches_bfs(network, index, names)
+    assert_matches_bfs(network, index, names)
+
+
+def test_labels_are_compacted_in_long_sessions():
+    network = grid_network(4, 4, seed=1)
+    index = ComponentIndex(network)
+    names = list(network.node_names)
+    for _ in range(500):
+        network.fail_node("N1_1")
+        network.fail_node("N2_2")
+        network.restore_node("N1_1")
+        network.restore_node("N2_2")
+    assert index.compactions > 0
+    assert len(index._parent) <= 2 * max(network.node_count, 32) + network.node_count
+    network.fail_node("N0_1")
+    network.fail_node("N1_0")
+    assert not index.connected("N0_0", "N3_3")
+    assert_matches_bfs(network, index, names)
+
+
+def test_unknown_and_failed_nodes_are_never_connected():
+    network = grid_network(3, 3)
+    index = ComponentIndex(network)
+    network.fail_node("N1_1")
+    assert not index.connected("N1_1", "N0_0")
+    assert not index.connected("NoExiste", "N0_0")
+    assert index.stations_reaching("N1_1", ["N0_0"]) == []
+    assert index.stations_reaching("N2_2", ["N0_0", "N1_1"]) == ["N0_0"]
@@ -0,0 +1,75 @@
+# test_contraction.py
+
+from conftest import grid_network, path_cost, reference_distances
+from contraction import ContractionHierarchy
+from routing import INF, bidirectional_dijkstra
+
+
+def check_against_bidirectional(hierarchy, network):
+    names = network.node_names
+    for start in names[::3]:
+        for end in names[::4]:
+            distance, path = hierarchy.shortest_path(start, end)
+            expected, _ = bidirectional_dijkstra(network, start, end)
+            assert distance == expected
+            if distance == INF:
+                assert path == []
+                continue
+            assert path[0] == start and path[-1] == end
+            assert path_cost(network, path) == distance
+            assert not set(path) & network.failed_nodes
+
+
+def test_hierarchy_matches_dijkstra(grid):
+    hierarchy = ContractionHierarchy(grid)
+    assert hierarchy.shortcuts > 0
+    for start in grid.node_names[::5]:
+        expected = reference_distances(grid, start)
+        for end in grid.node_names:
+            assert hierarchy.shortest_path(start, end)[0] == expected[end]
+    hierarchy.close()
+
+
+def test_failures_fall_back_and_restore(grid):
+    hierarchy = ContractionHierarchy(grid)
+    check_against_bidirectional(hierarchy, grid)
+    for node in ("N2_2", "N3_3", "N1_4"):
+        grid.fail_node(node)
+        check_against_bidirectional(hierarchy, grid)
+    grid.fail_link("N0_0", "N0_1")
+    check_against_bidirectional(hierarchy, grid)
+    for node in ("N2_2", "N3_3", "N1_4"):
+        grid.restore_node(node)
+        check_against_bidirectional(hierarchy, grid)
+    grid.restore_link("N0_0", "N0_1")
+    check_against_bidirectional(hierarchy, grid)
+    # Las fallas no desactualizan la jerarquía
+    assert not hierarchy.stale
+    hierarchy.close()
+
+
+def test_topology_change_marks_stale_until_rebuilt(grid):
+    hierarchy = ContractionHierarchy(grid)
+    grid.set_weight("N0_0", "N0_1", 1)
+    grid.add_connection("N0_0", "N5_5", 3)
+    assert hierarchy.stale
+    check_against_bidirectional(hierarchy, grid)
+    hierarchy.build()
+    assert not hierarchy.stale
+    check_against_bidirectional(hierarchy, grid)
+    hierarchy.close()
+
+
+def test_save_and_load(tmp_path):
+    network = grid_network(5, 5, seed=4)
+    path = str(tmp_path / "jerarquia.ch")
+    built = ContractionHierarchy(network)
+    assert built.save(path)
+    loaded = ContractionHierarchy.load(network, path)
+    assert loaded is not None
+    check_against_bidirectional(loaded, network)
+    # Otra topología con los mismos nodos no acepta el archivo
+    other = grid_network(5, 5, seed=5)
+    assert ContractionHierarchy.load(other, path) is None
+    built.close()
+    loaded.close()
@@ -0,0 +1,77 @@
+# test_coverage.py
+
+import random
+
+import pytest
+
+from conftest import grid_network, reference_distances
+from coverage import CoverageTracker, bounded_search, isochrones
+
+RESOURCES = {"bomberos": ["N0_0", "N4_4"], "ambulancia": ["N2_2"], "salud": ["N0_4", "NoExiste"]}
+BUDGET = 12
+
+
+def reference_isochrone(network, stations, budget):
+    # Nodos a distancia <= budget de alguna estación, según el dijkstra de referencia
+    reached = set()
+    for station in stations:
+        if station not in network.nodes:
+            continue
+        reached |= {v for v, d in reference_distances(network, station).items() if d <= budget}
+    return reached
+
+
+def assert_matches_reference(network, tracker):
+    operational = len(network.node_names) - len(network.failed_nodes)
+    expected = {kind: reference_isochrone(network, stations, BUDGET) for kind, stations in RESOURCES.items()}
+    assert isochrones(network, RESOURCES, BUDGET) == expected
+    for kind, reached in expected.items():
+        assert tracker.isochrone(kind) == reached
+        assert tracker.uncovered(kind) == set(network.node_names) - network.failed_nodes - reached
+    assert tracker.coverage() == pytest.approx({kind: len(r) / operational for kind, r in expected.items()})
+
+
+def test_bounded_search_matches_dijkstra(damaged_grid):
+    names = damaged_grid.node_names
+    for sources in (["N0_0"], ["N0_0", "N5_5"], ["N2_2", "N3_3"]):
+        expected = {}
+        for source in sources:
+            for v, d in reference_distances(damaged_grid, source).items():
+                if d <= BUDGET:
+                    expected[v] = min(d, expected.get(v, d))
+        found = bounded_search(damaged_grid, sources, BUDGET)
+        assert {names[v]: d for v, d in found.items()} == expected
+
+
+def test_incremental_coverage_matches_dijkstra():
+    rng = random.Random(5)
+    network = grid_network(5, 5, seed=6)
+    tracker = CoverageTracker(network, RESOURCES, BUDGET)
+    assert_matches_reference(network, tracker)
+    names = list(network.node_names)
+    for _ in range(60):
+        u, v = rng.sample(names, 2)
+        action = rng.random()
+        if action < 0.35:
+            network.fail_node(u)
+        elif action < 0.7:
+            network.restore_node(u)
+        elif action < 0.85:
+            network.fail_link(u, v)
+        else:
+            network.restore_link(u, v)
+        assert_matches_reference(network, tracker)
+
+
+def test_only_affected_stations_are_searched_again():
+    network = grid_network(6, 6, seed=1)
+    tracker = CoverageTracker(network, {"bomberos": ["N0_0"], "policia": ["N5_5"]}, 5)
+    tracker.coverage()
+    searches = tracker.searches
+    far = next(v for v in network.node_names if v not in tracker.isochrone("bomberos") | tracker.isochrone("policia"))
+    network.fail_node(far)
+    tracker.coverage()
+    assert tracker.searches == searches
+    network.fail_node("N0_0")
+    assert tracker.isochrone("bomberos") == set()
+    assert tracker.searches == searches + 1
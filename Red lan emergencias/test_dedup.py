@@ -0,0 +1,94 @@
+# test_dedup.py
+
+from datetime import datetime, timedelta
+
+from dedup import ReportDeduplicator
+from emergency import EmergencyManager
+from network import Network
+
+
+def small_network():
+    # B está a 3 minutos de A y C a 12; D es el mismo sitio que A (enlace de peso 0)
+    network = Network()
+    network.add_connection("A", "B", 3)
+    network.add_connection("A", "C", 12)
+    network.add_connection("A", "D", 0)
+    return network
+
+
+def report(manager, dedup, location, severity, kind="incendio", moment=None):
+    emergency = manager.add_emergency(location, severity, kind)
+    if moment is not None:
+        emergency.timestamp = moment
+    dedup.register(emergency)
+    return emergency
+
+
+def test_distinct_incidents_at_the_same_location_are_kept():
+    manager = EmergencyManager()
+    dedup = ReportDeduplicator(small_network(), manager)
+    first = report(manager, dedup, "A", 4)
+    second = report(manager, dedup, "A", 8)
+    report(manager, dedup, "A", 9, kind="violencia")
+    # Los dos incendios quedan indexados; gana el más grave y, atendido este, el otro
+    assert dedup.find("A", "incendio") is second
+    manager.attend_emergency(second)
+    assert dedup.find("A", "Incendio ") is first
+    assert dedup.merge("A", 6, "incendio", "humo") is first
+    assert first.reports == 2 and first.severity == 6 and dedup.merged == 1
+
+
+def test_neighbourhood_follows_the_configured_radius():
+    network = small_network()
+    manager = EmergencyManager()
+    incident = manager.add_emergency("A", 5, "incendio")
+    # Por defecto solo la misma ubicación (y los enlaces de peso 0)
+    strict = ReportDeduplicator(network, manager)
+    assert strict.find("B", "incendio") is None
+    assert strict.find("D", "incendio") is incident
+    near = ReportDeduplicator(network, manager, radius=5)
+    assert near.find("B", "incendio") is incident
+    assert near.find("C", "incendio") is None
+    assert ReportDeduplicator(network, manager, radius=12).find("C", "incendio") is incident
+    # Un incidente en la misma ubicación gana al de un vecino aunque sea menos grave
+    local = manager.add_emergency("B", 1, "incendio")
+    near.register(local)
+    assert near.find("B", "incendio") is local
+
+
+def test_buckets_expire_at_the_window_boundary():
+    manager = EmergencyManager()
+    dedup = ReportDeduplicator(small_network(), manager, window_minutes=15)
+    window = 15 * 60
+    start = datetime.fromtimestamp(int(datetime.now().timestamp() // window) * window)
+    incident = report(manager, dedup, "A", 5, moment=start)
+    # Vale la franja actual y la anterior: hasta un segundo antes de dos ventanas completas
+    assert dedup.find("A", "incendio", when=start + timedelta(seconds=window - 1)) is incident
+    assert dedup.find("A", "incendio", when=start + timedelta(seconds=2 * window - 1)) is incident
+    assert dedup.find("A", "incendio", when=start + timedelta(seconds=2 * window)) is None
+    # La franja vencida se descartó completa
+    assert not dedup._buckets
+
+
+def test_attended_ids_are_pruned_from_the_index():
+    manager = EmergencyManager()
+    dedup = ReportDeduplicator(small_network(), manager)
+    first = report(manager, dedup, "A", 4)
+    second = report(manager, dedup, "A", 6)
+    (index,) = dedup._buckets.values()
+    manager.attend_emergency(first)
+    assert dedup.find("A", "incendio") is second
+    assert index[("A", "incendio")] == [second.id]
+    manager.attend_emergency(second)
+    assert dedup.find("A", "incendio") is None
+    assert ("A", "incendio") not in index
+
+
+def test_pending_emergencies_are_indexed_on_start():
+    manager = EmergencyManager()
+    pending = manager.add_emergency("A", 3, "incendio")
+    attended = manager.add_emergency("C", 3, "incendio")
+    manager.attend_emergency(attended)
+    dedup = ReportDeduplicator(small_network(), manager)
+    assert dedup.find("A", "incendio") is pending
+    assert dedup.find("C", "incendio") is None
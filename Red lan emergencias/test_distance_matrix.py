@@ -0,0 +1,60 @@
+# test_distance_matrix.py
+
+import pytest
+
+import distance_matrix as dm
+from conftest import reference_distances
+from network import Network
+from routing import INF
+
+np = pytest.importorskip("numpy")
+
+SOURCES = ["N0_0", "N2_2", "N5_5", "N1_3", "NoExiste"]
+TARGETS = ["N4_4", "N0_1", "N3_4", "N2_0"]
+
+
+def expected_matrix(network, sources, targets):
+    rows = []
+    for s in sources:
+        ref = reference_distances(network, s) if s in network.nodes else {}
+        rows.append([ref.get(t, INF) for t in targets])
+    return np.array(rows, dtype=float)
+
+
+def test_matches_dijkstra_with_failures(damaged_grid):
+    result = dm.distance_matrix(damaged_grid, SOURCES, TARGETS)
+    assert isinstance(result, np.ndarray) and result.shape == (len(SOURCES), len(TARGETS))
+    assert np.array_equal(result, expected_matrix(damaged_grid, SOURCES, TARGETS))
+    # Con más destinos que fuentes se transpone; el resultado debe ser el mismo
+    flipped = dm.distance_matrix(damaged_grid, TARGETS, SOURCES)
+    assert np.array_equal(flipped, result.T)
+
+
+def test_pure_python_fallback_matches(damaged_grid, monkeypatch):
+    expected = dm.distance_matrix(damaged_grid, SOURCES, TARGETS)
+    monkeypatch.setattr(dm, "csr_matrix", None)
+    assert np.array_equal(dm.distance_matrix(damaged_grid, SOURCES, TARGETS), expected)
+
+
+def test_sparse_matrix_follows_network_version(damaged_grid):
+    before = dm.distance_matrix(damaged_grid, ["N0_0"], ["N0_1"])
+    damaged_grid.restore_link("N0_0", "N0_1")
+    after = dm.distance_matrix(damaged_grid, ["N0_0"], ["N0_1"])
+    assert after[0, 0] == reference_distances(damaged_grid, "N0_0")["N0_1"] < before[0, 0]
+
+
+@pytest.mark.parametrize("use_scipy", [True, False])
+def test_zero_weight_links_are_edges(monkeypatch, use_scipy):
+    if use_scipy:
+        pytest.importorskip("scipy")
+    else:
+        monkeypatch.setattr(dm, "csr_matrix", None)
+    network = Network()
+    network.add_connection("A", "B", 0)
+    network.add_connection("B", "C", 0)
+    network.add_connection("C", "D", 3)
+    network.add_connection("A", "D", 9)
+    result = dm.distance_matrix(network, ["A", "D"], ["A", "B", "C", "D"])
+    assert result.tolist() == [[0, 0, 0, 3], [3, 3, 3, 0]]
+    network.fail_link("A", "B")
+    assert dm.distance_matrix(network, ["A"], ["B"])[0, 0] == 12
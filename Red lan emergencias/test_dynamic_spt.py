@@ -0,0 +1,81 @@
+# test_dynamic_spt.py
+
+import random
+
+from conftest import grid_network, path_cost, reference_distances
+from dynamic_spt import DynamicShortestPathTree, StationTrees
+from routing import INF
+
+
+def check_tree(tree, network):
+    expected = reference_distances(network, tree.source)
+    for node in network.node_names:
+        distance = tree.distance(node)
+        assert distance == expected.get(node, INF)
+        path = tree.path(node)
+        if distance == INF:
+            assert path == []
+        else:
+            assert path[0] == tree.source and path[-1] == node
+            assert path_cost(network, path) == distance
+
+
+def random_event(network, rng):
+    names = network.node_names
+    u, v = rng.sample(names, 2)
+    action = rng.random()
+    if action < 0.2:
+        network.fail_node(u)
+    elif action < 0.4:
+        network.restore_node(u)
+    elif action < 0.5:
+        network.fail_link(u, v)
+    elif action < 0.6:
+        network.restore_link(u, v)
+    elif action < 0.75:
+        neighbors = network.neighbors(u)
+        if neighbors:
+            network.set_weight(u, rng.choice(neighbors)[0], rng.randint(1, 12))
+    elif action < 0.85:
+        network.add_connection(u, v, rng.randint(1, 12))
+    elif action < 0.95:
+        neighbors = network.neighbors(u)
+        if neighbors:
+            network.remove_connection(u, rng.choice(neighbors)[0])
+    else:
+        network.add_connection(u, f"X{len(names)}", rng.randint(1, 12))
+
+
+def test_tree_repairs_match_dijkstra():
+    rng = random.Random(11)
+    network = grid_network(6, 6, seed=3)
+    tree = DynamicShortestPathTree(network, "N0_0")
+    check_tree(tree, network)
+    for _ in range(250):
+        random_event(network, rng)
+        check_tree(tree, network)
+    tree.close()
+
+
+def test_source_failure_and_restore():
+    network = grid_network(4, 4, seed=2)
+    tree = DynamicShortestPathTree(network, "N1_1")
+    network.fail_node("N1_1")
+    assert all(tree.distance(node) == INF for node in network.node_names)
+    network.restore_node("N1_1")
+    check_tree(tree, network)
+    tree.close()
+
+
+def test_station_trees_nearest(damaged_grid):
+    stations = ["N0_0", "N5_5", "N0_5", "N2_2"]
+    trees = StationTrees(damaged_grid, stations)
+    damaged_grid.fail_node("N0_5")
+    damaged_grid.restore_node("N2_2")
+    for node in damaged_grid.node_names:
+        station, distance, path = trees.nearest(node)
+        best = min(reference_distances(damaged_grid, s).get(node, INF) for s in stations if not damaged_grid.is_failed(s))
+        assert distance == best
+        if best < INF:
+            assert path[0] == station and path[-1] == node
+    trees.close()
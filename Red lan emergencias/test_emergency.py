@@ -0,0 +1,71 @@
+# test_emergency.py
+
+import random
+
+from emergency import EmergencyManager
+
+STATIONS = ["Estacion1", "Estacion2", "Estacion3", None]
+
+
+def brute_force_urgent(emergencies, station=None):
+    # Pendiente más urgente por recorrido lineal: mayor gravedad y, a igualdad, la más antigua
+    live = [e for e in emergencies if not e.attended and (station is None or e.assigned_station == station)]
+    return min(live, key=lambda e: (-e.severity, e._order), default=None)
+
+
+def test_indexes_match_linear_scans():
+    rng = random.Random(3)
+    manager = EmergencyManager()
+    created = []
+    for _ in range(600):
+        action = rng.random()
+        if action < 0.4 or not created:
+            emergency = manager.add_emergency(f"N{rng.randint(0, 9)}", rng.randint(1, 10), "incendio",
+                                              station=rng.choice(STATIONS))
+            created.append(emergency)
+            continue
+        emergency = rng.choice(created)
+        if action < 0.6:
+            manager.assign(emergency, rng.choice(STATIONS))
+        elif action < 0.75:
+            manager.merge_report(emergency, emergency.location, rng.randint(1, 10))
+        else:
+            was_pending = not emergency.attended
+            assert manager.attend_emergency(emergency) == was_pending
+        pending = [e for e in created if not e.attended]
+        assert manager.pending() == pending
+        assert manager.pending(by_urgency=True) == sorted(pending, key=lambda e: (-e.severity, e._order))
+        assert manager.pending_count() == len(pending)
+        for station in STATIONS[:-1]:
+            assert manager.pending(station) == [e for e in pending if e.assigned_station == station]
+            assert manager.next_urgent(station) is brute_force_urgent(created, station)
+        assert manager.next_urgent() is brute_force_urgent(created)
+    stats = manager.get_statistics()
+    assert stats == {"total": len(created), "attended": sum(e.attended for e in created),
+                     "pending": sum(not e.attended for e in created)}
+    # Los montículos se compactan: las entradas obsoletas no crecen sin límite
+    assert len(manager._heap) <= 2 * manager.pending_count() + 64 + 1
+
+
+def test_merge_raises_priority_but_never_lowers_it():
+    manager = EmergencyManager()
+    low = manager.add_emergency("N1", 2, "incendio", "humo", station="Estacion1")
+    high = manager.add_emergency("N2", 6, "incendio", station="Estacion1")
+    assert manager.next_urgent("Estacion1") is high
+    manager.merge_report(low, "N1", 9, "llamas")
+    assert manager.next_urgent("Estacion1") is low and manager.next_urgent() is low
+    manager.merge_report(low, "N1", 1)
+    assert (low.severity, low.reports, low.description) == (9, 3, "humo | llamas")
+
+
+def test_snapshot_round_trip_keeps_indexes():
+    manager = EmergencyManager()
+    first = manager.add_emergency("N1", 3, "incendio", station="Estacion1")
+    second = manager.add_emergency("N2", 8, "violencia", station="Estacion2")
+    manager.attend_emergency(first)
+    restored = EmergencyManager()
+    restored.load_snapshot(manager.snapshot())
+    assert [e.id for e in restored.pending()] == [second.id]
+    assert restored.next_urgent("Estacion2").id == second.id
+    assert restored.get(first.id).attended
+    assert restored.get_statistics() == manager.get_statistics()
@@ -0,0 +1,96 @@
+# test_emergency_store.py
+
+import sqlite3
+
+from emergency import EmergencyManager
+from emergency_store import EmergencyStore
+
+
+def test_merge_after_flush_updates_history(tmp_path):
+    # Un reporte agrupado después de escribir el lote debe llegar igual a la base
+    store = EmergencyStore(str(tmp_path / "historial.db"))
+    manager = EmergencyManager(store=store)
+    emergency = manager.add_emergency("N1", 2, "incendio", "humo")
+    store.flush()
+    manager.merge_report(emergency, "N1", 5, "llamas")
+    store.flush()
+    (row,) = store.query()
+    assert (row["severity"], row["description"], row["reports"]) == (5, "humo | llamas", 2)
+    assert (emergency.severity, emergency.description, emergency.reports) == (5, "humo | llamas", 2)
+    store.close()
+
+
+def test_adds_reports_column_to_existing_database(tmp_path):
+    path = str(tmp_path / "historial.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE emergencies (id TEXT PRIMARY KEY, timestamp TEXT NOT NULL, location TEXT, "
+                 "severity INTEGER, type TEXT, description TEXT, status TEXT, station TEXT, "
+                 "attended INTEGER NOT NULL DEFAULT 0, simulated INTEGER NOT NULL DEFAULT 0, resources TEXT)")
+    conn.execute("INSERT INTO emergencies (id, timestamp) VALUES ('a', '2025-01-01T00:00:00')")
+    conn.commit()
+    conn.close()
+    store = EmergencyStore(path)
+    (row,) = store.query()
+    assert row["reports"] == 1
+    store.close()
+
+
+
+def open_session(tmp_path, log="registro"):
+    # Historial, gestor y registro de eventos sin recuperar todavía
+    from event_log import EmergencyJournal
+
+    store = EmergencyStore(str(tmp_path / "historial.db"))
+    manager = EmergencyManager(store=store)
+    return store, manager, EmergencyJournal(str(tmp_path / log), manager)
+
+
+def crash(store, journal):
+    # Cierre abrupto: el registro está en disco pero el último lote del historial no se escribió
+    journal.sync()
+    store._conn.close()
+
+
+def test_recovery_only_saves_events_after_the_last_flush(tmp_path):
+    store, manager, journal = open_session(tmp_path)
+    journal.recover()
+    flushed = [manager.add_emergency(f"N{i}", i, "incendio") for i in range(5)]
+    manager.assign(flushed[0], "Estacion1")
+    store.flush()
+    late = manager.add_emergency("N9", 7, "violencia")
+    manager.attend_emergency(flushed[1])
+    crash(store, journal)
+
+    store, manager, journal = open_session(tmp_path)
+    saved = []
+    original = store.save
+    store.save = lambda emergency, sequence=None: (saved.append(emergency.id), original(emergency, sequence))
+    assert journal.recover() == 8
+    assert sorted(saved) == sorted([late.id, flushed[1].id])
+    rows = {row["id"]: row for row in store.query()}
+    assert len(rows) == 6
+    assert rows[late.id]["severity"] == 7
+    assert rows[flushed[1].id]["attended"] == 1
+    assert rows[flushed[0].id]["station"] == "Estacion1"
+    store.close()
+
+
+def test_new_journal_is_not_mistaken_for_the_flushed_one(tmp_path):
+    store, manager, journal = open_session(tmp_path)
+    journal.recover()
+    for i in range(3):
+        manager.add_emergency(f"N{i}", i, "incendio")
+    journal.close()
+    store.close()
+    # Un registro nuevo (p. ej. tras apartar uno dañado) vuelve a numerar desde 1; su avance se
+    # guarda aparte, así que sus eventos no se toman por los ya escritos del anterior
+    store, manager, journal = open_session(tmp_path, log="otro")
+    journal.recover()
+    assert store.flushed_sequence == 0
+    fresh = manager.add_emergency("N7", 4, "robo")
+    crash(store, journal)
+    store, manager, journal = open_session(tmp_path, log="otro")
+    journal.recover()
+    assert [row["id"] for row in store.query(location="N7")] == [fresh.id]
+    assert store.count() == 4
+    store.close()
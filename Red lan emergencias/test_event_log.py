@@ -0,0 +1,166 @@
+# test_event_log.py
+
+import contextlib
+import io
+import os
+import random
+
+import pytest
+
+from conftest import grid_network
+from emergency import EmergencyManager
+from event_log import EmergencyJournal, EventLog
+from simulator import EmergencySimulator
+
+
+def state(manager, network):
+    # Estado observable del gestor y de la red, para comparar antes y después de recuperar
+    emergencies = sorted((e.id, e.location, e.severity, e.assigned_station, e.attended, e.status,
+                          str(e.assigned_resources), e.simulada, e.reports, e.timestamp) for e in manager.emergencies)
+    return (emergencies, manager.get_statistics(), sorted(network.failed_nodes),
+            [e.id for e in manager.pending(by_urgency=True)],
+            {s: [e.id for e in manager.pending(s, by_urgency=True)] for s in "ABC"})
+
+
+def run_session(directory, steps, seed=2, **options):
+    network = grid_network(5, 5)
+    manager = EmergencyManager()
+    journal = EmergencyJournal(directory, manager, network, **options)
+    journal.recover()
+    rng = random.Random(seed)
+    live = []
+    for _ in range(steps):
+        r = rng.random()
+        if r < 0.4 or not live:
+            e = manager.add_emergency(rng.choice(network.node_names), rng.randint(1, 10), "incendio", "x",
+                                      station=rng.choice("ABC"))
+            manager.annotate(e, assigned_resources=["R1"], simulada=rng.random() < 0.5)
+            live.append(e)
+        elif r < 0.55:
+            manager.assign(rng.choice(live), rng.choice("ABC"))
+        elif r < 0.65:
+            e = rng.choice(live)
+            manager.merge_report(e, e.location, rng.randint(1, 10), "otro reporte")
+        elif r < 0.8:
+            e = rng.choice(live)
+            manager.attend_emergency(e)
+            live.remove(e)
+        elif r < 0.9:
+            network.fail_node(rng.choice(network.node_names))
+        else:
+            network.restore_node(rng.choice(network.node_names))
+    journal.sync()
+    return journal, state(manager, network)
+
+
+def recover(directory):
+    network = grid_network(5, 5)
+    manager = EmergencyManager()
+    journal = EmergencyJournal(directory, manager, network)
+    replayed = journal.recover()
+    return journal, state(manager, network), replayed
+
+
+def last_segment(directory):
+
+    return os.path.join(directory, sorted(f for f in os.listdir(directory) if f.endswith(".log"))[-1])
+
+
+def test_recovery_after_crash_matches_live_state(tmp_path):
+    directory = str(tmp_path / "wal")
+    _, expected = run_session(directory, 800, snapshot_every=300, segment_bytes=4000, batch_size=16)
+    # Sin close: el proceso "se cae" y la recuperación parte de la última instantánea
+    journal, recovered, replayed = recover(directory)
+    assert recovered == expected
+    assert 0 < replayed < 300
+    journal.close()
+    journal, recovered, replayed = recover(directory)
+    assert recovered == expected and replayed == 0
+    journal.close()
+
+
+def test_torn_tail_is_truncated(tmp_path):
+    directory = str(tmp_path / "wal")
+    _, expected = run_session(directory, 200, snapshot_every=10_000)
+    path = last_segment(directory)
+    size = os.path.getsize(path)
+    # Registro final cortado: cabecera que promete más bytes de los que hay
+    with open(path, "ab") as f:
+        f.write(b"\x10\x00\x00\x00garbage")
+    journal, recovered, _ = recover(directory)
+    assert recovered == expected
+    assert os.path.getsize(path) == size
+    journal.close()
+
+
+def test_corrupt_last_record_is_dropped(tmp_path):
+    directory = str(tmp_path / "wal")
+    log = EventLog(directory)
+    for i in range(5):
+        log.append({"event": "x", "i": i})
+    log.close()
+    path = last_segment(directory)
+    with open(path, "r+b") as f:
+        f.seek(-2, os.SEEK_END)
+        f.write(b"##")
+    reopened = EventLog(directory)
+    assert [e["i"] for _, e in reopened.replay()] == [0, 1, 2, 3]
+    # La secuencia continúa tras el último registro válido y el siguiente se lee bien
+    reopened.append({"event": "x", "i": 9})
+    reopened.close()
+    assert [e["i"] for _, e in EventLog(directory).replay()] == [0, 1, 2, 3, 9]
+
+
+def test_corruption_before_the_last_segment_is_an_error(tmp_path):
+    directory = str(tmp_path / "wal")
+    log = EventLog(directory, segment_bytes=200)
+    for i in range(40):
+        log.append({"event": "x", "i": i})
+    log.close()
+    first = sorted(f for f in os.listdir(directory) if f.endswith(".log"))[0]
+    with open(os.path.join(directory, first), "r+b") as f:
+        f.seek(20)
+        f.write(b"\xff\xff")
+    with pytest.raises(ValueError):
+        EventLog(directory)
+
+
+def test_snapshots_remove_obsolete_files(tmp_path):
+    directory = str(tmp_path / "wal")
+    journal, expected = run_session(directory, 600, snapshot_every=100, segment_bytes=2000, batch_size=1000, sync_interval=60)
+    names = os.listdir(directory)
+    snapshots = [f for f in names if f.startswith("snapshot-")]
+    assert len(snapshots) == 1
+    # Solo quedan los segmentos con eventos posteriores a la instantánea (y el abierto)
+    segments = sorted(int(f[:-4]) for f in names if f.endswith(".log"))
+    snapshot_sequence = int(snapshots[0][len("snapshot-"):-len(".json")])
+    assert all(first > snapshot_sequence + 1 for first in segments[1:])
+    journal.close()
+    _, recovered, _ = recover(directory)
+    assert recovered == expected
+
+
+def test_simulator_emergencies_are_recovered(tmp_path):
+    directory = str(tmp_path / "wal")
+
+    def observed(simulator):
+        return ([e.to_record() for e in simulator.active_emergencies],
+                [e.to_record() for e in simulator.resolved_emergencies],
+                simulator.simulation_stats["total_emergencies"])
+
+    rng = random.Random(3)
+    simulator = EmergencySimulator()
+    journal = EmergencyJournal(directory, EmergencyManager(), None, simulator, snapshot_every=50)
+    journal.recover()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(213):
+            if rng.random() < 0.6 or not simulator.active_emergencies:
+                simulator.add_emergency(simulator.generator.generate_emergency())
+            else:
+                simulator.resolve_emergency(rng.choice(simulator.active_emergencies).id)
+    expected = observed(simulator)
+    journal.sync()
+    restored = EmergencySimulator()
+    with contextlib.redirect_stdout(io.StringIO()):
+        EmergencyJournal(directory, EmergencyManager(), None, restored).recover()
+    assert observed(restored) == expected
@@ -0,0 +1,98 @@
+# test_k_paths.py
+
+from itertools import combinations
+
+from conftest import grid_network, path_cost
+from k_paths import disjoint_routes, k_shortest_paths
+from routing import find_alternative_routes
+
+
+def simple_paths(network, start, end):
+    # Todas las rutas sin ciclos de la red operativa, por búsqueda exhaustiva
+    graph = network.operational_graph()
+    found = []
+
+    def extend(path, seen):
+        node = path[-1]
+        if node == end:
+            found.append((path_cost(network, path), list(path)))
+            return
+        for neighbor, _ in graph.get(node, ()):
+            if neighbor not in seen:
+                seen.add(neighbor)
+                path.append(neighbor)
+                extend(path, seen)
+                path.pop()
+                seen.discard(neighbor)
+
+    if start in graph:
+        extend([start], {start})
+    return sorted(found)
+
+
+def small_damaged_grid():
+    network = grid_network(4, 4, seed=6)
+    network.fail_node("N1_2")
+    network.fail_link("N2_0", "N3_0")
+    return network
+
+
+def test_yen_matches_exhaustive_enumeration():
+    network = small_damaged_grid()
+    for start, end in (("N0_0", "N3_3"), ("N3_0", "N0_3"), ("N1_1", "N2_2")):
+        expected = simple_paths(network, start, end)
+        routes = k_shortest_paths(network, start, end, k=6)
+        assert [d for _, d in routes] == [d for d, _ in expected[:6]]
+        assert len({tuple(path) for path, _ in routes}) == len(routes)
+        for path, distance in routes:
+            assert path[0] == start and path[-1] == end
+            assert len(set(path)) == len(path)
+            assert path_cost(network, path) == distance
+            assert not set(path) & network.failed_nodes
+
+
+def test_find_alternative_routes_on_dict_graph():
+    network = small_damaged_grid()
+    routes = find_alternative_routes(network.operational_graph(), "N0_0", "N3_3", k=4)
+    assert [d for _, d in routes] == [d for d, _ in simple_paths(network, "N0_0", "N3_3")[:4]]
+
+
+def best_disjoint_pair(paths, mode):
+    best = None
+    for (d1, p1), (d2, p2) in combinations(paths, 2):
+        if mode == "node":
+            independent = not set(p1[1:-1]) & set(p2[1:-1]) and not (len(p1) == 2 and len(p2) == 2)
+        else:
+            links = lambda p: {frozenset(e) for e in zip(p, p[1:])}
+            independent = not links(p1) & links(p2)
+        if independent and (best is None or d1 + d2 < best):
+            best = d1 + d2
+    return best
+
+
+def test_disjoint_routes_have_minimum_total_cost():
+    network = small_damaged_grid()
+    for mode in ("node", "edge"):
+        for start, end in (("N0_0", "N3_3"), ("N3_1", "N0_3"), ("N3_0", "N0_3")):
+            routes = disjoint_routes(network, start, end, k=2, mode=mode)
+            expected = best_disjoint_pair(simple_paths(network, start, end), mode)
+            if expected is None:
+                # N3_0 quedó con un solo vecino por el enlace caído
+                assert len(routes) == 1
+                continue
+            assert len(routes) == 2
+            assert sum(d for _, d in routes) == expected
+            (p1, _), (p2, _) = routes
+            if mode == "node":
+                assert not set(p1[1:-1]) & set(p2[1:-1])
+            for path, distance in routes:
+                assert path_cost(network, path) == distance
+                assert not set(path) & network.failed_nodes
+
+
+def test_disjoint_routes_through_a_bridge():
+    network = grid_network(3, 3, seed=1)
+    network.add_connection("N2_2", "X", 1)
+    routes = disjoint_routes(network, "N0_0", "X", k=2)
+    assert len(routes) == 1
+    assert routes[0][1] == simple_paths(network, "N0_0", "X")[0][0]
@@ -0,0 +1,146 @@
+# test_network.py
+
+from conftest import grid_network, reference_distances
+from network import Network
+from routing import INF, dijkstra, reconstruct_path
+
+
+def test_csr_matches_added_connections():
+    network = Network()
+    edges = [("A", "B", 4), ("B", "C", 1), ("A", "C", 7), ("C", "D", 2), ("A", "B", 3)]
+    for u, v, w in edges:
+        network.add_connection(u, v, w)
+    assert network.nodes == {"A", "B", "C", "D"}
+    assert isinstance(network.nodes, set)
+    # La arista paralela A-B se conserva con el menor peso
+    assert sorted(network.neighbors("A")) == [("B", 3), ("C", 7)]
+    assert sorted(network.graph["C"]) == [("A", 7), ("B", 1), ("D", 2)]
+    offsets, targets, weights = network.csr()
+    assert offsets[-1] == 2 * network.count_edges()
+
+
+def test_dijkstra_on_network_matches_dict_graph(grid):
+    for start in ("N0_0", "N3_3", "N5_2"):
+        dist, prev = dijkstra(grid, start)
+        expected = reference_distances(grid, start)
+        assert dist == expected
+        for end in ("N5_5", "N1_4"):
+            path = reconstruct_path(prev, start, end)
+            assert path[0] == start and path[-1] == end
+            assert sum(grid.link_weight(grid.node_id(a), grid.node_id(b)) for a, b in zip(path, path[1:])) == dist[end]
+
+
+def test_dict_dijkstra_keeps_unreachable_nodes_at_infinity():
+    graph = {"A": [("B", 1)], "B": [("A", 1)], "C": [("D", 2)], "D": [("C", 2)]}
+    dist, prev = dijkstra(graph, "A")
+    assert dist == {"A": 0, "B": 1, "C": INF, "D": INF}
+    assert prev["C"] is None
+
+
+def test_nodes_include_cached_topology(tmp_path):
+    path = tmp_path / "topologia.txt"
+    path.write_text("A B 1\nB C 2\n", encoding="utf-8")
+    Network().load_topology(str(path))
+    network = Network()
+    network.load_topology(str(path))
+    assert network.nodes == {"A", "B", "C"}
+    network.add_connection("C", "D", 1)
+    assert "D" in network.nodes
+
+
+def test_failed_nodes_are_unreachable():
+    network = grid_network(4, 4, seed=3)
+    network.fail_node("N1_1")
+    dist, _ = dijkstra(network, "N0_0")
+    assert dist["N1_1"] == INF
+    expected = reference_distances(network, "N0_0")
+    assert {node: d for node, d in dist.items() if node in expected} == expected
+
+
+def brute_force_stats(network):
+    # Conteos recalculados desde cero a partir de las listas de vecinos
+    names = network.node_names
+    failed = network.failed_nodes
+    pairs = {frozenset((u, v)) for u in names for v, _ in network.neighbors(u)}
+    operational = set()
+    for u in names:
+        for v, _ in network.neighbors(u):
+            a, b = network.node_id(u), network.node_id(v)
+            if u in failed or v in failed or network.link_key(a, b) in network.failure_mask()[1]:
+                continue
+            operational.add(frozenset((u, v)))
+    degrees = [len({v for v, _ in network.neighbors(u)}) for u in names]
+    return {
+        "total_nodes": len(names),
+        "total_connections": len(pairs),
+        "operational_nodes": len(names) - len(failed),
+        "operational_connections": len(operational),
+        "average_degree": sum(degrees) / len(names) if names else 0,
+        "max_degree": max(degrees, default=0),
+    }
+
+
+def test_incremental_counts_match_brute_force():
+    import random
+
+    rng = random.Random(7)
+    network = grid_network(5, 5, seed=2)
+    names = list(network.node_names)
+    for _ in range(300):
+        u, v = rng.sample(names, 2)
+        action = rng.random()
+        if action < 0.25:
+            network.add_connection(u, v, rng.randint(1, 9))
+        elif action < 0.45:
+            network.remove_connection(u, v)
+        elif action < 0.6:
+            network.fail_node(u)
+        elif action < 0.75:
+            network.restore_node(u)
+        elif action < 0.85:
+            network.fail_link(u, v)
+        else:
+            network.restore_link(u, v)
+        stats = network.get_network_stats()
+        stats.pop("traffic_per_node")
+        assert stats == brute_force_stats(network)
+        assert network.count_edges() == stats["total_connections"]
+
+
+def test_reload_applies_only_the_differences(tmp_path):
+    path = tmp_path / "topologia.txt"
+    path.write_text("A B 4\nB C 1\nA C 7\nC D 2\n", encoding="utf-8")
+    network = Network()
+    network.load_topology(str(path), use_cache=False)
+    assert network.reload_topology(str(path), use_cache=False) == {"added": 0, "removed": 0, "reweighted": 0}
+    network.fail_node("D")
+    path.write_text("A B 4\nB C 3\nC D 2\nD E 1\n", encoding="utf-8")
+    version = network.version
+    changes = network.reload_topology(str(path), use_cache=False)
+    assert changes == {"added": 1, "removed": 1, "reweighted": 1}
+    assert network.version > version
+    # Las fallas se conservan y el resultado equivale a cargar el archivo de cero
+    assert network.failed_nodes == {"D"}
+    fresh = Network()
+    fresh.load_topology(str(path), use_cache=False)
+    fresh.fail_node("D")
+    for start in ("A", "C"):
+        assert dijkstra(network, start)[0] == reference_distances(fresh, start)
+    assert network.count_edges() == fresh.count_edges()
+
+
+def test_watcher_reloads_changed_file(tmp_path):
+    import os
+
+    path = tmp_path / "topologia.txt"
+    path.write_text("A B 4\nB C 1\n", encoding="utf-8")
+    network = Network()
+    network.load_topology(str(path), use_cache=False)
+    watcher = network.watch_topology(str(path))
+    assert watcher.poll() is None
+    path.write_text("A B 4\nB C 1\nC D 9\n", encoding="utf-8")
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert watcher.poll() == {"added": 1, "removed": 0, "reweighted": 0}
+    assert "D" in network.nodes
+    assert watcher.poll() is None
@@ -0,0 +1,46 @@
+# test_parallel.py
+
+from conftest import reference_distances
+from parallel import ParallelExecutor, SharedGraph, _share, single_source_distances
+from routing import INF
+
+
+def expected_row(network, source_id):
+    ref = reference_distances(network, network.node_names[source_id])
+    return [ref.get(name, INF) for name in network.node_names]
+
+
+def test_shared_graph_matches_network(damaged_grid):
+    blocks, descriptor = _share(damaged_grid)
+    graph = SharedGraph(descriptor)
+    try:
+        assert [list(a) for a in graph.csr()] == [list(a) for a in damaged_grid.csr()]
+        failed, failed_links = graph.failure_mask()
+        assert bytes(failed) == bytes(damaged_grid.failure_mask()[0])
+        assert failed_links == frozenset(damaged_grid.failure_mask()[1])
+    finally:
+        graph.close()
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def test_parallel_distances_match_dijkstra(damaged_grid):
+    names = damaged_grid.node_names
+    sources = [damaged_grid.node_id(name) for name in ("N0_0", "N0_1", "N4_1", "N5_5", "N3_3", "N1_2")]
+    for workers in (1, 2):
+        result = single_source_distances(damaged_grid, sources, workers=workers)
+        assert sorted(result) == sorted(sources)
+        for source in sources:
+            assert len(result[source]) == len(names)
+            assert list(result[source]) == expected_row(damaged_grid, source)
+
+
+def test_executor_map_returns_every_item(grid):
+    with ParallelExecutor(grid, workers=2) as executor:
+        counts = sorted(executor.map(_node_count_plus, range(10), batch_size=3))
+    assert counts == [grid.node_count + i for i in range(10)]
+
+
+def _node_count_plus(graph, item):
+    return graph.node_count + item
@@ -0,0 +1,145 @@
+# test_resilience.py
+
+import pytest
+
+from conftest import damage, grid_network
+from network import Network
+from resilience import articulation_points, betweenness, bridges, criticality_report
+from routing import INF, dijkstra
+
+
+def components(graph, skip_node=None, skip_edge=None):
+    # Componentes conexas por BFS sin un nodo o sin un enlace
+    seen = set()
+    found = []
+    for root in graph:
+        if root == skip_node or root in seen:
+            continue
+        seen.add(root)
+        part = [root]
+        for u in part:
+            for v, _ in graph[u]:
+                if v == skip_node or v in seen or {u, v} == skip_edge:
+                    continue
+                seen.add(v)
+                part.append(v)
+        found.append(set(part))
+    return found
+
+
+def brute_force_cuts(graph):
+    # Punto de articulación: al quitarlo, su componente queda en más de un fragmento
+    base = {v: len(part) for part in components(graph) for v in part}
+    cuts = {}
+    for x in graph:
+        parts = [p for p in components(graph, skip_node=x) if _touches(graph, x, p)]
+        if len(parts) > 1:
+            cuts[x] = base[x] - 1 - max(len(p) for p in parts)
+    edges = {frozenset((u, v)) for u in graph for v, _ in graph[u]}
+    found = {}
+    for edge in edges:
+        u, v = sorted(edge)
+        parts = [p for p in components(graph, skip_edge=set(edge)) if u in p or v in p]
+        if len(parts) == 2:
+            found[(u, v)] = min(len(p) for p in parts)
+    return cuts, found
+
+
+def _touches(graph, x, part):
+    # El fragmento estaba unido a x antes de quitarlo
+    return any(v in part for v, _ in graph[x])
+
+
+def shortest_path_counts(graph, start):
+    # Distancias y número de rutas más cortas desde start (orden creciente de distancia)
+    dist, _ = dijkstra(graph, start)
+    sigma = {start: 1}
+    for v in sorted((v for v in dist if dist[v] != INF), key=dist.get):
+        if v != start:
+            sigma[v] = sum(sigma.get(u, 0) for u, w in graph[v] if dist[u] + w == dist[v])
+    return dist, sigma
+
+
+def brute_force_betweenness(graph):
+    # Fracción de rutas más cortas entre cada par que pasa por cada nodo y por cada enlace
+    info = {s: shortest_path_counts(graph, s) for s in graph}
+    nodes = dict.fromkeys(graph, 0.0)
+    links = {}
+    for s in graph:
+        ds, ss = info[s]
+        for t in graph:
+            if t == s or ds[t] == INF:
+                continue
+            dt, st = info[t]
+            for v in graph:
+                if v not in (s, t) and ds[v] + dt[v] == ds[t]:
+                    nodes[v] += ss[v] * st[v] / ss[t]
+                for u, w in graph[v]:
+                    if ds[v] + w + dt[u] == ds[t]:
+                        key = tuple(sorted((u, v)))
+                        links[key] = links.get(key, 0.0) + ss[v] * st[u] / ss[t]
+    n = len(graph)
+    nodes = {v: b / 2 / ((n - 1) * (n - 2) / 2) for v, b in nodes.items()}
+    links = {k: b / 2 / (n * (n - 1) / 2) for k, b in links.items()}
+    return nodes, links
+
+
+def chain_of_cycles():
+    # Dos ciclos unidos por un camino y una cola: C, X, D y F son puntos de articulación;
+    # C-X, X-D y F-G, puentes
+    network = Network()
+    for u, v, w in (("A", "B", 1), ("B", "C", 1), ("C", "A", 1), ("C", "X", 2), ("X", "D", 2),
+                    ("D", "E", 1), ("E", "F", 1), ("F", "D", 1), ("F", "G", 3)):
+        network.add_connection(u, v, w)
+    return network
+
+
+@pytest.mark.parametrize("build", [chain_of_cycles, lambda: damage(grid_network(5, 5, seed=3))])
+def test_cuts_and_bridges_match_brute_force(build):
+    network = build()
+    graph = network.operational_graph()
+    cuts, found = brute_force_cuts(graph)
+    assert articulation_points(network) == cuts
+    assert {tuple(sorted(link)): separated for link, separated in bridges(network)} == found
+
+
+def test_failures_create_new_cut_points():
+    network = chain_of_cycles()
+    assert set(articulation_points(network)) == {"C", "X", "D", "F"}
+    network.fail_link("E", "F")
+    cuts, found = brute_force_cuts(network.operational_graph())
+    assert articulation_points(network) == cuts and "D" in cuts and "E" not in cuts
+    assert ("D", "E") in found
+    network.fail_node("X")
+    assert articulation_points(network) == brute_force_cuts(network.operational_graph())[0]
+
+
+@pytest.mark.parametrize("build", [chain_of_cycles, lambda: damage(grid_network(5, 5, seed=3))])
+def test_betweenness_matches_brute_force(build):
+    network = build()
+    expected_nodes, expected_links = brute_force_betweenness(network.operational_graph())
+    for workers in (1, 2):
+        nodes, links = betweenness(network, workers=workers)
+        assert nodes == pytest.approx(expected_nodes)
+        links = {tuple(sorted(link)): value for link, value in links.items()}
+        assert set(links) == set(expected_links)
+        assert links == pytest.approx(expected_links)
+
+
+def test_full_sample_equals_exact_betweenness():
+    network = damage(grid_network(4, 4, seed=2))
+    alive = len(network.node_names) - len(network.failed_nodes)
+    exact = betweenness(network, workers=1)
+    sampled = betweenness(network, sample=alive, seed=1, workers=1)
+    assert sampled[0] == pytest.approx(exact[0])
+
+
+def test_report_ranks_structural_impact_first():
+    report = criticality_report(chain_of_cycles(), workers=1)
+    assert report["articulation_points"] == ["C", "D", "F", "X"]
+    assert sorted(tuple(sorted(link)) for link in report["bridges"]) == [("C", "X"), ("D", "X"), ("F", "G")]
+    # X y D dejan 3 nodos fuera del fragmento mayor; C, 2 (A y B); F, solo G
+    disconnected = [(e["station"], e["disconnected"]) for e in report["stations"][:4]]
+    assert sorted(disconnected[:2]) == [("D", 3), ("X", 3)]
+    assert disconnected[2:] == [("C", 2), ("F", 1)]
+    assert report["links"][0]["bridge"]
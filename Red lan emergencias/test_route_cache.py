@@ -0,0 +1,47 @@
+# test_route_cache.py
+
+from conftest import reference_distances
+from route_cache import RouteCache
+
+
+def test_hits_until_the_network_changes(grid):
+    calls = []
+
+    def solver(start, end):
+        calls.append((start, end))
+        return reference_distances(grid, start)[end], [start, end]
+
+    cache = RouteCache(grid, solver=solver)
+    assert cache.route("N0_0", "N5_5")[0] == reference_distances(grid, "N0_0")["N5_5"]
+    cache.route("N0_0", "N5_5")
+    assert calls == [("N0_0", "N5_5")]
+    assert cache.get_stats()["hits"] == 1
+    # Cada cambio de fallas, pesos o topología aumenta la versión y descarta la caché
+    for change in (lambda: grid.fail_node("N2_2"), lambda: grid.set_weight("N0_0", "N0_1", 1),
+                   lambda: grid.add_connection("N0_0", "N5_5", 1), lambda: grid.restore_node("N2_2")):
+        change()
+        distance, _ = cache.route("N0_0", "N5_5")
+        assert distance == reference_distances(grid, "N0_0")["N5_5"]
+    assert len(calls) == 5
+    assert cache.get_stats()["invalidations"] == 4
+
+
+def test_default_solver_and_returned_copies(damaged_grid):
+    cache = RouteCache(damaged_grid)
+    distance, path = cache.route("N0_0", "N5_5")
+    assert distance == reference_distances(damaged_grid, "N0_0")["N5_5"]
+    path.append("basura")
+    assert cache.route("N0_0", "N5_5")[1][-1] == "N5_5"
+
+
+def test_eviction_bounds(grid):
+    cache = RouteCache(grid, max_entries=3)
+    names = grid.node_names
+    for end in names[:6]:
+        cache.route("N0_0", end)
+    stats = cache.get_stats()
+    assert stats["entries"] == 3 and stats["evictions"] == 3
+    # La entrada más reciente sigue en la caché; la más antigua no
+    cache.route("N0_0", names[5])
+    cache.route("N0_0", names[0])
+    assert cache.get_stats()["hits"] == 1
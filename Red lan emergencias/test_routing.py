@@ -0,0 +1,102 @@
+# test_routing.py
+
+from conftest import path_cost, reference_distances
+from routing import INF, dijkstra, reconstruct_path
+
+
+def test_failure_mask_matches_operational_copy(damaged_grid):
+    for start in ("N0_0", "N2_3", "N5_5"):
+        dist, prev = dijkstra(damaged_grid, start)
+        assert dist == reference_distances(damaged_grid, start)
+        for end, d in dist.items():
+            path = reconstruct_path(prev, start, end)
+            if d == INF or end == start:
+                assert path == []
+                continue
+            assert path_cost(damaged_grid, path) == d
+            assert not set(path) & damaged_grid.failed_nodes
+
+
+def test_failed_link_is_not_used(grid):
+    dist, prev = dijkstra(grid, "N0_0")
+    path = reconstruct_path(prev, "N0_0", "N0_1")
+    grid.fail_link(path[0], path[1])
+    dist, prev = dijkstra(grid, "N0_0")
+    path = reconstruct_path(prev, "N0_0", "N0_1")
+    assert path[1] != "N0_1"
+    assert dist == reference_distances(grid, "N0_0")
+    grid.restore_link("N0_0", "N0_1")
+    assert dijkstra(grid, "N0_0")[0] == reference_distances(grid, "N0_0")
+
+
+def test_simulate_node_failure_marks_without_copying(grid):
+    assert grid.simulate_node_failure("N1_1") is grid
+    assert grid.failed_nodes == {"N1_1"}
+    assert dijkstra(grid, "N1_1") == ({}, {})
+    assert dijkstra(grid, "N0_0")[0]["N1_1"] == INF
+    grid.restore_node("N1_1")
+    assert dijkstra(grid, "N0_0")[0] == reference_distances(grid, "N0_0")
+
+
+def test_point_query_matches_full_search(damaged_grid):
+    full, _ = dijkstra(damaged_grid, "N0_0")
+    for end in ("N5_5", "N3_3", "N2_2"):
+        dist, prev = dijkstra(damaged_grid, "N0_0", end)
+        assert dist.get(end, INF) == full[end]
+        if full[end] < INF:
+            assert path_cost(damaged_grid, reconstruct_path(prev, "N0_0", end)) == full[end]
+
+
+def test_multi_source_matches_nearest_single_source(damaged_grid):
+    from routing import multi_source_dijkstra
+
+    sources = ["N0_0", "N5_5", "N2_2", "N0_5"]  # N2_2 está caída
+    dist, nearest, prev = multi_source_dijkstra(damaged_grid, sources)
+    references = {s: reference_distances(damaged_grid, s) for s in sources if not damaged_grid.is_failed(s)}
+    for node in damaged_grid.node_names:
+        best = min(ref[node] for ref in references.values())
+        if best == INF:
+            assert node not in dist
+            continue
+        assert dist[node] == best
+        assert references[nearest[node]][node] == best
+        path = reconstruct_path(prev, nearest[node], node) or [node]
+        assert path[0] == nearest[node] and path_cost(damaged_grid, path) == best
+
+
+def test_multi_source_with_offsets_and_target(grid):
+    from routing import multi_source_dijkstra
+
+    offsets = {"N0_0": 0, "N5_5": 7}
+    dist, nearest, _ = multi_source_dijkstra(grid, offsets, "N3_3")
+    expected = min(reference_distances(grid, s)["N3_3"] + d for s, d in offsets.items())
+    assert dist["N3_3"] == expected
+    assert reference_distances(grid, nearest["N3_3"])["N3_3"] + offsets[nearest["N3_3"]] == expected
+
+
+def test_bidirectional_matches_dijkstra(damaged_grid):
+    from routing import bidirectional_dijkstra
+
+    names = damaged_grid.node_names
+    for start in names[::5]:
+        expected = reference_distances(damaged_grid, start)
+        for end in names[::3]:
+            distance, path = bidirectional_dijkstra(damaged_grid, start, end)
+            if not expected or expected[end] == INF:
+                assert (distance, path) == (INF, [])
+                continue
+            assert distance == expected[end]
+            assert path[0] == start and path[-1] == end
+            assert path_cost(damaged_grid, path) == distance
+            assert not set(path) & damaged_grid.failed_nodes
+
+
+def test_bidirectional_buffers_follow_network_growth(grid):
+    from routing import bidirectional_dijkstra
+
+    assert bidirectional_dijkstra(grid, "N0_0", "N5_5")[0] == reference_distances(grid, "N0_0")["N5_5"]
+    grid.add_connection("N5_5", "X", 1)
+    grid.add_connection("X", "N0_0", 1)
+    assert bidirectional_dijkstra(grid, "N0_0", "N5_5") == (2, ["N0_0", "X", "N5_5"])
+    assert bidirectional_dijkstra(grid, "X", "X") == (0, ["X"])
+    assert bidirectional_dijkstra(grid, "X", "no existe") == (INF, [])
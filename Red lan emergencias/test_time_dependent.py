@@ -0,0 +1,79 @@
+# test_time_dependent.py
+
+from conftest import grid_network, path_cost, reference_distances
+from dynamic_spt import StationTrees
+from network import Network
+from routing import reconstruct_path
+from time_dependent import route_at, time_dependent_dijkstra
+
+
+def test_without_profiles_matches_dijkstra(damaged_grid):
+    for start in ("N0_0", "N4_1", "N5_5"):
+        dist, prev = time_dependent_dijkstra(damaged_grid, start, departure=600)
+        expected = reference_distances(damaged_grid, start)
+        assert dist == {node: d for node, d in expected.items() if d != float("inf")}
+        for end in ("N3_3", "N5_1", "N0_1"):
+            assert path_cost(damaged_grid, reconstruct_path(prev, start, end)) == dist[end]
+    assert time_dependent_dijkstra(damaged_grid, "N2_2") == ({}, {})
+
+
+def test_constant_profiles_match_reweighted_network():
+    network = grid_network(4, 4, seed=5)
+    reweighted = grid_network(4, 4, seed=5)
+    for u, v, w in (("N0_0", "N0_1", 20), ("N1_1", "N2_1", 1), ("N3_2", "N3_3", 9)):
+        assert network.set_profile(u, v, [w] * 24)
+        reweighted.remove_connection(u, v)
+        reweighted.add_connection(u, v, w)
+    network.fail_node("N1_2")
+    reweighted.fail_node("N1_2")
+    for start in ("N0_0", "N3_3"):
+        expected = reference_distances(reweighted, start)
+        assert time_dependent_dijkstra(network, start, departure=123)[0] == {
+            node: d for node, d in expected.items() if d != float("inf")}
+        for end in ("N3_3", "N0_1"):
+            cost, _ = route_at(network, start, end, 123)
+            assert cost == expected[end]
+
+
+def test_waiting_for_a_faster_hour():
+    network = Network()
+    network.add_connection("A", "B", 5)
+    network.add_connection("A", "C", 31)
+    network.add_connection("C", "B", 31)
+    # A-B es lentísimo entre las 00:00 y la 01:00 y rápido después
+    network.set_profile("A", "B", [100] + [5] * 23)
+    dist, prev = time_dependent_dijkstra(network, "A", "B", departure=50)
+    # Conviene esperar 10 minutos a la hora siguiente antes que rodear por C
+    assert dist["B"] == 15
+    assert reconstruct_path(prev, "A", "B") == ["A", "B"]
+    # Saliendo a las 00:00 la espera (60 + 5) ya no compensa y se rodea por C
+    assert time_dependent_dijkstra(network, "A", "B", departure=0)[0]["B"] == 62
+    assert route_at(network, "A", "B", 30)[0] == 62
+    assert route_at(network, "A", "B", 90)[0] == 5
+
+
+def test_profile_changes_are_notified():
+    network = grid_network(3, 3)
+    events = []
+    network.subscribe(lambda event, *args: events.append((event, args)))
+    a, b = network.node_id("N0_0"), network.node_id("N0_1")
+    version = network.version
+    assert network.set_profile("N0_0", "N0_1", [7] * 24)
+    assert events == [("profile_changed", (a, b))]
+    assert network.version > version
+    assert network.set_profile("N0_0", "N0_1", None)
+    assert not network.set_profile("N0_0", "N0_1", None)
+    assert not network.set_profile("N0_0", "N2_2", [7] * 24)
+    assert events == [("profile_changed", (a, b))] * 2
+
+
+def test_station_trees_stay_consistent_with_profiles():
+    network = grid_network(5, 5, seed=4)
+    trees = StationTrees(network, ["N0_0", "N4_4"])
+    network.set_profile("N1_1", "N1_2", [1] * 24)
+    network.fail_node("N2_2")
+    network.set_profile("N1_1", "N1_2", None)
+    network.fail_link("N0_0", "N1_0")
+    for station in ("N0_0", "N4_4"):
+        expected = reference_distances(network, station)
+        assert {node: trees.distance(station, node) for node in expected} == expected
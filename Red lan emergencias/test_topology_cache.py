@@ -0,0 +1,70 @@
+# test_topology_cache.py
+
+import os
+
+import topology_cache
+from conftest import reference_distances
+from network import Network
+from routing import dijkstra
+
+TOPOLOGIA = "A B 4\nB C 1\nA C 7 7-9:9\nC D 2\n"
+
+
+def load(path):
+
+    network = Network()
+    network.load_topology(str(path))
+    return network
+
+
+def test_cached_load_matches_parsed_topology(tmp_path):
+    path = tmp_path / "topologia.txt"
+    path.write_text(TOPOLOGIA, encoding="utf-8")
+    parsed = load(path)
+    assert os.path.exists(topology_cache.cache_path(str(path)))
+    cached = Network()
+    assert topology_cache.load(cached, str(path))
+    assert cached.nodes == parsed.nodes
+    assert cached.count_edges() == parsed.count_edges()
+    assert dijkstra(cached, "A")[0] == reference_distances(parsed, "A")
+    assert list(cached.link_profile(cached.node_id("A"), cached.node_id("C")))[7] == 9
+    cached.close()
+    # Cerrado el mapa la red sigue funcionando con arreglos propios
+    assert cached._mapped is None
+    cached.fail_node("B")
+    assert dijkstra(cached, "A")[0] == reference_distances(cached, "A")
+
+
+def test_same_size_edit_with_same_mtime_is_detected(tmp_path):
+    path = tmp_path / "topologia.txt"
+    path.write_text(TOPOLOGIA, encoding="utf-8")
+    load(path).close()
+    st = os.stat(path)
+    # Misma longitud y misma fecha: solo el hash de la fuente delata el cambio
+    path.write_text(TOPOLOGIA.replace("A B 4", "A B 5"), encoding="utf-8")
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    network = Network()
+    assert not topology_cache.load(network, str(path))
+    network = load(path)
+    assert network.link_weight(network.node_id("A"), network.node_id("B")) == 5
+
+
+def test_cache_is_rebuilt_when_the_source_changes(tmp_path):
+    path = tmp_path / "topologia.txt"
+    path.write_text(TOPOLOGIA, encoding="utf-8")
+    load(path).close()
+    path.write_text(TOPOLOGIA + "D E 3\n", encoding="utf-8")
+    network = load(path)
+    assert "E" in network.nodes
+    cached = Network()
+    assert topology_cache.load(cached, str(path))
+    assert "E" in cached.nodes
+    cached.close()
+
+
+def test_cache_with_other_format_version_is_ignored(tmp_path, monkeypatch):
+    path = tmp_path / "topologia.txt"
+    path.write_text(TOPOLOGIA, encoding="utf-8")
+    load(path).close()
+    monkeypatch.setattr(topology_cache, "FORMAT_VERSION", topology_cache.FORMAT_VERSION + 1)
+    assert not topology_cache.load(Network(), str(path))
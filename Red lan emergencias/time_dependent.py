@@ -0,0 +1,141 @@
+# time_dependent.py
+
+import heapq
+import weakref
+from array import array
+
+from routing import INF, bidirectional_dijkstra, search_buffers
+
+# Ruteo con pesos dependientes de la hora. Los pesos se interpretan como minutos y la hora de
+# salida como minutos desde la medianoche (el día se repite cada 1440 minutos).
+MINUTES_PER_HOUR = 60
+HOURS_PER_DAY = 24
+
+# Por red: (versión, pesos CSR por hora). Las horas con los mismos pesos comparten el arreglo
+_snapshots = weakref.WeakKeyDictionary()
+# Por red: (versión, {posición CSR: perfil})
+_slots = weakref.WeakKeyDictionary()
+
+
+def hour_of(minute):
+
+    return int(minute // MINUTES_PER_HOUR) % HOURS_PER_DAY
+
+
+def _profile_slots(network):
+    # Posiciones del CSR (en ambos sentidos) de las aristas con perfil horario, con su perfil
+    cached = _slots.get(network)
+    if cached is not None and cached[0] == network.version:
+        return cached[1]
+    offsets, targets, _ = network.csr()
+    slots = {}
+    for a, b, profile in network.link_profiles():
+        for x, y in ((a, b), (b, a)):
+            for i in range(offsets[x], offsets[x + 1]):
+                if targets[i] == y:
+                    slots[i] = profile
+    _slots[network] = (network.version, slots)
+    return slots
+
+
+def hourly_snapshots(network):
+    # Pesos CSR para cada una de las 24 horas, precalculados una vez por versión de la red.
+    # Sin perfiles todas las horas usan los pesos estáticos; con perfiles, las horas con la
+    # misma combinación de pesos comparten un único arreglo
+    cached = _snapshots.get(network)
+    if cached is not None and cached[0] == network.version:
+        return cached[1]
+    _, _, weights = network.csr()
+    slots = _profile_slots(network)
+    by_signature = {}
+    snapshots = []
+    for hour in range(HOURS_PER_DAY):
+        signature = tuple(profile[hour] for profile in slots.values())
+        snapshot = by_signature.get(signature)
+        if snapshot is None:
+            if slots:
+                snapshot = array("q", weights)
+                for i, profile in slots.items():
+                    snapshot[i] = profile[hour]
+            else:
+                snapshot = weights
+            by_signature[signature] = snapshot
+        snapshots.append(snapshot)
+    _snapshots[network] = (network.version, snapshots)
+    return snapshots
+
+
+# Vista de la red con los pesos de una hora fija; el resto de la interfaz es la de la red
+class _HourView:
+    def __init__(self, network, weights):
+        self._network = network
+        offsets, targets, _ = network.csr()
+        self._csr = (offsets, targets, weights)
+
+    def csr(self):
+        return self._csr
+
+    def __getattr__(self, name):
+        return getattr(self._network, name)
+
+
+def route_at(network, start, end, departure):
+    # Ruta con los pesos de la hora de salida (la hora se supone fija durante el viaje): tan
+    # rápida como una consulta estática, pues solo cambia el arreglo de pesos
+    weights = hourly_snapshots(network)[hour_of(departure)]
+    return bidirectional_dijkstra(_HourView(network, weights), start, end, search_buffers(network))
+
+
+def _arrival(profile, t):
+    # Llegada más temprana al recorrer una arista con perfil horario saliendo en t. Se permite
+    # esperar en el nodo: si salir al comienzo de una hora siguiente llega antes, se espera.
+    # Así la función de llegada es no decreciente (propiedad FIFO) y Dijkstra es exacto
+    best = t + profile[hour_of(t)]
+    boundary = (t // MINUTES_PER_HOUR + 1) * MINUTES_PER_HOUR
+    while boundary < best:
+        candidate = boundary + profile[hour_of(boundary)]
+        if candidate < best:
+            best = candidate
+        boundary += MINUTES_PER_HOUR
+    return best
+
+
+def time_dependent_dijkstra(network, start, end=None, departure=0):
+    # Dijkstra de llegada más temprana saliendo de start en el minuto departure. Devuelve
+    # (dist, prev) como routing.dijkstra, donde dist es el tiempo de viaje desde la salida
+    # (incluidas las esperas); prev es compatible con reconstruct_path
+    source = network.node_id(start)
+    target = network.node_id(end) if end is not None else -1
+    if source is None or network.is_failed(start):
+        return {}, {}
+    offsets, targets, weights = network.csr()
+    failed, failed_links = network.failure_mask()
+    link_key = network.link_key
+    slots = _profile_slots(network)
+    names = network.node_names
+    arrival = {source: departure}
+    prev = {source: -1}
+    settled = set()
+    pq = [(departure, source)]
+    while pq:
+        t, u = heapq.heappop(pq)
+        if u in settled:
+            continue
+        settled.add(u)
+        if u == target:
+            break
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            if v in settled or failed[v]:
+                continue
+            if failed_links and link_key(u, v) in failed_links:
+                continue
+            profile = slots.get(i)
+            reach = _arrival(profile, t) if profile is not None else t + weights[i]
+            if reach < arrival.get(v, INF):
+                arrival[v] = reach
+                prev[v] = u
+                heapq.heappush(pq, (reach, v))
+    dist = {names[v]: arrival[v] - departure for v in settled}
+    prev_names = {names[v]: (names[prev[v]] if prev[v] >= 0 else None) for v in settled}
+    return dist, prev_names
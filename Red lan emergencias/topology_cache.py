@@ -0,0 +1,117 @@
+# topology_cache.py
+
+import hashlib
+import mmap
+import os
+import struct
+from array import array
+
+# Formato binario compilado de topology.txt:
+#   cabecera | edge_w | weights | claves de perfiles | pesos horarios | edge_u | edge_v | offsets |
+#   targets | degree | tabla de nombres
+# Los arreglos se mapean en memoria y se usan sin copiarlos (memoryview.cast).
+MAGIC = b"RLTC"
+FORMAT_VERSION = 4
+# magic, versión, tamaño y mtime de la fuente, sha256 de la fuente, nodos, aristas,
+# pares únicos, perfiles horarios, bytes de nombres
+_HEADER = struct.Struct("<4sIqq32sIIIIQ")
+# Resolución de las fechas de modificación en el peor caso (FAT: 2 s). Una fuente modificada
+# dentro de este margen antes de escribir la caché pudo cambiar de nuevo sin cambiar de fecha
+_MTIME_GRANULARITY_NS = 2_000_000_000
+
+
+def cache_path(filename):
+
+    return filename + ".cache"
+
+
+def source_digest(filename):
+
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def save(network, filename, digest=None):
+    # Compila la red ya cargada a disco; se escribe en un temporal y se reemplaza de forma atómica
+    st = os.stat(filename)
+    if digest is None:
+        digest = source_digest(filename)
+    edge_u, edge_v, edge_w = network._edge_u, network._edge_v, network._edge_w
+    offsets, targets, weights = network.csr()
+    names_blob = "\n".join(network.node_names).encode("utf-8")
+    profile_keys = array("q", network._profiles)
+    profile_weights = array("q")
+    for key in profile_keys:
+        profile_weights.extend(network._profiles[key])
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, st.st_size, st.st_mtime_ns, digest, network.node_count,
+                          len(edge_u), network.count_edges(), len(profile_keys), len(names_blob))
+    path = cache_path(filename)
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            # Los arreglos de 8 bytes van primero para mantener la alineación
+            for arr in (edge_w, weights, profile_keys, profile_weights, edge_u, edge_v, offsets, targets,
+                        network._degree):
+                f.write(arr)
+            f.write(names_blob)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[ADVERTENCIA] No se pudo escribir la caché de topología: {e}")
+        return False
+    return True
+
+
+def load(network, filename):
+    # Carga la red desde la caché si sigue correspondiendo a la fuente; devuelve False si no es válida
+    path = cache_path(filename)
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return False
+    with f:
+        raw = f.read(_HEADER.size)
+        if len(raw) < _HEADER.size:
+            return False
+        magic, version, size, mtime_ns, digest, n, m, edge_count, p, names_len = _HEADER.unpack(raw)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            return False
+        st = os.stat(filename)
+        # Si tamaño y fecha coinciden se evita recalcular el hash de la fuente, salvo que la
+        # caché se haya escrito tan cerca de esa fecha que una edición posterior no la cambie
+        unchanged = (st.st_size, st.st_mtime_ns) == (size, mtime_ns)
+        racy = os.fstat(f.fileno()).st_mtime_ns - st.st_mtime_ns < _MTIME_GRANULARITY_NS
+        if (not unchanged or racy) and source_digest(filename) != digest:
+            return False
+        expected = _HEADER.size + 8 * (m + 2 * m + p + 24 * p) + 4 * (m + m + (n + 1) + 2 * m + n) + names_len
+        if os.fstat(f.fileno()).st_size != expected:
+            return False
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    buf = memoryview(mm)
+    pos = _HEADER.size
+
+    def take(code, count, itemsize):
+        nonlocal pos
+        view = buf[pos:pos + count * itemsize].cast(code)
+        pos += count * itemsize
+        return view
+
+    edge_w = take("q", m, 8)
+    weights = take("q", 2 * m, 8)
+    profile_keys = take("q", p, 8)
+    profile_weights = take("q", 24 * p, 8)
+    edge_u = take("i", m, 4)
+    edge_v = take("i", m, 4)
+    offsets = take("i", n + 1, 4)
+    targets = take("i", 2 * m, 4)
+    degree = take("i", n, 4)
+    names = bytes(buf[pos:pos + names_len]).decode("utf-8").split("\n") if n else []
+    profiles = {key: array("q", profile_weights[24 * i:24 * i + 24]) for i, key in enumerate(profile_keys)}
+    network._attach_arrays(names, edge_u, edge_v, edge_w, offsets, targets, weights, degree, edge_count, profiles)
+    # La red es dueña del mapa y lo libera en Network.close()
+    network._mapped = mm
+    return True